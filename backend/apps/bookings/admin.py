@@ -1,10 +1,23 @@
-from django.urls import path
-from . import views
+from django.contrib import admin
+from apps.core.admin import LargeTableAdmin, date_drilldown_filter
+from .models import Booking
 
-urlpatterns = [
-    path('', views.BookingCreateView.as_view(), name='booking-create'),
-    path('my/', views.MyBookingsView.as_view(), name='my-bookings'),
-    path('stats/', views.booking_stats, name='booking-stats'),
-    path('<int:pk>/', views.BookingDetailView.as_view(), name='booking-detail'),
-    path('<int:booking_id>/status/', views.update_booking_status, name='update-booking-status'),
-]
+@admin.register(Booking)
+class BookingAdmin(LargeTableAdmin):
+    list_display = (
+        'booking_id', 'customer', 'service', 'booking_date', 'time_slot',
+        'status', 'total_amount', 'created_at'
+    )
+    list_filter = ('status', date_drilldown_filter('created_at'))
+    # Service.__str__ reads its provider
+    list_select_related = ('customer', 'service__provider')
+    search_fields = ('customer__username', 'service__name', 'customer_phone')
+    exact_search_fields = {
+        'booking_id': 'uuid',
+        'customer__username': 'exact',
+        'customer__email': 'email',
+    }
+    search_help_text = 'Booking ID, customer username or email. Prefix with ~ for a slow partial match.'
+    ordering = ('-created_at',)
+    raw_id_fields = ('customer', 'service')
+    readonly_fields = ('booking_id', 'created_at', 'updated_at', 'confirmed_at', 'completed_at')
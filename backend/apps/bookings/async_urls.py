@@ -0,0 +1,7 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('my/', async_views.my_bookings, name='async-my-bookings'),
+    path('<uuid:booking_id>/', async_views.booking_detail, name='async-booking-detail'),
+]
@@ -0,0 +1,20 @@
+from django.http import Http404
+from apps.core.async_api import api_response, async_api_view, view_queryset
+from .serializers import BookingSerializer
+from .views import MyBookingsView, BookingDetailView
+
+
+@async_api_view(authenticated=True)
+async def my_bookings(request):
+    """Async variant of MyBookingsView"""
+    bookings = [booking async for booking in view_queryset(MyBookingsView, request)]
+    return api_response(BookingSerializer(bookings, many=True).data)
+
+
+@async_api_view(authenticated=True)
+async def booking_detail(request, booking_id):
+    """Async variant of BookingDetailView"""
+    booking = await view_queryset(BookingDetailView, request).filter(booking_id=booking_id).afirst()
+    if booking is None:
+        raise Http404
+    return api_response(BookingSerializer(booking).data)
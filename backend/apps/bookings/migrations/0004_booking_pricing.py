@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_slot_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='hourly_rate',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Price per hour locked in at booking time', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='price_multiplier',
+            field=models.DecimalField(decimal_places=2, default=1, help_text='Demand multiplier applied to the service price', max_digits=4),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.services.models import Service
+from .signals import booking_status_changed
 from datetime import datetime, timedelta
 import uuid
 
@@ -67,6 +68,19 @@ class Booking(models.Model):
         decimal_places=2,
         help_text="Total amount for the booking"
     )
+    hourly_rate = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Price per hour locked in at booking time"
+    )
+    price_multiplier = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        default=1,
+        help_text="Demand multiplier applied to the service price"
+    )
     special_instructions = models.TextField(
         blank=True,
         null=True,
@@ -102,25 +116,43 @@ class Booking(models.Model):
     def __str__(self):
         return f"Booking {self.booking_id} - {self.customer.username}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can detect transitions
+        instance._loaded_status = dict(zip(field_names, values)).get('status')
+        return instance
+
     def save(self, *args, **kwargs):
         # Auto-calculate total amount
         if not self.total_amount:
-            self.total_amount = self.service.price_per_hour * self.hours_requested
+            self.total_amount = (self.hourly_rate or self.service.price_per_hour) * self.hours_requested
         
         # Set confirmation timestamp
         if self.status == 'confirmed' and not self.confirmed_at:
             self.confirmed_at = datetime.now()
         
         # Set completion timestamp
-        if self.status == 'completed' and not self.completed_at:
+        completed = self.status == 'completed' and not self.completed_at
+        if completed:
             self.completed_at = datetime.now()
-            # Update service rating and total bookings
-            self.service.total_bookings += 1
-            self.service.save(update_fields=['total_bookings'])
-            if self.rating:
-                self.service.update_rating()
         
+        previous_status = getattr(self, '_loaded_status', None)
         super().save(*args, **kwargs)
+        self._loaded_status = self.status
+
+        if completed:
+            # Service rating, total bookings and co-booking neighbours are recomputed by the task worker
+            from apps.services.tasks import refresh_recommendations, refresh_service_stats
+            refresh_service_stats.delay(service_id=self.service_id)
+            refresh_recommendations.delay(customer_id=self.customer_id)
+
+        if self.status != previous_status:
+            booking_status_changed.send(
+                sender=self.__class__,
+                booking=self,
+                previous_status=previous_status
+            )
     
     class Meta:
         db_table = 'bookings'
@@ -128,3 +160,9 @@ class Booking(models.Model):
         verbose_name = 'Booking'
         verbose_name_plural = 'Bookings'
         unique_together = ['service', 'booking_date', 'time_slot']
+        indexes = [
+            # Admin changelist ordering and date navigation
+            models.Index(fields=['created_at', 'id'], name='bookings_created_idx'),
+            # Slots held on a date, for provider matching
+            models.Index(fields=['booking_date', 'time_slot'], name='bookings_slot_idx'),
+        ]
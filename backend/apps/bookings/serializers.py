@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from .models import Booking
+from apps.pricing import engine as pricing
 from apps.services.serializers import ServiceSerializer
 from apps.users.serializers import UserSerializer
 
@@ -17,65 +20,105 @@ class BookingSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'booking_id', 'customer', 'customer_details', 'service', 'service_details',
             'booking_date', 'time_slot', 'time_slot_display', 'hours_requested', 
-            'status', 'status_display', 'total_amount', 'special_instructions',
+            'status', 'status_display', 'hourly_rate', 'price_multiplier', 'total_amount', 'special_instructions',
             'customer_address', 'customer_phone', 'rating', 'feedback',
             'created_at', 'updated_at', 'confirmed_at', 'completed_at'
         )
         read_only_fields = (
-            'id', 'booking_id', 'customer', 'total_amount', 'created_at', 
+            'id', 'booking_id', 'customer', 'hourly_rate', 'price_multiplier', 'total_amount', 'created_at', 
             'updated_at', 'confirmed_at', 'completed_at'
         )
 
-class BookingCreateSerializer(serializers.ModelSerializer):
+def slot_taken(service, booking_date, time_slot):
+    return Booking.objects.filter(
+        service=service,
+        booking_date=booking_date,
+        time_slot=time_slot,
+        status__in=['pending', 'confirmed', 'in_progress']
+    ).exists()
+
+class BookingQuoteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
-        fields = (
-            'service', 'booking_date', 'time_slot', 'hours_requested',
-            'special_instructions', 'customer_address', 'customer_phone'
-        )
+        fields = ('service', 'booking_date', 'time_slot', 'hours_requested')
     
     def validate_booking_date(self, value):
         # Can't book for past dates
         if value < timezone.now().date():
             raise serializers.ValidationError("Cannot book for past dates")
         
-        # Can't book more than 30 days in advance
-        if value > timezone.now().date() + timedelta(days=30):
-            raise serializers.ValidationError("Cannot book more than 30 days in advance")
+        # Can't book beyond the pricing horizon
+        if value > timezone.now().date() + timedelta(days=settings.PRICING_HORIZON_DAYS):
+            raise serializers.ValidationError(
+                f"Cannot book more than {settings.PRICING_HORIZON_DAYS} days in advance"
+            )
         
         return value
     
+    def validate(self, attrs):
+        if slot_taken(attrs['service'], attrs['booking_date'], attrs['time_slot']):
+            raise serializers.ValidationError("This time slot is already booked")
+        if not attrs['service'].is_available:
+            raise serializers.ValidationError("This service is currently not available")
+        attrs.setdefault('hours_requested', 1)
+        return attrs
+
+class BookingCreateSerializer(BookingQuoteSerializer):
+    quote = serializers.CharField(
+        write_only=True,
+        required=False,
+        help_text="Token from the quote endpoint; books at the quoted price while it is valid"
+    )
+    
+    class Meta:
+        model = Booking
+        fields = (
+            'service', 'booking_date', 'time_slot', 'hours_requested',
+            'special_instructions', 'customer_address', 'customer_phone', 'quote'
+        )
+    
     def validate(self, attrs):
         # Check if the time slot is available
         service = attrs['service']
         booking_date = attrs['booking_date']
         time_slot = attrs['time_slot']
         
-        existing_booking = Booking.objects.filter(
-            service=service,
-            booking_date=booking_date,
-            time_slot=time_slot,
-            status__in=['pending', 'confirmed', 'in_progress']
-        ).exists()
-        
-        if existing_booking:
+        if slot_taken(service, booking_date, time_slot):
+            # Turned-away attempts count as demand for the slot
+            pricing.queue_refresh(
+                service, booking_date, rejected_slot=time_slot, rejected_by=self.context['request'].user.pk
+            )
             raise serializers.ValidationError("This time slot is already booked")
         
         # Check if service is available
         if not service.is_available:
             raise serializers.ValidationError("This service is currently not available")
         
+        # Price at the quoted multiplier, or at the current demand without a quote
+        hours_requested = attrs.setdefault('hours_requested', 1)
+        token = attrs.pop('quote', None)
+        if token:
+            try:
+                quote = pricing.redeem(
+                    token, self.context['request'].user, service, booking_date, time_slot, hours_requested
+                )
+            except pricing.QuoteInvalid as e:
+                raise serializers.ValidationError({'quote': str(e)})
+        else:
+            quote = pricing.quote(service, booking_date, time_slot, hours_requested)
+        attrs['hourly_rate'] = quote.hourly_rate
+        attrs['price_multiplier'] = quote.multiplier
+        attrs['total_amount'] = quote.total_amount
+        
         return attrs
     
     def create(self, validated_data):
         validated_data['customer'] = self.context['request'].user
         
-        # Calculate total amount
-        service = validated_data['service']
-        hours_requested = validated_data['hours_requested']
-        validated_data['total_amount'] = service.price_per_hour * hours_requested
-        
-        return super().create(validated_data)
+        # The price is written by the same insert; the atomic block also covers
+        # the tasks queued by the booking's signals
+        with transaction.atomic():
+            return super().create(validated_data)
 
 class BookingStatusSerializer(serializers.ModelSerializer):
     class Meta:
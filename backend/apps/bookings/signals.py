@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent after a booking is created or its status changes.
+# Arguments: booking, previous_status (None for new bookings)
+booking_status_changed = Signal()
@@ -0,0 +1,13 @@
+from django.db import transaction
+from apps.tasks.queue import task
+from .models import Booking
+
+
+@task(priority=10)
+def confirm_paid_booking(booking_id):
+    """Confirm a pending booking once its payment has succeeded"""
+    with transaction.atomic():
+        booking = Booking.objects.select_for_update().select_related('service').get(pk=booking_id)
+        if booking.status == 'pending' and booking.payment.filter(payment_status='success').exists():
+            booking.status = 'confirmed'
+            booking.save()
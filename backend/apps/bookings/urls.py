@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.BookingCreateView.as_view(), name='booking-create'),
     path('my/', views.MyBookingsView.as_view(), name='my-bookings'),
+    path('quote/', views.booking_quote, name='booking-quote'),
     path('stats/', views.booking_stats, name='booking-stats'),
     path('<uuid:booking_id>/', views.BookingDetailView.as_view(), name='booking-detail'),
     path('<int:booking_id>/status/', views.update_booking_status, name='update-booking-status'),
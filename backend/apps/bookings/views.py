@@ -3,10 +3,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from apps.core.throttling import BookingCreateThrottle
+from django.conf import settings
+from apps.pricing import engine as pricing
 from .models import Booking
 from .serializers import (
     BookingSerializer, 
     BookingCreateSerializer, 
+    BookingQuoteSerializer,
     BookingStatusSerializer
 )
 
@@ -14,6 +18,7 @@ class BookingCreateView(generics.CreateAPIView):
     """Create a new booking"""
     serializer_class = BookingCreateSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [BookingCreateThrottle]
     
     def post(self, request, *args, **kwargs):
         if request.user.user_type != 'customer':
@@ -68,6 +73,28 @@ class BookingDetailView(generics.RetrieveAPIView):
         queryset = self.get_queryset()
         return get_object_or_404(queryset, booking_id=booking_id)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def booking_quote(request):
+    """Price of a slot at the current demand, with a token to book it at that price"""
+    serializer = BookingQuoteSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    quote = pricing.quote(data['service'], data['booking_date'], data['time_slot'], data['hours_requested'])
+    # Amounts as strings, like the booking serializers render them
+    return Response({
+        'service': quote.service_id,
+        'booking_date': quote.booking_date,
+        'time_slot': quote.time_slot,
+        'hours_requested': quote.hours_requested,
+        'base_price': str(quote.base_price),
+        'price_multiplier': str(quote.multiplier),
+        'hourly_rate': str(quote.hourly_rate),
+        'total_amount': str(quote.total_amount),
+        'quote': pricing.sign(quote, request.user),
+        'expires_in': settings.PRICING_QUOTE_TTL,
+    })
+
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def update_booking_status(request, booking_id):
@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    verbose_name = 'Core'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+        from . import metrics, profiling, tracing
+
+        if settings.METRICS_ENABLED:
+            connection_created.connect(metrics.install_query_timer)
+            metrics.instrument_serializers()
+        if settings.TRACE_ENABLED:
+            connection_created.connect(tracing.install_query_tracer)
+            tracing.instrument()
+        if settings.PROFILE_ENABLED:
+            connection_created.connect(profiling.install_query_profiler)
@@ -0,0 +1,91 @@
+"""
+Helpers for async (ASGI) variants of read-only API views.
+
+DRF views are sync-only, so the async views are plain Django coroutines.
+These helpers reproduce the parts of DRF they rely on (JWT authentication,
+permission and throttle checks, error bodies and rendering). Querysets are
+built by the existing DRF views, which keeps filtering, search, ordering
+and per-user scoping identical between the two paths.
+"""
+import math
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from apps.users.authentication import get_jwt_authenticator
+
+
+def api_response(data, status=200, headers=None):
+    """Render ``data`` with the API's default renderer"""
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    response = HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def view_queryset(view_class, request, **kwargs):
+    """Build the (lazy) filtered queryset a DRF generic view would use"""
+    drf_request = Request(request, authenticators=())
+    drf_request.user = request.user
+    view = view_class(request=drf_request, args=(), kwargs=kwargs, format_kwarg=None)
+    return view.filter_queryset(view.get_queryset())
+
+
+async def _authenticate(request):
+    authenticator = get_jwt_authenticator()
+    result = await sync_to_async(authenticator.authenticate)(request)
+    return result[0] if result is not None else AnonymousUser()
+
+
+@sync_to_async
+def _throttle_wait(request, throttle_classes):
+    """Seconds to wait if a throttle rejects the request, else None; off the event loop, as rate stores may do I/O"""
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            return throttle.wait()
+    return None
+
+
+def async_api_view(authenticated=False, throttle_classes=()):
+    """
+    Wrap an async GET view with DRF-equivalent request handling.
+
+    ``authenticated`` mirrors ``IsAuthenticated`` (``AllowAny`` otherwise);
+    ``throttle_classes`` are checked the way DRF checks them.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return api_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+            try:
+                request.user = await _authenticate(request)
+            except AuthenticationFailed as e:
+                return api_response(e.detail, status=401, headers={'WWW-Authenticate': 'Bearer realm="api"'})
+            if authenticated and not request.user.is_authenticated:
+                return api_response(
+                    {'detail': 'Authentication credentials were not provided.'},
+                    status=401,
+                    headers={'WWW-Authenticate': 'Bearer realm="api"'}
+                )
+
+            wait = await _throttle_wait(request, throttle_classes) if throttle_classes else None
+            if wait is not None:
+                return api_response(
+                    {'detail': f'Request was throttled. Expected available in {wait} seconds.'},
+                    status=429,
+                    headers={'Retry-After': str(math.ceil(wait))}
+                )
+
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404:
+                return api_response({'detail': 'Not found.'}, status=404)
+        return wrapper
+    return decorator
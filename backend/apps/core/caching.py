@@ -0,0 +1,60 @@
+"""
+HTTP caching policy for public read endpoints.
+
+``cache_policy`` adds ``Cache-Control`` and ``Vary`` to successful GET/HEAD
+responses and, given validator functions, answers conditional requests with
+304 without running the view body (Django's ``condition``). Anonymous responses are
+``public`` with ``stale-while-revalidate``, so shared caches and CDNs can
+serve them; requests carrying an ``Authorization`` header get a ``private``
+response, since shared caches must not reuse those. ``Vary: Authorization``
+keeps the two variants apart and ``Vary: Accept`` covers DRF's content
+negotiation.
+
+The policy goes inside DRF's dispatch, so authentication, permissions and
+throttles run before the validators, and a 304 is throttled like a 200:
+function views take the decorator below ``@api_view``; class-based views use
+``method_decorator(cache_policy(...), name='get')``. Validators run on every
+request, so they should be cheap indexed lookups.
+"""
+import hashlib
+from functools import wraps
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+CACHEABLE_STATUSES = (200, 203, 304)
+
+
+def cache_policy(max_age, stale_while_revalidate=0, etag=None, last_modified=None):
+    """
+    Cache responses of a public view for ``max_age`` seconds.
+
+    ``etag`` and ``last_modified`` are called with the view's arguments, like
+    the functions given to Django's ``condition`` decorator.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view) \
+            if etag or last_modified else view
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method not in ('GET', 'HEAD') or response.status_code not in CACHEABLE_STATUSES:
+                return response
+            patch_vary_headers(response, ('Accept', 'Authorization'))
+            if response.has_header('Cache-Control'):
+                return response
+            if 'HTTP_AUTHORIZATION' in request.META:
+                patch_cache_control(response, private=True, max_age=max_age)
+            elif stale_while_revalidate:
+                patch_cache_control(response, public=True, max_age=max_age,
+                                    stale_while_revalidate=stale_while_revalidate)
+            else:
+                patch_cache_control(response, public=True, max_age=max_age)
+            return response
+        return wrapper
+    return decorator
+
+
+def make_etag(*parts):
+    """Stable ETag value (unquoted) for the given validator values"""
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
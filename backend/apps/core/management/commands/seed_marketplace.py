@@ -0,0 +1,469 @@
+import io
+import queue
+import random
+import threading
+import time
+import uuid
+from bisect import bisect
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from itertools import accumulate
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from apps.bookings.models import Booking
+from apps.payments.models import EarningsEntry, Payment, ProviderDailyEarnings
+from apps.services.models import Service, area_key
+from apps.users.models import User
+
+SLOT_HOURS = [int(slot[:2]) for slot, _ in Booking.TIME_SLOT_CHOICES]
+# Mornings and early evenings are the busy slots
+# Cumulative weights, drawn with bisect
+SLOT_WEIGHTS = list(accumulate([6, 9, 10, 9, 6, 5, 6, 7, 9, 10, 7]))
+HOURS_WEIGHTS = list(accumulate([50, 30, 15, 5]))
+RATING_WEIGHTS = list(accumulate([3, 5, 12, 35, 45]))
+METHODS = ['upi', 'wallet', 'card']
+METHOD_WEIGHTS = list(accumulate([60, 30, 10]))
+CATEGORIES = [category for category, _ in Service.CATEGORY_CHOICES]
+AREAS = ['Pune', 'Mumbai', 'Delhi', 'Bengaluru', 'Chennai', 'Hyderabad', 'Kolkata', 'Ahmedabad']
+
+
+class Loader(threading.Thread):
+    """
+    Runs queued database writes on its own connection, in one transaction.
+
+    Rows are generated on the main thread while this thread waits on the
+    database, so generation and I/O overlap. ``finish(commit=False)`` rolls
+    everything back.
+    """
+
+    COMMIT = object()
+    ROLLBACK = object()
+
+    class Rollback(Exception):
+        pass
+
+    def __init__(self, depth=4):
+        super().__init__(daemon=True)
+        self.queue = queue.Queue(maxsize=depth)
+        self.error = None
+
+    def put(self, fn, *args):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((fn, args))
+
+    def run(self):
+        try:
+            with transaction.atomic():
+                while True:
+                    item = self.queue.get()
+                    if item is self.COMMIT:
+                        return
+                    if item is self.ROLLBACK:
+                        raise self.Rollback
+                    fn, args = item
+                    fn(*args)
+        except self.Rollback:
+            pass
+        except Exception as e:
+            self.error = e
+            # Keep draining so the producer never blocks on a full queue
+            while self.queue.get() not in (self.COMMIT, self.ROLLBACK):
+                pass
+        finally:
+            connection.close()
+
+    def finish(self, commit=True):
+        self.queue.put(self.COMMIT if commit else self.ROLLBACK)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+
+class TableWriter:
+    """
+    Raw bulk writes for one model, bypassing ``save()`` and signals.
+
+    Rows hold values for ``columns`` (attnames, already adapted for the
+    database); every other column gets its field default, adapted once.
+    PostgreSQL loads through ``COPY``, other backends through ``executemany``.
+    Writes are queued on ``loader``.
+    """
+
+    def __init__(self, loader, model, columns):
+        fields = {field.attname: field for field in model._meta.concrete_fields}
+        others = [field for field in model._meta.concrete_fields if field.attname not in columns]
+        self.model = model
+        self.table = model._meta.db_table
+        self.columns = [fields[name].column for name in columns] + [field.column for field in others]
+        self.constants = tuple(field.get_db_prep_save(field.get_default(), connection) for field in others)
+        self.loader = loader
+        self.rows = 0
+
+    def write(self, rows):
+        if rows:
+            self.loader.put(self._write, rows)
+            self.rows += len(rows)
+
+    def _write(self, rows):
+        constants = self.constants
+        rows = [row + constants for row in rows]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                self._copy(cursor, rows)
+            else:
+                quote = connection.ops.quote_name
+                cursor.executemany(
+                    f"INSERT INTO {quote(self.table)} ({', '.join(map(quote, self.columns))}) "
+                    f"VALUES ({', '.join(['%s'] * len(self.columns))})",
+                    rows
+                )
+
+    def _copy(self, cursor, rows):
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(_copy_value(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        sql = f"COPY {quote(self.table)} ({', '.join(map(quote, self.columns))}) FROM STDIN"
+        if hasattr(cursor.cursor, 'copy_expert'):
+            cursor.cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a reproducible marketplace data set (users, services, bookings, payments, '
+        'earnings ledger) with realistic distributions: Zipf-distributed provider popularity, '
+        'busy time slots, a date-dependent status mix and skewed ratings. Rows are written '
+        'raw in chunks (COPY on PostgreSQL), bypassing model save() side effects; derived '
+        'columns (total_amount, timestamps, service counters and ratings, ledger rollups) '
+        'are filled consistently.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=10000)
+        parser.add_argument('--providers', type=int, default=1000)
+        parser.add_argument('--services', type=int, default=3000)
+        parser.add_argument('--bookings', type=int, default=100000)
+        parser.add_argument('--days-back', type=int, default=180, help='History length in days')
+        parser.add_argument('--days-ahead', type=int, default=30, help='Upcoming bookings horizon in days')
+        parser.add_argument('--zipf', type=float, default=1.1, help='Provider popularity skew (0 = uniform)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; same seed, same data')
+        parser.add_argument('--chunk-size', type=int, default=20000, help='Rows per bulk write')
+        parser.add_argument('--password', default='seed-pass-123', help='Password of every generated account')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.prefix = f"seed{options['seed']}_"
+        if options['services'] < 1 or options['providers'] < 1 or options['customers'] < 1:
+            raise CommandError('Need at least one customer, provider and service')
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(f"Users prefixed '{self.prefix}' already exist; use another --seed or a fresh database")
+
+        self.today = timezone.localdate()
+        self.now = timezone.now().timestamp()
+        self.adapt_date = connection.ops.adapt_datefield_value
+        self.native_uuid = connection.features.has_native_uuid_field
+        # What adapt_datetimefield_value() produces, without its per-value checks
+        self.db_timezone = None if connection.features.supports_timezones else connection.timezone
+
+        # Read before the loader's transaction starts writing
+        self.first_ids = {model: self._next_id(model) for model in (User, Service, Booking, Payment)}
+        connections.close_all()
+
+        started = time.monotonic()
+        self.loader = Loader()
+        self.loader.start()
+        self.loader.put(self._prepare_connection)
+        try:
+            writers = self._create_catalog()
+            writers += self._create_bookings()
+            self.loader.put(self._reset_sequences, [writer.model for writer in writers])
+        except BaseException:
+            self.loader.finish(commit=False)
+            raise
+        self.loader.finish()
+
+        elapsed = time.monotonic() - started
+        total = sum(writer.rows for writer in writers)
+        for writer in writers:
+            self.stdout.write(f'{writer.table}: {writer.rows} rows')
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s); '
+            f"log in as {self.prefix}customer_0 / {self.options['password']}"
+        ))
+
+    def _next_id(self, model):
+        return (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+
+    def _prepare_connection(self):
+        if connection.vendor == 'sqlite':
+            # Keep the index pages being filled in memory (size in KiB)
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA cache_size = -262144')
+
+    def _reset_sequences(self, models):
+        if connection.vendor == 'postgresql':
+            # Explicit ids were written; move the sequences past them
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+
+    def _update_service_counters(self, rows):
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"UPDATE {quote(Service._meta.db_table)} SET {quote('total_bookings')} = %s, {quote('rating')} = %s "
+                f"WHERE {quote('id')} = %s",
+                rows
+            )
+
+    def _uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _uuid_value(self, value):
+        return value if self.native_uuid else value.hex
+
+    def _datetime(self, epoch):
+        if self.db_timezone is None:
+            return datetime.fromtimestamp(epoch, tz=dt_timezone.utc)
+        return datetime.fromtimestamp(epoch, tz=self.db_timezone).replace(tzinfo=None)
+
+    def _weighted(self, cum_weights):
+        return bisect(cum_weights, self.rng.random() * cum_weights[-1])
+
+    def _create_catalog(self):
+        options, rng = self.options, self.rng
+        chunk_size = options['chunk_size']
+        # One hash shared by every account keeps this fast
+        password = make_password(options['password'])
+        joined = self._datetime(self.now - (options['days_back'] + 30) * 86400)
+
+        users = TableWriter(self.loader, User, [
+            'id', 'password', 'username', 'email', 'user_type', 'phone_number', 'address',
+            'date_joined', 'created_at', 'updated_at',
+        ])
+        first_user_id = self.first_ids[User]
+        rows = []
+        for index in range(options['customers'] + options['providers']):
+            kind = 'customer' if index < options['customers'] else 'provider'
+            number = index if kind == 'customer' else index - options['customers']
+            username = f'{self.prefix}{kind}_{number}'
+            rows.append((
+                first_user_id + index, password, username, f'{username}@example.com', kind,
+                f'9{rng.randrange(10 ** 9):09d}', rng.choice(AREAS), joined, joined, joined,
+            ))
+            if len(rows) >= chunk_size:
+                users.write(rows)
+                rows = []
+        users.write(rows)
+        self.customer_ids = range(first_user_id, first_user_id + options['customers'])
+        provider_ids = range(first_user_id + options['customers'], first_user_id + options['customers'] + options['providers'])
+
+        # Zipf popularity by provider rank, shared among the provider's services
+        services = TableWriter(self.loader, Service, [
+            'id', 'name', 'description', 'category', 'price_per_hour', 'provider_id',
+            'service_area', 'area', 'created_at', 'updated_at',
+        ])
+        first_service_id = self.first_ids[Service]
+        provider_weight = [1 / (rank + 1) ** options['zipf'] for rank in range(options['providers'])]
+        self.service_provider, self.service_price, self.service_name, weights = [], [], [], []
+        rows = []
+        for index in range(options['services']):
+            provider_index = index % options['providers'] if index < options['providers'] else rng.randrange(options['providers'])
+            category = rng.choice(CATEGORIES)
+            name = f"{category.replace('_', ' ').title()} by {self.prefix}provider_{provider_index} #{index}"
+            price = rng.randrange(200, 2000, 50)
+            self.service_provider.append(provider_ids[provider_index])
+            self.service_price.append(price)
+            self.service_name.append(name)
+            weights.append(provider_weight[provider_index] * rng.uniform(0.5, 1.5))
+            area = rng.choice(AREAS)
+            rows.append((
+                first_service_id + index, name, f"Professional {category.replace('_', ' ')} service",
+                category, Decimal(price), provider_ids[provider_index], area, area_key(area), joined, joined,
+            ))
+        services.write(rows)
+        self.service_ids = range(first_service_id, first_service_id + options['services'])
+        self.service_cum_weights = list(accumulate(weights))
+        return [users, services]
+
+    def _pick_slot(self, used, days):
+        """A free (service index, day offset, slot index), or None when the calendar is full"""
+        for _ in range(20):
+            service = self._weighted(self.service_cum_weights)
+            day = self.rng.randrange(days)
+            slot = self._weighted(SLOT_WEIGHTS)
+            key = (service * days + day) * len(SLOT_HOURS) + slot
+            if key not in used:
+                used.add(key)
+                return service, day, slot
+        return None
+
+    def _create_bookings(self):
+        options, rng = self.options, self.rng
+        days_back, days_ahead = options['days_back'], options['days_ahead']
+        days = days_back + days_ahead + 1
+        local_tz = timezone.get_current_timezone()
+        first_day = self.today - timedelta(days=days_back)
+        # Local midnight of every calendar day, as epoch seconds
+        midnights = [
+            datetime.combine(first_day + timedelta(days=offset), datetime.min.time(), tzinfo=local_tz).timestamp()
+            for offset in range(days)
+        ]
+        day_values = [self.adapt_date(first_day + timedelta(days=offset)) for offset in range(days)]
+        today_offset = days_back
+        slot_values = [slot for slot, _ in Booking.TIME_SLOT_CHOICES]
+
+        bookings = TableWriter(self.loader, Booking, [
+            'id', 'booking_id', 'customer_id', 'service_id', 'booking_date', 'time_slot', 'hours_requested',
+            'status', 'total_amount', 'customer_address', 'customer_phone', 'rating',
+            'created_at', 'updated_at', 'confirmed_at', 'completed_at',
+        ])
+        payments = TableWriter(self.loader, Payment, [
+            'id', 'payment_id', 'booking_id', 'payment_method', 'payment_status', 'amount', 'transaction_id',
+            'payment_date', 'processed_at', 'created_at', 'updated_at',
+        ])
+        ledger = TableWriter(self.loader, EarningsEntry, [
+            'provider_id', 'payment_id', 'entry_type', 'amount', 'entry_date', 'payment_reference',
+            'booking_reference', 'service_name', 'payment_method', 'created_at',
+        ])
+        booking_id = self.first_ids[Booking]
+        payment_id = self.first_ids[Payment]
+
+        completed_count = [0] * len(self.service_ids)
+        rating_sum = [0] * len(self.service_ids)
+        rating_count = [0] * len(self.service_ids)
+        rollups = {}
+        used = set()
+        booking_rows, payment_rows, ledger_rows = [], [], []
+        skipped = 0
+
+        for _ in range(options['bookings']):
+            picked = self._pick_slot(used, days)
+            if picked is None:
+                skipped += 1
+                continue
+            service, day, slot = picked
+            hours = self._weighted(HOURS_WEIGHTS) + 1
+            amount = Decimal(self.service_price[service] * hours)
+            starts_at = midnights[day] + SLOT_HOURS[slot] * 3600
+            created = min(starts_at - rng.uniform(3600, 14 * 86400), self.now - rng.uniform(60, 3600))
+
+            roll = rng.random()
+            if day < today_offset:
+                status = 'completed' if roll < 0.8 else 'cancelled'
+            elif day == today_offset:
+                status = 'confirmed' if starts_at > self.now else ('in_progress' if roll < 0.5 else 'completed')
+            else:
+                status = 'pending' if roll < 0.3 else ('confirmed' if roll < 0.9 else 'cancelled')
+
+            confirmed = completed = None
+            rating = None
+            updated = created
+            if status in ('confirmed', 'in_progress', 'completed') or (status == 'cancelled' and roll > 0.9):
+                confirmed = min(created + rng.uniform(120, 7200), self.now)
+                updated = confirmed
+            if status == 'completed':
+                completed = min(starts_at + hours * 3600, self.now)
+                updated = completed
+                completed_count[service] += 1
+                if rng.random() < 0.65:
+                    rating = self._weighted(RATING_WEIGHTS) + 1
+                    rating_sum[service] += rating
+                    rating_count[service] += 1
+            elif status == 'cancelled':
+                updated = min(max(updated, created) + rng.uniform(600, 86400), self.now)
+
+            booking_uuid = self._uuid_value(self._uuid())
+            booking_rows.append((
+                booking_id, booking_uuid, rng.choice(self.customer_ids), self.service_ids[service],
+                day_values[day], slot_values[slot], hours, status, amount,
+                '1 Seed Street', '9000000000', rating, self._datetime(created), self._datetime(updated),
+                self._datetime(confirmed) if confirmed else None, self._datetime(completed) if completed else None,
+            ))
+
+            # Confirmed work was paid; a cancellation after payment was refunded
+            payment_status = None
+            if confirmed:
+                payment_status = 'refunded' if status == 'cancelled' else 'success'
+            elif status == 'pending' and roll < 0.05:
+                payment_status = 'processing'
+            if payment_status:
+                method = METHODS[self._weighted(METHOD_WEIGHTS)]
+                payment_uuid = self._uuid()
+                paid_at = self._datetime(confirmed) if confirmed else None
+                payment_rows.append((
+                    payment_id, self._uuid_value(payment_uuid), booking_id, method, payment_status, amount,
+                    f'SEED-{payment_uuid.hex[:16]}' if confirmed else None,
+                    self._datetime(created + 60), paid_at, self._datetime(created + 60),
+                    self._datetime(updated),
+                ))
+                if confirmed:
+                    provider = self.service_provider[service]
+                    entries = [('earning', amount, confirmed)]
+                    if payment_status == 'refunded':
+                        entries.append(('refund', -amount, updated))
+                    for entry_type, entry_amount, at in entries:
+                        entry_day = bisect(midnights, at) - 1
+                        entry_date = first_day + timedelta(days=entry_day) if entry_day >= 0 else \
+                            timezone.localtime(datetime.fromtimestamp(at, tz=dt_timezone.utc)).date()
+                        ledger_rows.append((
+                            provider, payment_id, entry_type, entry_amount, self.adapt_date(entry_date),
+                            self._uuid_value(payment_uuid), booking_uuid, self.service_name[service],
+                            method, self._datetime(at),
+                        ))
+                        rollup = rollups.setdefault((provider, entry_date), [Decimal(0), Decimal(0), 0])
+                        rollup[0 if entry_type == 'earning' else 1] += abs(entry_amount)
+                        rollup[2] += 1
+                payment_id += 1
+            booking_id += 1
+
+            if len(booking_rows) >= options['chunk_size']:
+                # Parents first, so immediate foreign key checks pass
+                bookings.write(booking_rows)
+                payments.write(payment_rows)
+                ledger.write(ledger_rows)
+                booking_rows, payment_rows, ledger_rows = [], [], []
+
+        bookings.write(booking_rows)
+        payments.write(payment_rows)
+        ledger.write(ledger_rows)
+        if skipped:
+            self.stderr.write(f'{skipped} booking(s) skipped: the busiest calendars are full')
+
+        rollup_writer = TableWriter(self.loader, ProviderDailyEarnings, [
+            'provider_id', 'date', 'gross_amount', 'refunded_amount', 'net_amount', 'entry_count', 'updated_at',
+        ])
+        stamp = self._datetime(self.now)
+        rows = [
+            (provider, self.adapt_date(entry_date), gross, refunded, gross - refunded, count, stamp)
+            for (provider, entry_date), (gross, refunded, count) in rollups.items()
+        ]
+        for start in range(0, len(rows), options['chunk_size']):
+            rollup_writer.write(rows[start:start + options['chunk_size']])
+
+        # Counters Booking.save() would have maintained
+        self.loader.put(self._update_service_counters, [
+            (completed_count[index], round(Decimal(rating_sum[index]) / rating_count[index], 2) if rating_count[index] else Decimal(0), service_id)
+            for index, service_id in enumerate(self.service_ids)
+            if completed_count[index]
+        ])
+        return [bookings, payments, ledger, rollup_writer]
@@ -0,0 +1,297 @@
+"""
+Request metrics in the Prometheus text format.
+
+Every thread writes to its own shard, so recording takes no lock; shards are
+only merged when the metrics are read. With ``METRICS_MULTIPROC_DIR`` set,
+each worker process also dumps its totals to ``<dir>/metrics_<pid>.json`` at
+most every ``METRICS_FLUSH_INTERVAL`` seconds, and the endpoint merges the
+files of all workers (point it at a directory that is emptied on deploy).
+
+Database time is measured by an execute wrapper added to every connection,
+and serializer time by timing the outermost ``serializer.data`` access of a
+request. Both report into per-request stats held in a context variable, so
+they also cover queries run in ``sync_to_async`` threads of async views.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HELP = {
+    'http_request_duration_seconds': ('histogram', 'Time to produce a response, by URL name'),
+    'http_requests_total': ('counter', 'Responses by URL name, method and status'),
+    'http_requests_in_flight': ('gauge', 'Requests currently being handled'),
+    'db_queries_per_request': ('histogram', 'Database queries per request, by URL name'),
+    'db_query_duration_seconds': ('histogram', 'Database time per request, by URL name'),
+    'serializer_duration_seconds': ('histogram', 'Serializer time per request, by URL name'),
+    'auth_user_cache_requests_total': ('counter', 'Authentication user cache lookups by result'),
+    'auth_user_cache_hit_ratio': ('gauge', 'Share of authentication user cache lookups that hit'),
+    'throttle_decisions_total': ('counter', 'Throttle checks by scope and outcome'),
+}
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class Shard:
+    """Metrics recorded by one thread; only that thread writes to it"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+
+class Registry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = Shard()
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def observe(self, name, labels, value, buckets):
+        histograms = self.shard().histograms
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            # One slot per bucket, one for +Inf, then the sum
+            histogram = histograms[key] = [0] * (len(buckets) + 2)
+        histogram[bisect_left(buckets, value)] += 1
+        histogram[-1] += value
+
+    def inc(self, name, labels, amount=1):
+        counters = self.shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def add_gauge(self, name, labels, amount):
+        gauges = self.shard().gauges
+        key = (name, labels)
+        gauges[key] = gauges.get(key, 0) + amount
+
+    def snapshot(self):
+        """Merged ``{'histograms', 'counters', 'gauges'}`` of this process"""
+        with self._lock:
+            shards = list(self._shards)
+        merged = {'histograms': {}, 'counters': {}, 'gauges': {}}
+        for shard in shards:
+            for key, values in list(shard.histograms.items()):
+                total = merged['histograms'].get(key)
+                merged['histograms'][key] = list(values) if total is None else [a + b for a, b in zip(total, values)]
+            for kind in ('counters', 'gauges'):
+                for key, value in list(getattr(shard, kind).items()):
+                    merged[kind][key] = merged[kind].get(key, 0) + value
+        _collect_process_metrics(merged['counters'])
+        return merged
+
+
+registry = Registry()
+
+
+def _collect_process_metrics(counters):
+    """Add counters kept elsewhere in the process"""
+    from apps.users.authentication import user_cache
+    from .throttling import throttle_metrics
+
+    counters[('auth_user_cache_requests_total', (('result', 'hit'),))] = user_cache.hits
+    counters[('auth_user_cache_requests_total', (('result', 'miss'),))] = user_cache.misses
+    for (scope, outcome), count in throttle_metrics().items():
+        counters[('throttle_decisions_total', (('scope', scope), ('outcome', outcome)))] = count
+
+
+def query_timer(execute, sql, params, many, context):
+    """Execute wrapper counting queries and their time for the current request"""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver; fires again on every reconnect"""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def _timed_data(data_property):
+    fget = data_property.fget
+
+    def data(self):
+        stats = _request_stats.get()
+        if stats is None or stats.serializing:
+            return fget(self)
+        stats.serializing = True
+        started = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            stats.serializing = False
+            stats.serializer_time += time.perf_counter() - started
+    return property(data, doc=data_property.__doc__)
+
+
+def instrument_serializers():
+    """Time ``Serializer.data`` and ``ListSerializer.data``"""
+    from rest_framework.serializers import ListSerializer, Serializer
+
+    for serializer_class in (Serializer, ListSerializer):
+        serializer_class.data = _timed_data(serializer_class.__dict__['data'])
+
+
+def begin_request():
+    registry.add_gauge('http_requests_in_flight', (), 1)
+    return _request_stats.set(RequestStats()), time.perf_counter()
+
+
+def end_request(request, response, token, started):
+    elapsed = time.perf_counter() - started
+    stats = _request_stats.get()
+    _request_stats.reset(token)
+    registry.add_gauge('http_requests_in_flight', (), -1)
+
+    match = request.resolver_match
+    # Unmatched paths share one label to keep cardinality bounded
+    route = (('route', (match.url_name or match.view_name) if match else 'unmatched'),)
+    status = response.status_code if response is not None else 500
+    registry.observe('http_request_duration_seconds', route + (('method', request.method),), elapsed, LATENCY_BUCKETS)
+    registry.inc('http_requests_total', route + (('method', request.method), ('status', str(status))))
+    registry.observe('db_queries_per_request', route, stats.queries, QUERY_COUNT_BUCKETS)
+    registry.observe('db_query_duration_seconds', route, stats.db_time, LATENCY_BUCKETS)
+    if stats.serializer_time:
+        registry.observe('serializer_duration_seconds', route, stats.serializer_time, LATENCY_BUCKETS)
+    _maybe_flush()
+
+
+_last_flush = 0.0
+
+
+def _maybe_flush():
+    global _last_flush
+    if settings.METRICS_MULTIPROC_DIR and time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        _last_flush = time.monotonic()
+        flush()
+
+
+def _encode(snapshot):
+    return {kind: [[name, labels, value] for (name, labels), value in values.items()] for kind, values in snapshot.items()}
+
+
+def flush():
+    """Write this process's totals to ``METRICS_MULTIPROC_DIR``"""
+    path = os.path.join(settings.METRICS_MULTIPROC_DIR, f'metrics_{os.getpid()}.json')
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'pid': os.getpid(), **_encode(registry.snapshot())}, f)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Totals of every worker (or just this one without ``METRICS_MULTIPROC_DIR``)"""
+    if not settings.METRICS_MULTIPROC_DIR:
+        return registry.snapshot()
+
+    flush()
+    merged = {'histograms': {}, 'counters': {}, 'gauges': {}}
+    for filename in os.listdir(settings.METRICS_MULTIPROC_DIR):
+        if not (filename.startswith('metrics_') and filename.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(settings.METRICS_MULTIPROC_DIR, filename)) as f:
+                dump = json.load(f)
+        except (OSError, ValueError):
+            continue
+        # Counters of exited workers still count; their gauges do not
+        kinds = ('histograms', 'counters', 'gauges') if _pid_alive(dump['pid']) else ('histograms', 'counters')
+        for kind in kinds:
+            for name, labels, value in dump[kind]:
+                key = (name, tuple(tuple(label) for label in labels))
+                if kind == 'histograms':
+                    total = merged[kind].get(key)
+                    merged[kind][key] = value if total is None else [a + b for a, b in zip(total, value)]
+                else:
+                    merged[kind][key] = merged[kind].get(key, 0) + value
+    return merged
+
+
+def _format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _bucket_bounds(name):
+    return QUERY_COUNT_BUCKETS if name == 'db_queries_per_request' else LATENCY_BUCKETS
+
+
+def render(snapshot):
+    """Prometheus text exposition (format 0.0.4) of a snapshot"""
+    hits = snapshot['counters'].get(('auth_user_cache_requests_total', (('result', 'hit'),)), 0)
+    misses = snapshot['counters'].get(('auth_user_cache_requests_total', (('result', 'miss'),)), 0)
+    if hits + misses:
+        snapshot['gauges'][('auth_user_cache_hit_ratio', ())] = hits / (hits + misses)
+
+    series = {}
+    for kind in ('histograms', 'counters', 'gauges'):
+        for (name, labels), value in snapshot[kind].items():
+            series.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(series):
+        metric_type, help_text = HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, value in sorted(series[name]):
+            if metric_type != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(_bucket_bounds(name) + ('+Inf',), value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {value[-1]}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
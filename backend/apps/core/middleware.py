@@ -0,0 +1,353 @@
+import gzip
+import json
+import os
+import brotli
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError
+from apps.users.authentication import aauthenticate_request, authenticate_request
+from . import metrics, profiling, tracing
+from .routers import begin_request, end_request
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# HTML is left out: its pages carry CSRF tokens next to reflected input, which
+# compression would leak to a BREACH attacker
+COMPRESSIBLE_TYPES = ('application/json', 'text/plain', 'text/csv')
+
+
+class ReplicaRoutingMiddleware:
+    """Enable replica reads for safe requests of clients not pinned to the primary"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = begin_request(self.use_replicas(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            state = end_request(token)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        token = begin_request(self.use_replicas(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = end_request(token)
+        return self.process_response(state, response)
+
+    def use_replicas(self, request):
+        return request.method in SAFE_METHODS and not self.pinned(request)
+
+    def pinned(self, request):
+        # Cross-origin clients do not send the cookie; they echo the header instead
+        signer = signing.TimestampSigner(salt=settings.REPLICA_PIN_COOKIE)
+        header = 'HTTP_' + settings.REPLICA_PIN_HEADER.upper().replace('-', '_')
+        for value in (request.COOKIES.get(settings.REPLICA_PIN_COOKIE), request.META.get(header)):
+            if value:
+                try:
+                    signer.unsign(value, max_age=settings.REPLICA_PIN_SECONDS)
+                    return True
+                except signing.BadSignature:
+                    pass
+        return False
+
+    def process_response(self, state, response):
+        if state.wrote:
+            # The signature carries a timestamp; the pin lapses server-side after max_age
+            pin = signing.TimestampSigner(salt=settings.REPLICA_PIN_COOKIE).sign('1')
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                pin,
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+            response[settings.REPLICA_PIN_HEADER] = pin
+        return response
+
+
+class MetricsMiddleware:
+    """Record latency, query and serializer metrics for every request"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, started = metrics.begin_request()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(request, response, token, started)
+        return response
+
+    async def __acall__(self, request):
+        token, started = metrics.begin_request()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(request, response, token, started)
+        return response
+
+
+class ProfilerMiddleware:
+    """Profile requests of staff users that ask for it (outermost; see ``apps.core.profiling``)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        options = profiling.requested_options(request)
+        if options is None:
+            return self.get_response(request)
+        user = authenticate_request(request)
+        if not self.may_profile(user):
+            return self.get_response(request)
+        try:
+            profile = profiling.begin(options, user)
+        except profiling.ProfileUnavailable as e:
+            return self.unavailable(self.get_response(request), e)
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            artifact = profiling.end(profile, request, response)
+        return self.process_response(options, artifact, response)
+
+    async def __acall__(self, request):
+        options = profiling.requested_options(request)
+        if options is None:
+            return await self.get_response(request)
+        user = await aauthenticate_request(request)
+        if not self.may_profile(user):
+            return await self.get_response(request)
+        try:
+            profile = profiling.begin(options, user)
+        except profiling.ProfileUnavailable as e:
+            return self.unavailable(await self.get_response(request), e)
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            artifact = profiling.end(profile, request, response)
+        return self.process_response(options, artifact, response)
+
+    def may_profile(self, user):
+        return user is not None and user.is_active and user.is_staff
+
+    def unavailable(self, response, error):
+        response['X-Profile-Error'] = str(error)
+        return response
+
+    def process_response(self, options, artifact, response):
+        if 'download' in options:
+            response = HttpResponse(json.dumps(artifact, default=str), content_type='application/json')
+            response['Content-Disposition'] = f'attachment; filename="profile-{artifact["id"]}.json"'
+        response['X-Profile-Id'] = artifact['id']
+        response['X-Profile-Url'] = reverse('profile-detail', args=[artifact['id']])
+        return response
+
+
+class TracingMiddleware:
+    """Trace every request and keep the slow ones (outermost; see ``apps.core.tracing``)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.TRACE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = tracing.begin_request()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            tracing.end_request(request, response, token)
+        return response
+
+    async def __acall__(self, request):
+        token = tracing.begin_request()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            tracing.end_request(request, response, token)
+        return response
+
+
+class TraceViewMiddleware:
+    """Time the view for the request's trace (innermost, paired with ``TracingMiddleware``)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.TRACE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = tracing.begin_view()
+        try:
+            return self.get_response(request)
+        finally:
+            tracing.end_view(request, started)
+
+    async def __acall__(self, request):
+        started = tracing.begin_view()
+        try:
+            return await self.get_response(request)
+        finally:
+            tracing.end_view(request, started)
+
+
+def accepted_encodings(header):
+    """Content codings from an Accept-Encoding header, minus those with q=0"""
+    encodings = set()
+    for item in header.lower().split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip()
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(coding)
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Brotli or gzip compression of responses of at least ``COMPRESSION_MIN_SIZE`` bytes.
+
+    Brotli is preferred when the client accepts both. Streaming responses
+    (event streams, CSV exports) are left alone so they are not buffered.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if 'br' in encodings:
+            encoding = 'br'
+            content = brotli.compress(response.content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        elif 'gzip' in encodings:
+            encoding = 'gzip'
+            content = gzip.compress(response.content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+        else:
+            return response
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        # The representation changed, so a strong validator no longer matches it
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class SnapshotWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also serves the catalog snapshots rewritten at runtime.
+
+    Collected static files are indexed once at startup as usual. Files under
+    ``STATIC_ROOT/<CATALOG_SNAPSHOT_DIR>/`` are looked up on every request
+    instead (a few ``stat`` calls), so rebuilt snapshots and their ``.br``/
+    ``.gz`` variants are served with current sizes and validators.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.snapshot_prefix = f'{self.static_prefix}{settings.CATALOG_SNAPSHOT_DIR}/'
+        self.snapshot_root = os.path.join(os.path.abspath(settings.STATIC_ROOT), settings.CATALOG_SNAPSHOT_DIR, '')
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.snapshot_prefix):
+            static_file = self.find_snapshot(request.path_info)
+            if static_file is not None:
+                return self.serve(static_file, request)
+            return self.get_response(request)
+        return super().__call__(request)
+
+    def find_snapshot(self, url):
+        if not self.url_is_canonical(url) or url.endswith('/'):
+            return None
+        path = os.path.join(self.snapshot_root, url[len(self.snapshot_prefix):])
+        try:
+            return self.find_file_at_path(path, url)
+        except MissingFileError:
+            return None
@@ -0,0 +1,304 @@
+"""
+On-demand profiling of single requests for staff users.
+
+A staff user adds ``X-Profile: <options>`` or ``?_profile=<options>`` to any
+request; ``options`` is a comma-separated list of:
+
+* ``cprofile`` (the default, also ``1``): deterministic profile of every
+  call, with the top functions by cumulative time and a ``.prof`` file
+  for ``pstats``/snakeviz,
+* ``sample``: a stack sample of the request thread every
+  ``PROFILE_SAMPLE_INTERVAL`` seconds, as a call tree and in the collapsed
+  format flame graph tools read; much lower overhead than ``cprofile``,
+* ``alloc``: top allocation sites and peak traced memory (``tracemalloc``;
+  slows the request down considerably),
+* ``download``: answer with the profile itself instead of the response.
+
+Every profile also lists the request's SQL statements. It is stored under
+``PROFILE_DIR`` (the newest ``PROFILE_MAX_FILES`` are kept) and the response
+carries ``X-Profile-Id`` and ``X-Profile-Url``; staff download stored
+profiles from ``/api/core/profiles/``.
+
+Profiles are rate-limited per user (``PROFILE_RATE``) and only one runs at
+a time per process, since profilers and tracemalloc are process-wide; a
+profile that cannot run is reported in ``X-Profile-Error``. Requests without
+the flag are not looked at beyond checking for it, and requests of anyone
+but active staff are served as if it was absent. Under ASGI, the profile
+covers whatever else the event loop ran at the same time.
+"""
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.utils import timezone
+from .throttling import get_store
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAMETER = '_profile'
+PROFILE_ID = re.compile(r'[0-9a-f]{32}')
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_lock = threading.Lock()
+_queries = contextvars.ContextVar('profile_queries', default=None)
+
+
+class ProfileUnavailable(Exception):
+    """The profile of a request cannot run; the message goes in ``X-Profile-Error``"""
+
+
+def requested_options(request):
+    """Options of a profile request, or None when the request did not ask for one"""
+    value = request.META.get(HEADER) or request.GET.get(QUERY_PARAMETER)
+    if not value:
+        return None
+    options = {option.strip().lower() for option in value.split(',') if option.strip()}
+    if not options & {'cprofile', 'sample'}:
+        options.add('cprofile')
+    return options
+
+
+def check_rate(user):
+    limit, _, period = settings.PROFILE_RATE.partition('/')
+    allowed, wait = get_store().hit(f'profile:{user.pk}', int(limit), RATE_PERIODS[period[0]])
+    if not allowed:
+        raise ProfileUnavailable(f'rate limited, retry in {int(wait) + 1}s')
+
+
+def profile_queries(execute, sql, params, many, context):
+    """Execute wrapper listing statements of the request being profiled"""
+    queries = _queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.append({
+            'db': context['connection'].alias,
+            'sql': sql,
+            'many': many,
+            'duration_ms': round((time.perf_counter() - started) * 1e3, 3),
+        })
+
+
+def install_query_profiler(sender, connection, **kwargs):
+    """``connection_created`` receiver; fires again on every reconnect"""
+    if profile_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_queries)
+
+
+class StackSampler(threading.Thread):
+    """Counts the stacks of one thread, sampled at a fixed interval"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename}:{frame.f_lineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def call_tree(self):
+        root = {'name': 'request', 'samples': 0, 'children': {}}
+        for stack, count in self.stacks.items():
+            node = root
+            node['samples'] += count
+            for name in stack:
+                node = node['children'].setdefault(name, {'name': name, 'samples': 0, 'children': {}})
+                node['samples'] += count
+
+        def listed(node):
+            children = sorted(node['children'].values(), key=lambda child: child['samples'], reverse=True)
+            return {'name': node['name'], 'samples': node['samples'], 'children': [listed(child) for child in children]}
+        return listed(root)
+
+    def collapsed(self):
+        return [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+
+
+def _function_label(function):
+    filename, lineno, name = function
+    return f'{name} ({filename}:{lineno})'
+
+
+class RequestProfile:
+    """Profilers running for one request"""
+
+    def __init__(self, options, user):
+        self.options = options
+        self.user = user
+        self.id = uuid.uuid4().hex
+        self.profiler = cProfile.Profile() if 'cprofile' in options else None
+        self.sampler = None
+        self.token = None
+
+    def start(self):
+        self.token = _queries.set([])
+        if 'alloc' in self.options:
+            tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+        if self.profiler is not None:
+            self.profiler.enable()
+        if 'sample' in self.options:
+            self.sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL)
+            self.sampler.start()
+        self.started = time.perf_counter()
+
+    def stop(self, request, response):
+        elapsed = time.perf_counter() - self.started
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.profiler is not None:
+            self.profiler.disable()
+        allocations = None
+        if 'alloc' in self.options:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            allocations = self.allocation_summary(snapshot, peak)
+        queries = _queries.get()
+        _queries.reset(self.token)
+
+        artifact = {
+            'id': self.id,
+            'timestamp': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code if response is not None else 500,
+            'user_id': self.user.pk,
+            'options': sorted(self.options),
+            'duration_ms': round(elapsed * 1e3, 3),
+            'queries': {
+                'count': len(queries),
+                'total_ms': round(sum(query['duration_ms'] for query in queries), 3),
+                'statements': queries,
+            },
+        }
+        if self.profiler is not None:
+            artifact['cprofile'] = self.top_functions()
+        if self.sampler is not None:
+            artifact['samples'] = {
+                'interval': settings.PROFILE_SAMPLE_INTERVAL,
+                'call_tree': self.sampler.call_tree(),
+                'collapsed': self.sampler.collapsed(),
+            }
+        if allocations is not None:
+            artifact['allocations'] = allocations
+        return artifact
+
+    def top_functions(self):
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                'function': _function_label(function),
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'tottime_ms': round(tottime * 1e3, 3),
+                'cumtime_ms': round(cumtime * 1e3, 3),
+            }
+            for function, (primitive_calls, calls, tottime, cumtime, _) in rows[:settings.PROFILE_TOP_FUNCTIONS]
+        ]
+
+    def allocation_summary(self, snapshot, peak):
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        statistics = snapshot.statistics('lineno')
+        return {
+            'peak_bytes': peak,
+            'retained_bytes': sum(stat.size for stat in statistics),
+            'top': [
+                {'site': str(stat.traceback), 'bytes': stat.size, 'blocks': stat.count}
+                for stat in statistics[:settings.PROFILE_TOP_FUNCTIONS]
+            ],
+        }
+
+    def save(self, artifact):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(settings.PROFILE_DIR, f'{self.id}.json'), 'w') as f:
+            json.dump(artifact, f, default=str)
+        if self.profiler is not None:
+            self.profiler.dump_stats(os.path.join(settings.PROFILE_DIR, f'{self.id}.prof'))
+        prune()
+
+
+def begin(options, user):
+    """Start profiling a request of a staff user; raises ProfileUnavailable"""
+    check_rate(user)
+    if not _lock.acquire(blocking=False):
+        raise ProfileUnavailable('another profile is running in this process')
+    profile = RequestProfile(options, user)
+    try:
+        profile.start()
+    except BaseException:
+        _lock.release()
+        raise
+    return profile
+
+
+def end(profile, request, response):
+    try:
+        artifact = profile.stop(request, response)
+    finally:
+        _lock.release()
+    profile.save(artifact)
+    return artifact
+
+
+def path_for(profile_id, extension):
+    """Path of a stored profile file, or None for an invalid id"""
+    if not PROFILE_ID.fullmatch(profile_id):
+        return None
+    return os.path.join(settings.PROFILE_DIR, f'{profile_id}.{extension}')
+
+
+def stored_profiles():
+    """``(id, modified, has_pstats)`` of stored profiles, newest first"""
+    try:
+        names = os.listdir(settings.PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        profile_id, _, extension = name.partition('.')
+        if extension == 'json' and PROFILE_ID.fullmatch(profile_id):
+            try:
+                modified = os.path.getmtime(os.path.join(settings.PROFILE_DIR, name))
+            except FileNotFoundError:
+                continue
+            profiles.append((profile_id, modified, f'{profile_id}.prof' in names))
+    return sorted(profiles, key=lambda profile: profile[1], reverse=True)
+
+
+def prune():
+    for profile_id, _, _ in stored_profiles()[settings.PROFILE_MAX_FILES:]:
+        for extension in ('json', 'prof'):
+            try:
+                os.unlink(path_for(profile_id, extension))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,87 @@
+"""
+JSON rendering and parsing with orjson.
+
+``FastJSONRenderer`` produces the same bytes as DRF's ``JSONRenderer`` with
+the default settings (compact separators, unescaped unicode, U+2028/U+2029
+escaped). Datetimes, ``Decimal`` and the other types orjson would format
+differently go through DRF's encoder. Data orjson rejects (integers over 64
+bits, non-string keys) and requests for indented output fall back to DRF's
+renderer. Known differences: floats in exponent form are written ``1e16``
+instead of ``1e+16``, and NaN/Infinity floats render as ``null`` where DRF
+raises. Serializer output never contains either (decimals are strings).
+
+``FastJSONParser`` hands bodies that are not UTF-8 or contain integers too
+large for orjson to DRF's parser, so the parsed data is always the same.
+
+With ``JSON_COMPAT_CHECK`` enabled both implementations run on every call;
+a difference is logged and DRF's result is used. Run the test suite or a
+staging environment in this mode before relying on the fast path.
+"""
+import codecs
+import io
+import logging
+import re
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+# orjson parses integers beyond 64 bits as floats
+LONG_NUMBER = re.compile(rb'\d{19}')
+LINE_SEPARATOR, PARAGRAPH_SEPARATOR = '\u2028'.encode(), '\u2029'.encode()
+
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` backed by orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            rendered = orjson.dumps(data, default=_default, option=OPTIONS)
+        except TypeError:
+            # JSONEncodeError is a TypeError; DRF either handles the data or raises its own error
+            return super().render(data, accepted_media_type, renderer_context)
+        if LINE_SEPARATOR in rendered or PARAGRAPH_SEPARATOR in rendered:
+            rendered = rendered.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+
+        if settings.JSON_COMPAT_CHECK:
+            expected = super().render(data, accepted_media_type, renderer_context)
+            if rendered != expected:
+                logger.warning('FastJSONRenderer output differs from JSONRenderer: %r != %r', rendered, expected)
+                return expected
+        return rendered
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` backed by orjson"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_NUMBER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Reports the error the way DRF does, or parses what orjson refuses (e.g. 1e400)
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
+        if settings.JSON_COMPAT_CHECK:
+            expected = super().parse(io.BytesIO(body), media_type, parser_context)
+            if data != expected:
+                logger.warning('FastJSONParser result differs from JSONParser: %r != %r', data, expected)
+                return expected
+        return data
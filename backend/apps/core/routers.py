@@ -0,0 +1,126 @@
+"""
+Primary/replica database routing.
+
+Replicas are only used where it is known to be safe: ``ReplicaRoutingMiddleware``
+enables them for GET/HEAD/OPTIONS requests. Everything else (writes,
+management commands, workers, reads inside a transaction) stays on
+``default``. Once a request writes, the rest of it reads from the primary,
+and the client is pinned to the primary for ``REPLICA_PIN_SECONDS`` so it
+reads its own writes on the next requests too.
+"""
+import contextvars
+import itertools
+import threading
+import time
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class RoutingState:
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+_routing_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+def begin_request(use_replicas):
+    """Start routing for a request; returns a token for ``end_request``"""
+    return _routing_state.set(RoutingState(use_replicas))
+
+
+def end_request(token):
+    state = _routing_state.get()
+    _routing_state.reset(token)
+    return state
+
+
+def pin_primary():
+    """Send the rest of the current request's reads to the primary"""
+    state = _routing_state.get()
+    if state is not None:
+        state.use_replicas = False
+
+
+class ReplicaHealth:
+    """Tracks which replicas are reachable and within ``REPLICA_MAX_LAG``"""
+
+    LAG_QUERIES = {
+        'postgresql': (
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        ),
+        'mysql': "SHOW REPLICA STATUS",
+    }
+
+    def __init__(self):
+        self._healthy = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        if now - self._checked_at.get(alias, float('-inf')) >= settings.REPLICA_LAG_CHECK_INTERVAL:
+            with self._lock:
+                if now - self._checked_at.get(alias, float('-inf')) >= settings.REPLICA_LAG_CHECK_INTERVAL:
+                    self._checked_at[alias] = now
+                    lag = self.replica_lag(alias)
+                    self._healthy[alias] = lag is not None and lag <= settings.REPLICA_MAX_LAG
+        return self._healthy.get(alias, False)
+
+    def replica_lag(self, alias):
+        """Replication lag in seconds, or None when the replica cannot be checked"""
+        connection = connections[alias]
+        query = self.LAG_QUERIES.get(connection.vendor)
+        if query is None:
+            # No replication to measure (e.g. SQLite stand-ins)
+            return 0
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                row = cursor.fetchone()
+                if connection.vendor == 'mysql':
+                    if row is None:
+                        return None
+                    columns = [column[0] for column in cursor.description]
+                    row = [dict(zip(columns, row)).get('Seconds_Behind_Source')]
+        except Exception:
+            return None
+        return float(row[0]) if row and row[0] is not None else None
+
+
+class PrimaryReplicaRouter:
+    def __init__(self):
+        self.replicas = list(settings.DATABASE_REPLICAS)
+        self.health = ReplicaHealth()
+        self._next = itertools.count()
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.use_replicas or not self.replicas:
+            return DEFAULT_DB_ALIAS
+        # Reads inside a primary transaction must see its uncommitted writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            alias = self.replicas[(start + offset) % len(self.replicas)]
+            if self.health.is_healthy(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+            state.use_replicas = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,112 @@
+import time
+from unittest import mock
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from apps.tasks.models import Task
+from .middleware import ReplicaRoutingMiddleware
+from .routers import ReplicaHealth
+
+# A second SQLite database standing in for a replica; the test runner creates it
+REPLICA = 'replica_test'
+if REPLICA not in connections.settings:
+    connections.settings[REPLICA] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: {'ENGINE': 'django.db.backends.sqlite3'},
+        REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+    })[REPLICA]
+
+
+def read_names(request):
+    """A view reporting which database its reads went to"""
+    return HttpResponse(','.join(Task.objects.order_by('name').values_list('name', flat=True)))
+
+
+def write_then_read(request):
+    Task.objects.create(name='written')
+    return read_names(request)
+
+
+@override_settings(
+    DATABASE_REPLICAS=[REPLICA],
+    DATABASE_ROUTERS=['apps.core.routers.PrimaryReplicaRouter'],
+    REPLICA_LAG_CHECK_INTERVAL=0,
+)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Migrations only run on the primary; give the replica the one table read here
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Task)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connections[REPLICA].schema_editor() as editor:
+            editor.delete_model(Task)
+        super().tearDownClass()
+
+    def setUp(self):
+        # flush skips the replica, where nothing migrates
+        Task.objects.using(REPLICA).all().delete()
+        Task.objects.using(DEFAULT_DB_ALIAS).create(name='primary')
+        Task.objects.using(REPLICA).create(name='replica')
+        self.factory = RequestFactory()
+
+    def call(self, view, request):
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_safe_read_goes_to_replica(self):
+        response = self.call(read_names, self.factory.get('/'))
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn('X-Primary-Pin', response)
+
+    def test_unsafe_method_reads_from_primary(self):
+        response = self.call(read_names, self.factory.post('/'))
+        self.assertEqual(response.content, b'primary')
+
+    def test_read_outside_request_uses_primary(self):
+        self.assertEqual(list(Task.objects.values_list('name', flat=True)), ['primary'])
+
+    def test_read_inside_transaction_uses_primary(self):
+        def view(request):
+            with transaction.atomic():
+                return read_names(request)
+        self.assertEqual(self.call(view, self.factory.get('/')).content, b'primary')
+
+    def test_write_pins_rest_of_request_and_client(self):
+        response = self.call(write_then_read, self.factory.get('/'))
+        self.assertEqual(response.content, b'primary,written')
+        self.assertIn('primary_pin', response.cookies)
+        self.assertEqual(response['X-Primary-Pin'], response.cookies['primary_pin'].value)
+
+    def test_pin_cookie_sends_reads_to_primary(self):
+        pin = self.call(write_then_read, self.factory.get('/')).cookies['primary_pin'].value
+        request = self.factory.get('/')
+        request.COOKIES['primary_pin'] = pin
+        self.assertEqual(self.call(read_names, request).content, b'primary,written')
+
+    def test_pin_header_sends_reads_to_primary(self):
+        # Cross-origin clients do not send the cookie
+        pin = self.call(write_then_read, self.factory.get('/'))['X-Primary-Pin']
+        response = self.call(read_names, self.factory.get('/', HTTP_X_PRIMARY_PIN=pin))
+        self.assertEqual(response.content, b'primary,written')
+
+    def test_forged_or_expired_pin_is_ignored(self):
+        forged = self.factory.get('/', HTTP_X_PRIMARY_PIN='1:forged:signature')
+        self.assertEqual(self.call(read_names, forged).content, b'replica')
+        pin = self.call(write_then_read, self.factory.get('/'))['X-Primary-Pin']
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 60):
+            response = self.call(read_names, self.factory.get('/', HTTP_X_PRIMARY_PIN=pin))
+        self.assertEqual(response.content, b'replica')
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        with override_settings(REPLICA_MAX_LAG=2), mock.patch.object(ReplicaHealth, 'replica_lag', return_value=10):
+            response = self.call(read_names, self.factory.get('/'))
+        self.assertEqual(response.content, b'primary')
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with mock.patch.object(ReplicaHealth, 'replica_lag', return_value=None):
+            response = self.call(read_names, self.factory.get('/'))
+        self.assertEqual(response.content, b'primary')
@@ -0,0 +1,150 @@
+"""
+Per-scope request throttling.
+
+Each scope (``catalog``, ``auth``, ``booking_create``, ``payments``) takes
+its rate from ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``. Counters live in
+the store named by ``THROTTLE_STORE``: ``LocalRateStore`` keeps GCRA state in
+process memory (no I/O per request, limits apply per worker), while
+``CacheRateStore`` keeps sliding-window counters in Django's cache so a
+shared cache backend enforces one limit across all workers.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LocalRateStore:
+    """Generic cell rate algorithm (GCRA) state in process memory"""
+
+    PRUNE_EVERY = 10000
+
+    def __init__(self):
+        self._tat = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, key, limit, period):
+        """Record a request; returns ``(allowed, seconds_to_wait)``"""
+        interval = period / limit
+        now = time.monotonic()
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            allow_at = tat - period + interval
+            if now < allow_at:
+                return False, allow_at - now
+            self._tat[key] = tat + interval
+            self._hits += 1
+            if self._hits % self.PRUNE_EVERY == 0:
+                self._prune(now)
+        return True, 0
+
+    def _prune(self, now):
+        # Keys whose theoretical arrival time has passed hold no state
+        for key in [key for key, tat in self._tat.items() if tat <= now]:
+            del self._tat[key]
+
+
+class CacheRateStore:
+    """Sliding-window counters in a Django cache, shared between workers"""
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE]
+
+    def hit(self, key, limit, period):
+        now = time.time()
+        window = int(now // period)
+        elapsed = now - window * period
+        current_key = f"throttle:{key}:{window}"
+        previous_key = f"throttle:{key}:{window - 1}"
+
+        counts = self.cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+
+        # The previous window counts in proportion to how much of it still overlaps
+        if previous * (1 - elapsed / period) + current >= limit:
+            if current >= limit or not previous:
+                return False, period - elapsed
+            return False, max(period * (1 - (limit - current) / previous) - elapsed, 0)
+
+        self.cache.add(current_key, 0, timeout=int(period * 2) + 1)
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr()
+            self.cache.set(current_key, 1, timeout=int(period * 2) + 1)
+        return True, 0
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.THROTTLE_STORE)()
+    return _store
+
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+def throttle_metrics():
+    """Snapshot of ``{(scope, outcome): count}`` for this process"""
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+class ScopedThrottle(SimpleRateThrottle):
+    """Throttle requests of one scope by user id, or client IP when anonymous"""
+
+    # Let authenticated users through untouched
+    anonymous_only = False
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            if self.anonymous_only:
+                return None
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return f"{self.scope}:{ident}"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        allowed, self._wait = get_store().hit(key, self.num_requests, self.duration)
+        with _metrics_lock:
+            _metrics[(self.scope, 'allowed' if allowed else 'throttled')] += 1
+        return allowed
+
+    def wait(self):
+        return math.ceil(self._wait)
+
+
+class CatalogThrottle(ScopedThrottle):
+    scope = 'catalog'
+    anonymous_only = True
+
+
+class AuthThrottle(ScopedThrottle):
+    scope = 'auth'
+
+
+class BookingCreateThrottle(ScopedThrottle):
+    scope = 'booking_create'
+
+
+class PaymentsThrottle(ScopedThrottle):
+    scope = 'payments'
@@ -0,0 +1,279 @@
+"""
+Per-request tracing that keeps the slow requests.
+
+With ``TRACE_ENABLED``, every request collects spans relative to its start:
+
+* ``middleware`` before and after the view (``TracingMiddleware`` is the
+  outermost middleware, ``TraceViewMiddleware`` the innermost),
+* ``view`` for the view itself, including DRF's response rendering,
+* ``sql`` for each statement, with a fingerprint that groups statements
+  differing only in literals and ``IN`` list length,
+* ``serializer`` for the outermost ``serializer.data`` access and
+  ``render`` for the response rendering.
+
+Requests taking at least ``TRACE_SLOW_MS`` are sampled (``TRACE_SAMPLE_RATE``)
+into a per-process ring buffer of ``TRACE_BUFFER_SIZE`` traces; all others
+are dropped when they finish. A sampled trace gets ``EXPLAIN`` output for
+its ``TRACE_EXPLAIN_QUERIES`` slowest SELECT statements, run when the
+response is closed, i.e. after the client got it. With ``TRACE_LOG_FILE``
+set the finished trace is also appended there as one JSON line, which is
+how traces of all workers end up in one place.
+
+Staff can read the buffer of the worker that answers at ``/api/core/traces/``
+and download it as JSON lines from ``/api/core/traces/export/``.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SQL_TEXT_LIMIT = 2000
+EXPLAIN_PREFIXES = {
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+}
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Short hash of a statement with literals and ``IN`` list lengths normalized"""
+    normalized = _WHITESPACE.sub(' ', _LITERALS.sub('?', _IN_LIST.sub('(...)', sql))).strip()
+    return hashlib.md5(normalized.encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+class Trace:
+    """Spans of one request; times are milliseconds from the request start"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_ended = None
+        self.spans = []
+        self.dropped = 0
+        self.active = set()
+        # (duration, alias, sql, params, fingerprint) of SELECTs, the EXPLAIN candidates
+        self.selects = []
+
+    def add(self, kind, name, started, ended, **details):
+        if len(self.spans) >= settings.TRACE_MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append({
+            'kind': kind,
+            'name': name,
+            'start_ms': round((started - self.started) * 1e3, 3),
+            'duration_ms': round((ended - started) * 1e3, 3),
+            **details,
+        })
+
+    def add_query(self, alias, sql, params, many, started, ended):
+        digest = fingerprint(sql)
+        self.add('sql', digest, started, ended, db=alias, sql=sql[:SQL_TEXT_LIMIT], many=many)
+        if not many and sql.lstrip()[:6].upper() == 'SELECT':
+            self.selects.append((ended - started, alias, sql, params, digest))
+
+    def total(self, kind):
+        return round(sum(span['duration_ms'] for span in self.spans if span['kind'] == kind), 3)
+
+    def record(self, request, response, ended):
+        match = request.resolver_match
+        total_ms = round((ended - self.started) * 1e3, 3)
+        view_ms = self.total('view')
+        user = getattr(request, 'user', None)
+        return {
+            'id': uuid.uuid4().hex,
+            'timestamp': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'route': (match.url_name or match.view_name) if match else None,
+            'status': response.status_code if response is not None else 500,
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'total_ms': total_ms,
+            'summary': {
+                'middleware_ms': round(total_ms - view_ms, 3),
+                'view_ms': view_ms,
+                'sql_ms': self.total('sql'),
+                'sql_count': sum(1 for span in self.spans if span['kind'] == 'sql'),
+                'serializer_ms': self.total('serializer'),
+                'render_ms': self.total('render'),
+            },
+            'spans': self.spans,
+            'dropped_spans': self.dropped,
+            'explains': [],
+        }
+
+
+_current = contextvars.ContextVar('trace', default=None)
+
+
+class TraceBuffer:
+    """The most recent sampled traces of this process"""
+
+    def __init__(self):
+        self._traces = None
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            if self._traces is None:
+                self._traces = deque(maxlen=settings.TRACE_BUFFER_SIZE)
+            self._traces.append(record)
+
+    def records(self):
+        """Newest first"""
+        with self._lock:
+            return list(reversed(self._traces or ()))
+
+    def get(self, trace_id):
+        return next((record for record in self.records() if record['id'] == trace_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._traces = None
+
+
+buffer = TraceBuffer()
+_log_lock = threading.Lock()
+
+
+def to_jsonl(records):
+    return ''.join(json.dumps(record, default=str) + '\n' for record in records)
+
+
+def trace_queries(execute, sql, params, many, context):
+    """Execute wrapper adding a span per statement to the current trace"""
+    trace = _current.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        trace.add_query(context['connection'].alias, sql, params, many, started, time.perf_counter())
+
+
+def install_query_tracer(sender, connection, **kwargs):
+    """``connection_created`` receiver; fires again on every reconnect"""
+    if trace_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(trace_queries)
+
+
+def _traced(data_property, kind, name):
+    fget = data_property.fget
+
+    def getter(self):
+        trace = _current.get()
+        if trace is None or kind in trace.active:
+            return fget(self)
+        trace.active.add(kind)
+        started = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            trace.active.discard(kind)
+            trace.add(kind, name(self), started, time.perf_counter())
+    return property(getter, doc=data_property.__doc__)
+
+
+def _serializer_name(serializer):
+    child = getattr(serializer, 'child', None)
+    return f'{type(child).__name__}[]' if child is not None else type(serializer).__name__
+
+
+def instrument():
+    """Trace ``Serializer.data``, ``ListSerializer.data`` and ``Response.rendered_content``"""
+    from rest_framework.response import Response
+    from rest_framework.serializers import ListSerializer, Serializer
+
+    for serializer_class in (Serializer, ListSerializer):
+        serializer_class.data = _traced(serializer_class.__dict__['data'], 'serializer', _serializer_name)
+    Response.rendered_content = _traced(
+        Response.__dict__['rendered_content'], 'render',
+        lambda response: getattr(response, 'accepted_media_type', None) or ''
+    )
+
+
+def begin_request():
+    return _current.set(Trace())
+
+
+def begin_view():
+    return time.perf_counter()
+
+
+def end_view(request, started):
+    trace = _current.get()
+    if trace is None:
+        return
+    ended = time.perf_counter()
+    match = request.resolver_match
+    trace.add('middleware', 'before_view', trace.started, started)
+    trace.add('view', (match.view_name if match else None) or request.path_info, started, ended)
+    trace.view_ended = ended
+
+
+def end_request(request, response, token):
+    ended = time.perf_counter()
+    trace = _current.get()
+    _current.reset(token)
+    if (ended - trace.started) * 1e3 < settings.TRACE_SLOW_MS or random.random() >= settings.TRACE_SAMPLE_RATE:
+        return
+    if trace.view_ended is not None:
+        trace.add('middleware', 'after_view', trace.view_ended, ended)
+    record = trace.record(request, response, ended)
+    buffer.add(record)
+
+    slowest = sorted(trace.selects, key=lambda select: select[0], reverse=True)[:settings.TRACE_EXPLAIN_QUERIES]
+    if response is not None:
+        # Runs once the response was sent, before the request's connections are released
+        response._resource_closers.append(lambda: finish(record, slowest))
+    else:
+        finish(record, slowest)
+
+
+def explain(alias, sql, params):
+    """The database's plan for a statement, as lines or rows"""
+    connection = connections[alias]
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+    if len(columns) == 1:
+        return [str(row[0]) for row in rows]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def finish(record, slowest):
+    """Add EXPLAIN output to a sampled trace and log it"""
+    for duration, alias, sql, params, digest in slowest:
+        entry = {'fingerprint': digest, 'db': alias, 'duration_ms': round(duration * 1e3, 3), 'sql': sql[:SQL_TEXT_LIMIT]}
+        try:
+            entry['plan'] = explain(alias, sql, params)
+        except DatabaseError as e:
+            entry['error'] = str(e)
+        record['explains'].append(entry)
+
+    if settings.TRACE_LOG_FILE:
+        line = to_jsonl([record])
+        try:
+            with _log_lock, open(settings.TRACE_LOG_FILE, 'a') as f:
+                f.write(line)
+        except OSError:
+            logger.exception('Writing trace %s to %s failed', record['id'], settings.TRACE_LOG_FILE)
@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('throttles/', views.throttle_stats, name='throttle-stats'),
+    path('traces/', views.trace_list, name='trace-list'),
+    path('traces/export/', views.trace_export, name='trace-export'),
+    path('traces/<str:trace_id>/', views.trace_detail, name='trace-detail'),
+    path('profiles/', views.profile_list, name='profile-list'),
+    path('profiles/<str:profile_id>/', views.profile_detail, name='profile-detail'),
+    path('profiles/<str:profile_id>/pstats/', views.profile_pstats, name='profile-pstats'),
+]
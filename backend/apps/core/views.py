@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from apps.users.authentication import authenticate_request
+from . import metrics, profiling, tracing
+from .throttling import throttle_metrics
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def throttle_stats(request):
+    """Allowed/throttled request counts per scope for this worker (staff only)"""
+    stats = {}
+    for (scope, outcome), count in throttle_metrics().items():
+        stats.setdefault(scope, {'allowed': 0, 'throttled': 0})[outcome] = count
+    return Response(stats)
+
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def trace_list(request):
+    """Slow requests sampled by this worker, newest first, without their spans (staff only)"""
+    return Response([
+        {key: value for key, value in record.items() if key not in ('spans', 'explains')}
+        for record in tracing.buffer.records()
+    ])
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def trace_detail(request, trace_id):
+    """One sampled trace with its spans and EXPLAIN output (staff only)"""
+    record = tracing.buffer.get(trace_id)
+    if record is None:
+        raise NotFound('Trace not found or no longer buffered.')
+    return Response(record)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def trace_export(request):
+    """This worker's sampled traces as JSON lines (staff only)"""
+    response = HttpResponse(tracing.to_jsonl(tracing.buffer.records()), content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="traces.jsonl"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Stored request profiles, newest first (staff only)"""
+    return Response([
+        {
+            'id': profile_id,
+            'created_at': datetime.fromtimestamp(modified, tz=timezone.utc),
+            'url': request.build_absolute_uri(reverse('profile-detail', args=[profile_id])),
+            'pstats_url': request.build_absolute_uri(reverse('profile-pstats', args=[profile_id])) if has_pstats else None,
+        }
+        for profile_id, modified, has_pstats in profiling.stored_profiles()
+    ])
+
+
+def _profile_file(profile_id, extension, content_type):
+    path = profiling.path_for(profile_id, extension)
+    try:
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=f'profile-{profile_id}.{extension}',
+            content_type=content_type
+        )
+    except (TypeError, FileNotFoundError):
+        raise Http404('Profile not found.')
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_detail(request, profile_id):
+    """Download a stored profile as JSON (staff only)"""
+    return _profile_file(profile_id, 'json', 'application/json')
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_pstats(request, profile_id):
+    """Download the cProfile data of a stored profile, for pstats or snakeviz (staff only)"""
+    return _profile_file(profile_id, 'prof', 'application/octet-stream')
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, for ``Bearer <METRICS_TOKEN>`` or a staff user's access token"""
+    if not _metrics_token_matches(request):
+        user = authenticate_request(request)
+        if user is None:
+            return HttpResponse(status=401)
+        if not user.is_staff:
+            return HttpResponse(status=403)
+    return HttpResponse(
+        metrics.render(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def _metrics_token_matches(request):
+    # Without a configured token only staff can scrape
+    if not settings.METRICS_TOKEN:
+        return False
+    return constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}')
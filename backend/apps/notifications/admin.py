@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'kind', 'title', 'read_at', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('recipient__username', 'title')
+    ordering = ('-id',)
+    raw_id_fields = ('recipient',)
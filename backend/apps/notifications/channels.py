@@ -0,0 +1,53 @@
+"""
+Delivery channels for notifications.
+
+``NOTIFICATION_CHANNELS`` lists the channel classes; each gets the unsaved
+``Notification`` objects of one delivery run and delivers them in bulk,
+inside the run's transaction. ``InboxChannel`` (the default) stores them for
+the in-app inbox and pushes a ``notification.new`` event; deliveries run in
+the task worker, so the push only reaches clients when ``REALTIME_BROKER`` is
+shared between processes (the inbox and unread count are correct either way).
+
+``EmailChannel`` is opt-in. It queues one ``send_notification_email`` task
+per message, so an SMTP failure neither rolls back the inbox nor re-sends
+mails that already went out when it is retried. In development point
+``EMAIL_HOST``/``EMAIL_PORT`` at a local SMTP stand-in such as
+``python -m aiosmtpd -n -l localhost:1025``.
+"""
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from apps.realtime.broker import get_broker, user_channel
+from .models import Notification, UnreadCount
+
+
+class InboxChannel:
+    """Store notifications for the in-app inbox and keep unread counts in step"""
+
+    def deliver(self, notifications):
+        Notification.objects.bulk_create(notifications)
+        counts = Counter(notification.recipient_id for notification in notifications)
+        for user_id, count in counts.items():
+            UnreadCount.add(user_id, count)
+
+        def publish():
+            broker = get_broker()
+            for user_id, count in counts.items():
+                broker.publish(user_channel(user_id), {'event': 'notification.new', 'count': count})
+        transaction.on_commit(publish)
+
+
+class EmailChannel:
+    """Queue a mail of every notification to its recipient"""
+
+    def deliver(self, notifications):
+        from .tasks import send_notification_email
+        for notification in notifications:
+            send_notification_email.delay(
+                recipient_id=notification.recipient_id, subject=notification.title, body=notification.body
+            )
+
+
+def get_channels():
+    return [import_string(path)() for path in settings.NOTIFICATION_CHANNELS]
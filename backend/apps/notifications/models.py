@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+
+class Notification(models.Model):
+    """An in-app inbox message for one user"""
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    kind = models.CharField(max_length=30, help_text="Event kind, or 'digest' for coalesced events")
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True, default='')
+    data = models.JSONField(default=dict, blank=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.title} - {self.recipient_id}"
+
+    class Meta:
+        db_table = 'notifications'
+        ordering = ['-id']
+        verbose_name = 'Notification'
+        verbose_name_plural = 'Notifications'
+        indexes = [
+            models.Index(fields=['recipient', 'id'], name='notifications_inbox_idx'),
+            models.Index(fields=['recipient', 'read_at'], name='notifications_unread_idx'),
+        ]
+
+
+class UnreadCount(models.Model):
+    """Unread notifications per user, kept in step with the inbox so reading it is one pk lookup"""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+'
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def add(cls, user_id, delta):
+        """Adjust a user's count by ``delta`` (creating the row on first use)"""
+        if cls.objects.filter(user_id=user_id).update(unread=F('unread') + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(user_id=user_id, unread=max(delta, 0))
+        except IntegrityError:
+            # Created concurrently
+            cls.objects.filter(user_id=user_id).update(unread=F('unread') + delta)
+
+    @classmethod
+    def get(cls, user_id):
+        return cls.objects.filter(user_id=user_id).values_list('unread', flat=True).first() or 0
+
+    class Meta:
+        db_table = 'notification_unread_counts'
+        verbose_name = 'Unread Count'
+        verbose_name_plural = 'Unread Counts'
+
+
+class DigestEvent(models.Model):
+    """A provider event held until the end of its digest window"""
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    window_end = models.DateTimeField()
+    kind = models.CharField(max_length=30)
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True, default='')
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.title} - {self.recipient_id} until {self.window_end}"
+
+    class Meta:
+        db_table = 'notification_digest_events'
+        verbose_name = 'Digest Event'
+        verbose_name_plural = 'Digest Events'
+        indexes = [
+            models.Index(fields=['recipient', 'window_end'], name='digest_events_window_idx'),
+        ]
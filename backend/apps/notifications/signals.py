@@ -0,0 +1,69 @@
+"""
+Notifications for booking and payment events.
+
+Events are queued as ``deliver_notifications`` tasks in the transaction that
+caused them and delivered as soon as a worker picks them up. Digestible
+events (what a provider receives) are stored as ``DigestEvent`` rows of the
+recipient's current ``NOTIFICATION_DIGEST_WINDOW`` instead; the first event
+of a window queues a ``deliver_digest`` for its end, which turns all of them
+into one digest, however the queue's batches are split between workers.
+"""
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.dispatch import receiver
+from apps.bookings.signals import booking_status_changed
+from apps.payments.signals import payment_status_changed
+from .models import DigestEvent
+from .tasks import deliver_digest, deliver_notifications
+
+
+def _window_end():
+    window = settings.NOTIFICATION_DIGEST_WINDOW
+    now = datetime.now(tz=dt_timezone.utc).timestamp()
+    return datetime.fromtimestamp((now // window + 1) * window, tz=dt_timezone.utc)
+
+
+def notify(recipient_id, kind, title, body='', data=None, digest=False):
+    if not digest:
+        deliver_notifications.delay(recipient_id=recipient_id, kind=kind, title=title, body=body, data=data or {})
+        return
+    window_end = _window_end()
+    event = DigestEvent.objects.create(
+        recipient_id=recipient_id, window_end=window_end, kind=kind, title=title, body=body, data=data or {}
+    )
+    # Concurrent first events may queue a call each; deliver_digest tolerates that
+    if not DigestEvent.objects.filter(recipient_id=recipient_id, window_end=window_end).exclude(id=event.id).exists():
+        deliver_digest.delay(eta=window_end, recipient_id=recipient_id, window_end=window_end.isoformat())
+
+
+@receiver(booking_status_changed)
+def booking_notifications(sender, booking, previous_status, **kwargs):
+    service = booking.service
+    data = {'booking_id': str(booking.booking_id)}
+    when = f"{booking.booking_date} at {booking.time_slot}"
+    if previous_status is None:
+        notify(
+            service.provider_id, 'booking.created', f"New booking for {service.name}",
+            f"{when}, {booking.hours_requested} hour(s)", data, digest=True
+        )
+        return
+    notify(
+        booking.customer_id, 'booking.status', f"Your {service.name} booking is {booking.get_status_display().lower()}",
+        when, data
+    )
+    if booking.status == 'cancelled':
+        notify(service.provider_id, 'booking.cancelled', f"Booking for {service.name} cancelled", when, data, digest=True)
+
+
+@receiver(payment_status_changed)
+def payment_notifications(sender, payment, previous_status, **kwargs):
+    booking = payment.booking
+    data = {'booking_id': str(booking.booking_id), 'payment_id': str(payment.payment_id)}
+    if payment.payment_status == 'success':
+        notify(booking.customer_id, 'payment.success', f"Payment of ₹{payment.amount} confirmed", booking.service.name, data)
+        notify(
+            booking.service.provider_id, 'payment.success', f"Payment of ₹{payment.amount} received for {booking.service.name}",
+            f"{booking.booking_date} at {booking.time_slot}", data, digest=True
+        )
+    elif payment.payment_status == 'refunded':
+        notify(booking.customer_id, 'payment.refunded', f"Refund of ₹{payment.amount} processed", booking.service.name, data)
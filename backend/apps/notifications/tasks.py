@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.mail import send_mail
+from apps.tasks.queue import task
+from apps.users.models import User
+from .channels import get_channels
+from .models import DigestEvent, Notification
+
+
+def _digest(recipient_id, events):
+    kinds = {event.kind for event in events}
+    title = f"{len(events)} new bookings" if kinds == {'booking.created'} else f"{len(events)} new updates"
+    return Notification(
+        recipient_id=recipient_id,
+        kind='digest',
+        title=title,
+        body='\n'.join(event.title for event in events),
+        data={'events': [dict(event.data, kind=event.kind) for event in events]},
+    )
+
+
+def _deliver(notifications):
+    for channel in get_channels():
+        channel.deliver(notifications)
+
+
+@task(batch=True)
+def deliver_notifications(calls):
+    """Turn queued events into notifications, one per event"""
+    _deliver([
+        Notification(
+            recipient_id=call['recipient_id'],
+            kind=call['kind'],
+            title=call['title'],
+            body=call['body'],
+            data=call['data'],
+        )
+        for call in calls
+    ])
+
+
+@task()
+def deliver_digest(recipient_id, window_end):
+    """
+    Deliver a recipient's events of one digest window: one digest, or the
+    event itself when it was alone.
+
+    Every call for the window takes the events under a row lock and deletes
+    them, so however many calls were queued and whichever workers run them,
+    the window is delivered once.
+    """
+    events = list(
+        DigestEvent.objects.select_for_update()
+        .filter(recipient_id=recipient_id, window_end=window_end).order_by('id')
+    )
+    if not events:
+        return
+    DigestEvent.objects.filter(id__in=[event.id for event in events]).delete()
+    if len(events) == 1:
+        event = events[0]
+        notification = Notification(
+            recipient_id=recipient_id, kind=event.kind, title=event.title, body=event.body, data=event.data
+        )
+    else:
+        notification = _digest(recipient_id, events)
+    _deliver([notification])
+
+
+@task(priority=-5)
+def send_notification_email(recipient_id, subject, body):
+    """Mail one notification; on its own so a retry never sends the others again"""
+    email = User.objects.filter(pk=recipient_id).values_list('email', flat=True).first()
+    if email:
+        send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [email])
@@ -0,0 +1,43 @@
+from django.test import TestCase
+from apps.tasks.models import Task
+from apps.users.models import User
+from .models import DigestEvent, Notification, UnreadCount
+from .signals import notify
+from .tasks import deliver_digest
+
+
+class DigestTests(TestCase):
+    def setUp(self):
+        self.provider = User.objects.create_user(
+            username='provider', email='provider@example.com', password='pw-123456x', user_type='provider'
+        )
+
+    def digest_calls(self):
+        return [task.kwargs for task in Task.objects.filter(name=deliver_digest.name)]
+
+    def test_one_digest_per_window(self):
+        for number in range(3):
+            notify(self.provider.pk, 'booking.created', f'Booking {number}', digest=True)
+        calls = self.digest_calls()
+        self.assertEqual(len(calls), 1)
+
+        # A second call for the window, e.g. queued by a concurrent first event, delivers nothing
+        deliver_digest(**calls[0])
+        deliver_digest(**calls[0])
+        notification = Notification.objects.get(recipient=self.provider)
+        self.assertEqual(notification.kind, 'digest')
+        self.assertEqual(notification.title, '3 new bookings')
+        self.assertEqual(UnreadCount.get(self.provider.pk), 1)
+        self.assertFalse(DigestEvent.objects.exists())
+
+    def test_lone_event_is_delivered_as_is(self):
+        notify(self.provider.pk, 'booking.cancelled', 'Booking cancelled', 'Tomorrow', digest=True)
+        deliver_digest(**self.digest_calls()[0])
+        notification = Notification.objects.get(recipient=self.provider)
+        self.assertEqual((notification.kind, notification.body), ('booking.cancelled', 'Tomorrow'))
+
+    def test_event_after_delivery_gets_its_own_call(self):
+        notify(self.provider.pk, 'booking.created', 'Booking 1', digest=True)
+        deliver_digest(**self.digest_calls()[0])
+        notify(self.provider.pk, 'booking.created', 'Booking 2', digest=True)
+        self.assertEqual(len(self.digest_calls()), 2)
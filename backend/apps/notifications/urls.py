@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.NotificationListView.as_view(), name='notification-list'),
+    path('unread-count/', views.unread_count, name='notification-unread-count'),
+    path('read/', views.mark_read, name='notification-mark-read'),
+]
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .models import Notification, UnreadCount
+from .serializers import MarkReadSerializer, NotificationSerializer
+
+
+class NotificationListView(generics.ListAPIView):
+    """The user's newest notifications; ``?before=<id>`` pages back, ``?unread=1`` hides read ones"""
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(recipient=self.request.user)
+        before = self.request.query_params.get('before')
+        if before and before.isdigit():
+            queryset = queryset.filter(id__lt=int(before))
+        if self.request.query_params.get('unread'):
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset.order_by('-id')[:settings.NOTIFICATION_PAGE_SIZE]
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def unread_count(request):
+    """Number of unread notifications (one primary key lookup)"""
+    return Response({'unread': UnreadCount.get(request.user.pk)})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_read(request):
+    """Mark the given notifications (or all of them) as read"""
+    serializer = MarkReadSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    queryset = Notification.objects.filter(recipient=request.user, read_at__isnull=True)
+    if not serializer.validated_data['all']:
+        queryset = queryset.filter(id__in=serializer.validated_data['ids'])
+    with transaction.atomic():
+        marked = queryset.update(read_at=timezone.now())
+        if marked:
+            UnreadCount.add(request.user.pk, -marked)
+    return Response({'marked': marked, 'unread': UnreadCount.get(request.user.pk)}, status=status.HTTP_200_OK)
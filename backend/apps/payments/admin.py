@@ -1,24 +1,100 @@
 from django.contrib import admin
-from .models import Payment
+from apps.core.admin import LargeTableAdmin, date_drilldown_filter
+from .models import Payment, EarningsEntry, ProviderDailyEarnings, Refund, RefundBatch
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(LargeTableAdmin):
     list_display = (
         'payment_id', 'customer_name', 'service_name', 'amount', 
         'payment_status', 'payment_method', 'created_at'
     )
-    list_filter = ('payment_status', 'payment_method', 'created_at')
-    search_fields = (
-        'payment_id', 'transaction_id', 'booking__booking_id',
-        'booking__customer__username'
-    )
+    list_filter = ('payment_status', 'payment_method', date_drilldown_filter('created_at'))
+    list_select_related = ('booking__customer', 'booking__service')
+    search_fields = ('transaction_id', 'stripe_payment_intent_id', 'booking__customer__username')
+    exact_search_fields = {
+        'payment_id': 'uuid',
+        'booking__booking_id': 'uuid',
+        'transaction_id': 'exact',
+        'booking__customer__username': 'exact',
+        'booking__customer__email': 'email',
+    }
+    search_help_text = 'Payment or booking ID, transaction ID, customer username or email. Prefix with ~ for a slow partial match.'
     ordering = ('-created_at',)
+    raw_id_fields = ('booking',)
     readonly_fields = ('payment_id', 'stripe_payment_intent_id', 'created_at', 'updated_at')
     
+    @admin.display(description='Customer')
     def customer_name(self, obj):
         return obj.booking.customer.get_full_name()
-    customer_name.short_description = 'Customer'
     
+    @admin.display(description='Service')
     def service_name(self, obj):
         return obj.booking.service.name
-    service_name.short_description = 'Service'
+
+
+@admin.register(EarningsEntry)
+class EarningsEntryAdmin(LargeTableAdmin):
+    list_display = (
+        'id', 'provider', 'entry_type', 'amount', 'entry_date',
+        'service_name', 'payment_reference', 'created_at'
+    )
+    list_filter = ('entry_type', date_drilldown_filter('entry_date'))
+    list_select_related = ('provider',)
+    search_fields = ('payment_reference', 'booking_reference', 'provider__username')
+    exact_search_fields = {'provider__username': 'exact', 'provider__email': 'email'}
+    search_help_text = 'Provider username or email. Prefix with ~ for a slow match on payment or booking ID.'
+    ordering = ('-id',)
+    raw_id_fields = ('provider', 'payment')
+
+    # The ledger is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ProviderDailyEarnings)
+class ProviderDailyEarningsAdmin(LargeTableAdmin):
+    list_display = ('provider', 'date', 'gross_amount', 'refunded_amount', 'net_amount', 'entry_count')
+    list_filter = (date_drilldown_filter('date'),)
+    list_select_related = ('provider',)
+    search_fields = ('provider__username',)
+    exact_search_fields = {'provider__username': 'exact', 'provider__email': 'email'}
+    search_help_text = 'Provider username or email. Prefix with ~ for a slow partial match.'
+    ordering = ('-date',)
+    raw_id_fields = ('provider',)
+    readonly_fields = ('gross_amount', 'refunded_amount', 'net_amount', 'entry_count', 'updated_at')
+
+@admin.register(Refund)
+class RefundAdmin(LargeTableAdmin):
+    list_display = ('refund_id', 'payment', 'amount', 'status', 'attempts', 'batch', 'created_at')
+    list_filter = ('status', date_drilldown_filter('created_at'))
+    # Payment.__str__ reads its booking
+    list_select_related = ('payment__booking', 'batch')
+    search_fields = ('gateway_reference',)
+    exact_search_fields = {
+        'refund_id': 'uuid',
+        'payment__payment_id': 'uuid',
+    }
+    search_help_text = 'Refund or payment ID. Prefix with ~ for a slow partial match, e.g. on the gateway reference.'
+    ordering = ('-created_at',)
+    raw_id_fields = ('payment', 'batch', 'requested_by')
+    readonly_fields = (
+        'refund_id', 'attempts', 'gateway_reference', 'last_error',
+        'claimed_at', 'processed_at', 'created_at', 'updated_at'
+    )
+
+@admin.register(RefundBatch)
+class RefundBatchAdmin(LargeTableAdmin):
+    list_display = ('batch_id', 'provider', 'booking_date', 'status', 'total_refunds', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('provider',)
+    search_fields = ('provider__username',)
+    exact_search_fields = {'batch_id': 'uuid', 'provider__username': 'exact'}
+    search_help_text = 'Batch ID or provider username. Prefix with ~ for a slow partial match.'
+    ordering = ('-created_at',)
+    raw_id_fields = ('provider', 'requested_by')
+    readonly_fields = ('batch_id', 'total_refunds', 'created_at', 'completed_at')
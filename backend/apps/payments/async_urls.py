@@ -0,0 +1,6 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('booking/<uuid:booking_id>/', async_views.payment_status, name='async-payment-status'),
+]
@@ -0,0 +1,27 @@
+from django.http import Http404
+from apps.bookings.models import Booking
+from apps.core.async_api import api_response, async_api_view
+from .models import Payment
+from .serializers import PaymentSerializer
+
+
+@async_api_view(authenticated=True)
+async def payment_status(request, booking_id):
+    """Async variant of get_payment_status"""
+    booking = await Booking.objects.select_related('service').filter(booking_id=booking_id).afirst()
+    if booking is None:
+        raise Http404
+    if (request.user.user_type == 'customer' and booking.customer_id != request.user.pk) or \
+       (request.user.user_type == 'provider' and booking.service.provider_id != request.user.pk):
+        return api_response({'error': 'Access denied'}, status=403)
+
+    # Everything PaymentSerializer nests is loaded up front; no lazy queries in async code
+    payment = await Payment.objects.filter(booking=booking).select_related(
+        'booking__service__provider', 'booking__customer'
+    ).afirst()
+    if payment:
+        return api_response(PaymentSerializer(payment).data)
+    return api_response({
+        'message': 'No payment found for this booking',
+        'booking_id': booking.booking_id
+    })
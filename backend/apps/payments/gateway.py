@@ -0,0 +1,38 @@
+import hashlib
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """Raised when the payment gateway rejects or fails a request"""
+
+
+class PaymentGateway:
+    """Interface every payment gateway adapter implements"""
+
+    def refund(self, payment, amount, idempotency_key):
+        """
+        Refund ``amount`` of ``payment`` and return the gateway's refund reference.
+
+        Calls with the same ``idempotency_key`` must refund at most once, so a
+        refund that is retried after a crash is never paid out twice.
+        """
+        raise NotImplementedError
+
+
+class DemoGateway(PaymentGateway):
+    """Gateway used by the UPI/Wallet demo flow (always succeeds)"""
+
+    def refund(self, payment, amount, idempotency_key):
+        digest = hashlib.sha1(str(idempotency_key).encode()).hexdigest()[:10]
+        return f"DEMO-RFND-{digest}"
+
+
+_gateway = None
+
+def get_gateway():
+    """Return the gateway adapter configured by ``PAYMENT_GATEWAY``"""
+    global _gateway
+    if _gateway is None:
+        _gateway = import_string(settings.PAYMENT_GATEWAY)()
+    return _gateway
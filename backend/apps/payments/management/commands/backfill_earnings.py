@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.payments.models import EarningsEntry, Payment
+
+
+class Command(BaseCommand):
+    help = 'Add ledger entries and daily rollups for payments settled before the earnings ledger existed (safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Payments read per query')
+
+    def handle(self, *args, **options):
+        payments = (
+            Payment.objects.filter(payment_status__in=EarningsEntry.LEDGER_STATUSES)
+            .select_related('booking__service')
+            .order_by('id')
+        )
+        recorded = set(EarningsEntry.objects.values_list('payment_reference', 'entry_type'))
+        earnings = refunds = 0
+        for payment in payments.iterator(chunk_size=options['chunk_size']):
+            # processed_at is only set once a payment succeeded; refunded payments without it never earned
+            if payment.processed_at is None:
+                continue
+            if (payment.payment_id, 'earning') not in recorded:
+                EarningsEntry.record_for_payment(payment, 'earning', timezone.localdate(payment.processed_at))
+                earnings += 1
+            if payment.payment_status == 'refunded' and (payment.payment_id, 'refund') not in recorded:
+                # The refund time was not stored; the payment's last update is the closest record of it
+                EarningsEntry.record_for_payment(payment, 'refund', timezone.localdate(payment.updated_at))
+                refunds += 1
+        self.stdout.write(self.style.SUCCESS(f'Recorded {earnings} earning(s) and {refunds} refund(s)'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps.payments.models import Refund
+from apps.payments.refunds import process_refunds
+
+
+class Command(BaseCommand):
+    help = 'Pay out pending refunds through the payment gateway (safe to re-run after a crash)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', help='Only process refunds of this refund batch id')
+        parser.add_argument('--chunk-size', type=int, help='Refunds claimed per transaction')
+        parser.add_argument('--workers', type=int, help='Concurrent gateway calls')
+
+    def handle(self, *args, **options):
+        queryset = Refund.objects.all()
+        if options['batch']:
+            queryset = queryset.filter(batch__batch_id=options['batch'])
+
+        attempted = process_refunds(
+            queryset,
+            chunk_size=options['chunk_size'],
+            max_workers=options['workers'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {attempted} refund(s)'))
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('payments', '0002_alter_payment_booking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderDailyEarnings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('gross_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('refunded_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('net_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('provider', models.ForeignKey(limit_choices_to={'user_type': 'provider'}, on_delete=django.db.models.deletion.CASCADE, related_name='daily_earnings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Provider Daily Earnings',
+                'verbose_name_plural': 'Provider Daily Earnings',
+                'db_table': 'provider_daily_earnings',
+                'ordering': ['-date'],
+                'unique_together': {('provider', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EarningsEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_type', models.CharField(choices=[('earning', 'Earning'), ('refund', 'Refund')], help_text='Kind of ledger entry', max_length=10)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Signed amount (negative for refunds)', max_digits=10)),
+                ('entry_date', models.DateField(help_text='Local date the entry belongs to')),
+                ('payment_reference', models.UUIDField(help_text='Payment identifier at the time of entry')),
+                ('booking_reference', models.UUIDField(help_text='Booking identifier at the time of entry')),
+                ('service_name', models.CharField(max_length=100)),
+                ('payment_method', models.CharField(max_length=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='payments.payment')),
+                ('provider', models.ForeignKey(limit_choices_to={'user_type': 'provider'}, on_delete=django.db.models.deletion.CASCADE, related_name='earnings_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Earnings Entry',
+                'verbose_name_plural': 'Earnings Entries',
+                'db_table': 'earnings_entries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['provider', 'id'], name='earnings_provider_id_idx'), models.Index(fields=['provider', 'entry_date'], name='earnings_provider_date_idx')],
+                'unique_together': {('payment_reference', 'entry_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('payments', '0003_earnings_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefundBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique refund batch identifier', unique=True)),
+                ('booking_date', models.DateField(blank=True, help_text='Service date whose bookings are refunded', null=True)),
+                ('reason', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('completed_with_errors', 'Completed With Errors')], default='pending', max_length=25)),
+                ('total_refunds', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('provider', models.ForeignKey(limit_choices_to={'user_type': 'provider'}, on_delete=django.db.models.deletion.CASCADE, related_name='refund_batches', to=settings.AUTH_USER_MODEL)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Refund Batch',
+                'verbose_name_plural': 'Refund Batches',
+                'db_table': 'refund_batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Refund',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('refund_id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique refund identifier', unique=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('reason', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=15)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('gateway_reference', models.CharField(blank=True, max_length=100, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('claimed_at', models.DateTimeField(blank=True, help_text='When a worker last picked this refund up', null=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='refunds', to='payments.refundbatch')),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='refunds', to='payments.payment')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Refund',
+                'verbose_name_plural': 'Refunds',
+                'db_table': 'refunds',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'id'], name='refunds_status_id_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,9 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 from apps.bookings.models import Booking
+from .signals import payment_status_changed
 import uuid
 
 class Payment(models.Model):
@@ -76,16 +80,303 @@ class Payment(models.Model):
     def __str__(self):
         return f"Payment {self.payment_id} - {self.booking.booking_id}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can detect transitions
+        instance._loaded_payment_status = dict(zip(field_names, values)).get('payment_status')
+        return instance
+
     def save(self, *args, **kwargs):
         # Set processed timestamp when status changes to success
         if self.payment_status == 'success' and not self.processed_at:
-            from django.utils import timezone
             self.processed_at = timezone.now()
 
-        super().save(*args, **kwargs)
+        previous_status = getattr(self, '_loaded_payment_status', None)
+        status_changed = self.payment_status != previous_status
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Append to the provider earnings ledger on settlement
+            if status_changed and self.payment_status in EarningsEntry.LEDGER_STATUSES:
+                EarningsEntry.record_for_payment(self)
+
+        self._loaded_payment_status = self.payment_status
+
+        if status_changed:
+            payment_status_changed.send(
+                sender=self.__class__,
+                payment=self,
+                previous_status=previous_status
+            )
 
     class Meta:
         db_table = 'payments'
         ordering = ['-created_at']
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
+        indexes = [
+            # Admin changelist ordering and date navigation
+            models.Index(fields=['created_at', 'id'], name='payments_created_idx'),
+        ]
+
+
+class EarningsEntry(models.Model):
+    """Append-only ledger of provider earnings and refunds"""
+    ENTRY_TYPE_CHOICES = [
+        ('earning', 'Earning'),
+        ('refund', 'Refund'),
+    ]
+
+    # Payment status that produces each entry type
+    LEDGER_STATUSES = {
+        'success': 'earning',
+        'refunded': 'refund',
+    }
+
+    provider = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='earnings_entries',
+        limit_choices_to={'user_type': 'provider'}
+    )
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ledger_entries'
+    )
+    entry_type = models.CharField(
+        max_length=10,
+        choices=ENTRY_TYPE_CHOICES,
+        help_text="Kind of ledger entry"
+    )
+    amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        help_text="Signed amount (negative for refunds)"
+    )
+    entry_date = models.DateField(help_text="Local date the entry belongs to")
+
+    # Snapshot of the payment so statements survive booking deletion
+    payment_reference = models.UUIDField(help_text="Payment identifier at the time of entry")
+    booking_reference = models.UUIDField(help_text="Booking identifier at the time of entry")
+    service_name = models.CharField(max_length=100)
+    payment_method = models.CharField(max_length=15)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.get_entry_type_display()} {self.amount} - {self.payment_reference}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Earnings entries are append-only")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Earnings entries are append-only")
+
+    @classmethod
+    def record_for_payment(cls, payment, entry_type=None, entry_date=None):
+        """
+        Append the ledger entry for a settled payment (idempotent).
+
+        ``entry_type`` defaults to the one of the payment's status and
+        ``entry_date`` to today; the earnings backfill passes both.
+        """
+        entry_type = entry_type or cls.LEDGER_STATUSES[payment.payment_status]
+
+        # A refund only offsets money that was actually earned
+        if entry_type == 'refund' and not cls.objects.filter(
+            payment_reference=payment.payment_id,
+            entry_type='earning'
+        ).exists():
+            return None
+
+        booking = payment.booking
+        amount = payment.amount if entry_type == 'earning' else -payment.amount
+
+        with transaction.atomic():
+            entry, created = cls.objects.get_or_create(
+                payment_reference=payment.payment_id,
+                entry_type=entry_type,
+                defaults={
+                    'provider_id': booking.service.provider_id,
+                    'payment': payment,
+                    'amount': amount,
+                    'entry_date': entry_date or timezone.localdate(),
+                    'booking_reference': booking.booking_id,
+                    'service_name': booking.service.name,
+                    'payment_method': payment.payment_method,
+                }
+            )
+            if created:
+                ProviderDailyEarnings.apply(entry)
+        return entry
+
+    class Meta:
+        db_table = 'earnings_entries'
+        ordering = ['id']
+        verbose_name = 'Earnings Entry'
+        verbose_name_plural = 'Earnings Entries'
+        unique_together = ['payment_reference', 'entry_type']
+        indexes = [
+            models.Index(fields=['provider', 'id'], name='earnings_provider_id_idx'),
+            models.Index(fields=['provider', 'entry_date'], name='earnings_provider_date_idx'),
+        ]
+
+
+class ProviderDailyEarnings(models.Model):
+    """Per-provider daily rollup of the earnings ledger"""
+    provider = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='daily_earnings',
+        limit_choices_to={'user_type': 'provider'}
+    )
+    date = models.DateField()
+    gross_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    refunded_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    net_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.provider.username} {self.date}: {self.net_amount}"
+
+    @classmethod
+    def apply(cls, entry):
+        """Fold a new ledger entry into its daily rollup"""
+        rollup, _ = cls.objects.get_or_create(provider_id=entry.provider_id, date=entry.entry_date)
+        changes = {
+            'net_amount': F('net_amount') + entry.amount,
+            'entry_count': F('entry_count') + 1,
+            'updated_at': timezone.now(),
+        }
+        if entry.entry_type == 'earning':
+            changes['gross_amount'] = F('gross_amount') + entry.amount
+        else:
+            changes['refunded_amount'] = F('refunded_amount') - entry.amount
+        cls.objects.filter(pk=rollup.pk).update(**changes)
+
+    class Meta:
+        db_table = 'provider_daily_earnings'
+        ordering = ['-date']
+        verbose_name = 'Provider Daily Earnings'
+        verbose_name_plural = 'Provider Daily Earnings'
+        unique_together = ['provider', 'date']
+
+
+class RefundBatch(models.Model):
+    """A bulk refund request, e.g. every paid booking of a cancelled day"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('completed_with_errors', 'Completed With Errors'),
+    ]
+
+    batch_id = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        editable=False,
+        help_text="Unique refund batch identifier"
+    )
+    provider = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='refund_batches',
+        limit_choices_to={'user_type': 'provider'}
+    )
+    booking_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Service date whose bookings are refunded"
+    )
+    reason = models.TextField(blank=True, default='')
+    status = models.CharField(max_length=25, choices=STATUS_CHOICES, default='pending')
+    total_refunds = models.PositiveIntegerField(default=0)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Refund batch {self.batch_id} ({self.status})"
+
+    class Meta:
+        db_table = 'refund_batches'
+        ordering = ['-created_at']
+        verbose_name = 'Refund Batch'
+        verbose_name_plural = 'Refund Batches'
+
+
+class Refund(models.Model):
+    """A refund of a successful payment, processed through the gateway"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    # Doubles as the gateway idempotency key
+    refund_id = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        editable=False,
+        help_text="Unique refund identifier"
+    )
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.CASCADE,
+        related_name='refunds'
+    )
+    batch = models.ForeignKey(
+        RefundBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='refunds'
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    reason = models.TextField(blank=True, default='')
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    gateway_reference = models.CharField(max_length=100, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a worker last picked this refund up"
+    )
+    processed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Refund {self.refund_id} - {self.status}"
+
+    class Meta:
+        db_table = 'refunds'
+        ordering = ['-created_at']
+        verbose_name = 'Refund'
+        verbose_name_plural = 'Refunds'
+        indexes = [
+            models.Index(fields=['status', 'id'], name='refunds_status_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='refunds_created_idx'),
+        ]
@@ -0,0 +1,182 @@
+"""
+Refund processing engine.
+
+Refund requests are recorded as ``Refund`` rows first and paid out later by
+``process_refunds``, which claims them in chunks, calls the gateway from a
+bounded thread pool and settles each refund, its payment and its booking in
+one transaction. A worker that crashes leaves its claimed refunds in
+``processing``; once ``REFUND_CLAIM_TIMEOUT`` passes they are claimed again
+and retried with the same idempotency key, so nothing is paid out twice.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from apps.bookings.models import Booking
+from .gateway import GatewayError, get_gateway
+from .models import Payment, Refund, RefundBatch
+
+
+class RefundError(Exception):
+    """Raised when a refund cannot be requested"""
+
+
+# Bookings whose work has started; refunding them needs staff approval
+STARTED_BOOKING_STATUSES = ('in_progress', 'completed')
+
+
+def request_refund(payment, reason='', requested_by=None, batch=None):
+    """Record a refund for a successful payment (returns the active one if it exists)"""
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().get(pk=payment.pk)
+        existing = payment.refunds.exclude(status='failed').first()
+        if existing:
+            return existing
+        if payment.payment_status != 'success':
+            raise RefundError("Only successful payments can be refunded")
+        return Refund.objects.create(
+            payment=payment,
+            batch=batch,
+            amount=payment.amount,
+            reason=reason,
+            requested_by=requested_by,
+        )
+
+
+def request_booking_refund(booking, reason='', requested_by=None, approved=False):
+    """Record a refund for the successful payment of a booking (``approved``: staff sign-off for started work)"""
+    if booking.status in STARTED_BOOKING_STATUSES and not approved:
+        raise RefundError("Bookings that have started or are completed can only be refunded by staff")
+    # Already refunded payments resolve to their existing refund
+    payment = booking.payment.filter(payment_status__in=['success', 'refunded']).first()
+    if payment is None:
+        raise RefundError("No successful payment found for this booking")
+    return request_refund(payment, reason=reason, requested_by=requested_by)
+
+
+def request_provider_day_refunds(provider, booking_date, reason='', requested_by=None):
+    """Record refunds for every paid booking of a provider on one date that has not started"""
+    batch = RefundBatch.objects.create(
+        provider=provider,
+        booking_date=booking_date,
+        reason=reason,
+        requested_by=requested_by,
+    )
+    payments = Payment.objects.filter(
+        booking__service__provider=provider,
+        booking__booking_date=booking_date,
+        payment_status='success',
+    ).exclude(booking__status__in=STARTED_BOOKING_STATUSES).order_by('id')
+
+    total = 0
+    for payment in payments.iterator(chunk_size=settings.REFUND_CHUNK_SIZE):
+        refund = request_refund(payment, reason=reason, requested_by=requested_by, batch=batch)
+        if refund.batch_id == batch.pk:
+            total += 1
+
+    batch.total_refunds = total
+    batch.status = 'pending' if total else 'completed'
+    batch.completed_at = None if total else timezone.now()
+    batch.save(update_fields=['total_refunds', 'status', 'completed_at'])
+    return batch
+
+
+def _claim_refunds(queryset, after_id, limit):
+    """Mark the next chunk of due refunds as processing and return them"""
+    now = timezone.now()
+    stale_before = now - settings.REFUND_CLAIM_TIMEOUT
+    due = queryset.filter(
+        Q(status='pending') | Q(status='processing', claimed_at__lt=stale_before),
+        id__gt=after_id,
+    ).order_by('id')
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:limit])
+        Refund.objects.filter(id__in=ids).update(
+            status='processing',
+            claimed_at=now,
+            attempts=F('attempts') + 1,
+        )
+    return list(Refund.objects.filter(id__in=ids).select_related('payment').order_by('id'))
+
+
+def _call_gateway(gateway, refund):
+    """Runs in a pool thread; must not touch the database"""
+    try:
+        return refund, gateway.refund(refund.payment, refund.amount, refund.refund_id), None
+    except GatewayError as e:
+        return refund, None, e
+
+
+def _settle(refund, reference, error):
+    """Apply a gateway result to the refund, payment and booking together"""
+    with transaction.atomic():
+        if error is not None:
+            refund.last_error = str(error)
+            refund.status = 'failed' if refund.attempts >= settings.REFUND_MAX_ATTEMPTS else 'pending'
+            refund.save(update_fields=['status', 'last_error', 'updated_at'])
+            return
+
+        payment = Payment.objects.select_for_update().get(pk=refund.payment_id)
+        booking = Booking.objects.select_for_update().get(pk=payment.booking_id)
+
+        refund.status = 'succeeded'
+        refund.gateway_reference = reference
+        refund.last_error = None
+        refund.processed_at = timezone.now()
+        refund.save(update_fields=['status', 'gateway_reference', 'last_error', 'processed_at', 'updated_at'])
+
+        if payment.payment_status != 'refunded':
+            payment.payment_status = 'refunded'
+            payment.save()
+
+        # Completed work stays completed; anything upcoming is called off
+        if booking.status not in ('cancelled', 'completed'):
+            booking.status = 'cancelled'
+            booking.save()
+
+
+def _update_batches(batch_ids):
+    for batch in RefundBatch.objects.filter(id__in=batch_ids):
+        refunds = batch.refunds.all()
+        if refunds.filter(status__in=['pending', 'processing']).exists():
+            batch.status = 'processing'
+        else:
+            batch.status = 'completed_with_errors' if refunds.filter(status='failed').exists() else 'completed'
+            batch.completed_at = timezone.now()
+        batch.save(update_fields=['status', 'completed_at'])
+
+
+def process_refunds(queryset=None, chunk_size=None, max_workers=None):
+    """
+    Pay out due refunds in ``queryset`` (all refunds by default).
+
+    Each run walks the refunds by id once, so a refund that fails is retried
+    by the next run rather than spinning inside this one. Returns the number
+    of refunds that were attempted.
+    """
+    queryset = Refund.objects.all() if queryset is None else queryset
+    chunk_size = chunk_size or settings.REFUND_CHUNK_SIZE
+    max_workers = max_workers or settings.REFUND_MAX_WORKERS
+    gateway = get_gateway()
+
+    attempted = 0
+    after_id = 0
+    batch_ids = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            refunds = _claim_refunds(queryset, after_id, chunk_size)
+            if not refunds:
+                break
+            for refund, reference, error in pool.map(lambda r: _call_gateway(gateway, r), refunds):
+                _settle(refund, reference, error)
+                if refund.batch_id:
+                    batch_ids.add(refund.batch_id)
+            attempted += len(refunds)
+            after_id = refunds[-1].id
+
+    _update_batches(batch_ids)
+    return attempted
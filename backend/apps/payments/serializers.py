@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Payment
+from .models import Payment, ProviderDailyEarnings, Refund, RefundBatch
 from apps.bookings.serializers import BookingSerializer
 
 class PaymentSerializer(serializers.ModelSerializer):
@@ -22,3 +22,36 @@ class PaymentSerializer(serializers.ModelSerializer):
 class PaymentConfirmSerializer(serializers.Serializer):
     payment_intent_id = serializers.CharField()
     transaction_id = serializers.CharField(required=False)
+
+class ProviderDailyEarningsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProviderDailyEarnings
+        fields = (
+            'date', 'gross_amount', 'refunded_amount', 'net_amount',
+            'entry_count', 'updated_at'
+        )
+
+class RefundSerializer(serializers.ModelSerializer):
+    payment_id = serializers.UUIDField(source='payment.payment_id', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = Refund
+        fields = (
+            'refund_id', 'payment_id', 'amount', 'reason', 'status', 'status_display',
+            'attempts', 'gateway_reference', 'processed_at', 'created_at'
+        )
+
+class RefundBatchSerializer(serializers.ModelSerializer):
+    refunds = RefundSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = RefundBatch
+        fields = (
+            'batch_id', 'booking_date', 'reason', 'status', 'total_refunds',
+            'refunds', 'created_at', 'completed_at'
+        )
+
+class BulkRefundSerializer(serializers.Serializer):
+    booking_date = serializers.DateField()
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent after a payment is created or its status changes.
+# Arguments: payment, previous_status (None for new payments)
+payment_status_changed = Signal()
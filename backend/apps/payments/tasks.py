@@ -0,0 +1,17 @@
+from apps.tasks.queue import task
+from .models import Payment, Refund
+
+
+@task(priority=-10, batch=True)
+def purge_failed_payments(calls):
+    """Delete failed payment attempts of bookings that have started a new one"""
+    booking_ids = {call['booking_id'] for call in calls}
+    Payment.objects.filter(booking_id__in=booking_ids, payment_status='failed').delete()
+
+
+@task(priority=5)
+def process_refund_batch(batch_id):
+    """Pay out the refunds of a bulk refund request"""
+    from .refunds import process_refunds
+    # Refunds claimed here are only committed with the task; a retry reuses their idempotency keys
+    process_refunds(Refund.objects.filter(batch_id=batch_id))
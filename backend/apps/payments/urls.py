@@ -6,4 +6,9 @@ urlpatterns = [
     path('confirm/', views.confirm_payment, name='confirm-payment'),
     path('my/', views.MyPaymentsView.as_view(), name='my-payments'),
     path('booking/<uuid:booking_id>/', views.get_payment_status, name='payment-status'),
+    path('booking/<uuid:booking_id>/refund/', views.refund_booking, name='refund-booking'),
+    path('refunds/bulk/', views.bulk_refund, name='bulk-refund'),
+    path('refunds/batches/<uuid:batch_id>/', views.refund_batch_status, name='refund-batch-status'),
+    path('earnings/', views.ProviderEarningsView.as_view(), name='provider-earnings'),
+    path('earnings/export/', views.export_earnings, name='earnings-export'),
 ]
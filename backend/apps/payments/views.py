@@ -1,17 +1,36 @@
+import csv
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from .models import Payment
-from .serializers import PaymentSerializer
+from .models import Payment, EarningsEntry, ProviderDailyEarnings, Refund, RefundBatch
+from .serializers import (
+    PaymentSerializer,
+    ProviderDailyEarningsSerializer,
+    RefundSerializer,
+    RefundBatchSerializer,
+    BulkRefundSerializer
+)
+from .refunds import (
+    RefundError,
+    request_booking_refund,
+    request_provider_day_refunds,
+    process_refunds
+)
+from .tasks import process_refund_batch, purge_failed_payments
 from apps.bookings.models import Booking
+from apps.bookings.tasks import confirm_paid_booking
+from apps.core.throttling import PaymentsThrottle
 import uuid
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([PaymentsThrottle])
 def create_payment_intent(request):
     """Create payment intent for booking (UPI/Wallet only, always succeeds)"""
     try:
@@ -26,8 +45,6 @@ def create_payment_intent(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        existing_payments.filter(payment_status='failed').delete()
-
         with transaction.atomic():
             payment = Payment.objects.create(
                 booking=booking,
@@ -35,6 +52,9 @@ def create_payment_intent(request):
                 amount=booking.total_amount,
                 payment_status='processing'
             )
+            # Earlier failed attempts are cleaned up in the background
+            if existing_payments.filter(payment_status='failed').exists():
+                purge_failed_payments.delay(booking_id=booking.pk)
             return Response({
                 'payment_id': payment.payment_id,
                 'amount': float(booking.total_amount)
@@ -47,6 +67,7 @@ def create_payment_intent(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([PaymentsThrottle])
 def confirm_payment(request):
     """Confirm payment for UPI/Wallet (always succeed)"""
     try:
@@ -64,8 +85,9 @@ def confirm_payment(request):
             payment.processed_at = timezone.now()
             payment.save()
             if payment.booking.status == 'pending':
-                payment.booking.status = 'confirmed'
-                payment.booking.save()
+                # Inline: the client reads the booking straight after, and its
+                # status event must be published by the process serving the stream
+                confirm_paid_booking(booking_id=payment.booking_id)
             return Response({
                 'message': 'Payment confirmed successfully',
                 'payment': PaymentSerializer(payment).data
@@ -97,6 +119,63 @@ def get_payment_status(request, booking_id):
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([PaymentsThrottle])
+def refund_booking(request, booking_id):
+    """Refund the payment of a booking (its provider, or staff)"""
+    booking = get_object_or_404(Booking.objects.select_related('service'), booking_id=booking_id)
+    # Customers ask the provider; refunds are paid out right away, so they are never self-service
+    if request.user != booking.service.provider and not request.user.is_staff:
+        return Response(
+            {'error': 'Only the service provider or staff can refund a booking'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        refund = request_booking_refund(
+            booking,
+            reason=request.data.get('reason', ''),
+            requested_by=request.user,
+            approved=request.user.is_staff
+        )
+    except RefundError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    process_refunds(Refund.objects.filter(pk=refund.pk))
+    refund.refresh_from_db()
+    return Response(RefundSerializer(refund).data)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([PaymentsThrottle])
+def bulk_refund(request):
+    """Refund every paid, not yet started booking of the provider on one date (paid out by the task worker)"""
+    if request.user.user_type != 'provider':
+        return Response(
+            {'error': 'Only service providers can request bulk refunds'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    serializer = BulkRefundSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    batch = request_provider_day_refunds(
+        request.user,
+        serializer.validated_data['booking_date'],
+        reason=serializer.validated_data['reason'],
+        requested_by=request.user
+    )
+    if batch.total_refunds:
+        process_refund_batch.delay(batch_id=batch.pk)
+    return Response(RefundBatchSerializer(batch).data, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def refund_batch_status(request, batch_id):
+    """Get progress of a bulk refund"""
+    batch = get_object_or_404(RefundBatch, batch_id=batch_id, provider=request.user)
+    return Response(RefundBatchSerializer(batch).data)
+
 class MyPaymentsView(generics.ListAPIView):
     """List user's payments"""
     serializer_class = PaymentSerializer
@@ -110,3 +189,100 @@ class MyPaymentsView(generics.ListAPIView):
         else:  # provider
             queryset = queryset.filter(booking__service__provider=user)
         return queryset.order_by('-created_at')
+
+def _date_range(request):
+    """Parse optional ?start=&end= query params (YYYY-MM-DD)"""
+    bounds = {}
+    for param in ('start', 'end'):
+        value = request.query_params.get(param)
+        if value:
+            parsed = parse_date(value)
+            if parsed is None:
+                raise ValueError(f"Invalid {param} date, expected YYYY-MM-DD")
+            bounds[param] = parsed
+    return bounds.get('start'), bounds.get('end')
+
+class ProviderEarningsView(generics.ListAPIView):
+    """List the provider's daily earnings rollups"""
+    serializer_class = ProviderDailyEarningsSerializer
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        if request.user.user_type != 'provider':
+            return Response(
+                {'error': 'Only service providers have earnings'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            self.date_range = _date_range(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        start, end = self.date_range
+        queryset = ProviderDailyEarnings.objects.filter(provider=self.request.user)
+        if start:
+            queryset = queryset.filter(date__gte=start)
+        if end:
+            queryset = queryset.filter(date__lte=end)
+        return queryset.order_by('-date')
+
+class _Echo:
+    """File-like object that hands each written CSV line straight back"""
+    def write(self, value):
+        return value
+
+EARNINGS_CSV_HEADER = (
+    'entry_id', 'date', 'type', 'amount', 'booking_id',
+    'payment_id', 'service', 'payment_method', 'recorded_at'
+)
+EARNINGS_EXPORT_CHUNK_SIZE = 2000
+
+def _iter_ledger(queryset, chunk_size=EARNINGS_EXPORT_CHUNK_SIZE):
+    """Walk the ledger by keyset (id > last seen) so no OFFSET scans are needed"""
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id).order_by('id').values_list(
+                'id', 'entry_date', 'entry_type', 'amount', 'booking_reference',
+                'payment_reference', 'service_name', 'payment_method', 'created_at'
+            )[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1][0]
+
+def _earnings_csv_lines(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EARNINGS_CSV_HEADER)
+    for row in _iter_ledger(queryset):
+        row = list(row)
+        row[-1] = timezone.localtime(row[-1]).isoformat()
+        yield writer.writerow(row)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_earnings(request):
+    """Stream the provider's earnings ledger as CSV"""
+    if request.user.user_type != 'provider':
+        return Response(
+            {'error': 'Only service providers have earnings'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    try:
+        start, end = _date_range(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    queryset = EarningsEntry.objects.filter(provider=request.user)
+    if start:
+        queryset = queryset.filter(entry_date__gte=start)
+    if end:
+        queryset = queryset.filter(entry_date__lte=end)
+
+    response = StreamingHttpResponse(_earnings_csv_lines(queryset), content_type='text/csv')
+    filename = f"earnings-{start or 'all'}-{end or timezone.localdate()}.csv"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
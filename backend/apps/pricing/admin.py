@@ -0,0 +1,14 @@
+from django.contrib import admin
+from apps.core.admin import LargeTableAdmin
+from .models import SlotDemand
+
+
+@admin.register(SlotDemand)
+class SlotDemandAdmin(LargeTableAdmin):
+    list_display = ('category', 'area', 'date', 'time_slot', 'booked', 'capacity', 'rejections', 'multiplier', 'updated_at')
+    list_filter = ('category',)
+    search_fields = ('area',)
+    exact_search_fields = {'area': 'exact'}
+    search_help_text = 'Exact normalized area (lowercase); prefix with ~ for a substring search'
+    ordering = ('-date', 'time_slot')
+    readonly_fields = ('booked', 'capacity', 'rejections', 'multiplier', 'updated_at')
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PricingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.pricing'
+    verbose_name = 'Pricing'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,197 @@
+"""
+Demand-based slot pricing.
+
+The demand matrix (``SlotDemand``) has one row per (category, area, date,
+time slot) that has seen demand: the bookings holding the slot, the
+available services of the category in the area (capacity), and the users
+turned away because the slot was already taken, which stand in for a
+waitlist. The price multiplier of a cell grows with its pressure::
+
+    waitlist = min(PRICING_REJECTION_WEIGHT * rejections / capacity, PRICING_MAX_REJECTION_PRESSURE)
+    pressure = booked / capacity + waitlist
+    multiplier = 1 + PRICING_SENSITIVITY * max(0, pressure - PRICING_TARGET_UTILIZATION)
+
+capped at ``PRICING_MAX_MULTIPLIER`` and rounded to ``PRICING_MULTIPLIER_STEP``.
+Cells without a row are priced at the base rate, so the matrix stays sparse.
+
+Rejections are ``SlotRejection`` rows: a user counts once per cell, however
+often they retry, and only for ``PRICING_REJECTION_TTL`` seconds, after
+which a queued recompute takes the cell back down. Repeated attempts can
+therefore neither inflate a price nor keep it inflated.
+
+The matrix is maintained off the request path by the ``recompute_demand``
+task, queued by bookings taking or releasing a slot, by turned-away booking
+attempts and by changes to a service's category, area or availability. Each
+run recomputes only the cells of the (category, area, date) groups it was
+queued for. ``manage.py rebuild_demand`` recomputes the whole booking
+horizon, e.g. after services moved to another area or category, whose old
+cells are not revisited otherwise.
+
+A quote is one indexed lookup. It comes with a signed token valid for
+``PRICING_QUOTE_TTL`` seconds; a booking created with the token gets the
+quoted rate, stored on the booking row by the same insert
+(``hourly_rate``, ``price_multiplier``, ``total_amount``), so later demand
+changes never reprice it.
+"""
+from collections import Counter, namedtuple
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from apps.services.models import area_key  # noqa: F401 (re-exported: the key cells are stored under)
+from .models import SlotDemand, SlotRejection
+
+# Statuses that hold a slot, as checked by BookingCreateSerializer
+BLOCKING_STATUSES = ('pending', 'confirmed', 'in_progress')
+QUOTE_SALT = 'apps.pricing.quote'
+CENT = Decimal('0.01')
+BASE_MULTIPLIER = Decimal('1.00')
+
+Quote = namedtuple('Quote', (
+    'service_id', 'booking_date', 'time_slot', 'hours_requested',
+    'base_price', 'multiplier', 'hourly_rate', 'total_amount',
+))
+
+
+class QuoteInvalid(Exception):
+    """A quote token that is forged, expired or for another booking"""
+
+
+def multiplier_for(booked, capacity, rejections):
+    capacity = max(capacity, 1)
+    waitlist = min(settings.PRICING_REJECTION_WEIGHT * rejections / capacity, settings.PRICING_MAX_REJECTION_PRESSURE)
+    pressure = booked / capacity + waitlist
+    multiplier = 1 + settings.PRICING_SENSITIVITY * max(0, pressure - settings.PRICING_TARGET_UTILIZATION)
+    multiplier = min(multiplier, settings.PRICING_MAX_MULTIPLIER)
+    step = settings.PRICING_MULTIPLIER_STEP
+    return Decimal(str(round(multiplier / step) * step)).quantize(CENT)
+
+
+def current_multiplier(service, booking_date, time_slot):
+    multiplier = SlotDemand.objects.filter(
+        category=service.category,
+        area=service.area,
+        date=booking_date,
+        time_slot=time_slot,
+    ).values_list('multiplier', flat=True).first()
+    return BASE_MULTIPLIER if multiplier is None else multiplier
+
+
+def _quote(service, booking_date, time_slot, hours_requested, multiplier):
+    hourly_rate = (service.price_per_hour * multiplier).quantize(CENT)
+    return Quote(
+        service.id, booking_date, time_slot, hours_requested,
+        service.price_per_hour, multiplier, hourly_rate, hourly_rate * hours_requested,
+    )
+
+
+def quote(service, booking_date, time_slot, hours_requested):
+    """Price of a slot at the current demand"""
+    return _quote(service, booking_date, time_slot, hours_requested, current_multiplier(service, booking_date, time_slot))
+
+
+def sign(quote, user):
+    """Token that lets ``user`` book at the quoted price for ``PRICING_QUOTE_TTL`` seconds"""
+    return signing.dumps({
+        'user': user.pk,
+        'service': quote.service_id,
+        'date': quote.booking_date.isoformat(),
+        'slot': quote.time_slot,
+        'hours': quote.hours_requested,
+        'multiplier': str(quote.multiplier),
+    }, salt=QUOTE_SALT)
+
+
+def redeem(token, user, service, booking_date, time_slot, hours_requested):
+    """The quote a token was issued for; raises QuoteInvalid"""
+    try:
+        claims = signing.loads(token, salt=QUOTE_SALT, max_age=settings.PRICING_QUOTE_TTL)
+    except signing.SignatureExpired:
+        raise QuoteInvalid('This quote has expired, request a new one.')
+    except signing.BadSignature:
+        raise QuoteInvalid('Invalid quote.')
+    issued_for = (claims['user'], claims['service'], claims['date'], claims['slot'], claims['hours'])
+    if issued_for != (user.pk, service.id, booking_date.isoformat(), time_slot, hours_requested):
+        raise QuoteInvalid('The quote was issued for a different booking.')
+    # The base price is read again: a quote locks the multiplier, not a price the provider has since changed
+    return _quote(service, booking_date, time_slot, hours_requested, Decimal(claims['multiplier']))
+
+
+def horizon():
+    """The dates bookings can currently be made for"""
+    today = timezone.now().date()
+    return [today + timedelta(days=offset) for offset in range(settings.PRICING_HORIZON_DAYS + 1)]
+
+
+def queue_refresh(service, booking_date=None, rejected_slot=None, rejected_by=None):
+    """
+    Queue a recompute of the service's cells on a date (the whole horizon without one).
+
+    ``rejected_slot`` and ``rejected_by`` record the user turned away from a
+    slot; another recompute is queued for when the rejection expires.
+    """
+    from .tasks import recompute_demand
+    cells = {
+        'category': service.category,
+        'area': service.area,
+        'date': booking_date.isoformat() if booking_date else None,
+    }
+    if rejected_slot and rejected_by:
+        recompute_demand.delay(rejected_slot=rejected_slot, rejected_by=rejected_by, **cells)
+        recompute_demand.delay(countdown=settings.PRICING_REJECTION_TTL + 1, **cells)
+    else:
+        recompute_demand.delay(**cells)
+
+
+def refresh_cells(category, area, dates, rejections=None):
+    """
+    Recompute the cells of one category and area on the given dates.
+
+    ``rejections`` holds newly turned-away ``(date, time_slot, user_id)``;
+    a user already counted for a cell is not counted again. Call inside a
+    transaction.
+    """
+    from apps.bookings.models import Booking
+    from apps.services.models import Service
+
+    capacity = Service.objects.filter(category=category, area=area, is_available=True).count()
+    booked = Counter(
+        Booking.objects.filter(
+            service__category=category, service__area=area, booking_date__in=dates, status__in=BLOCKING_STATUSES
+        ).order_by().values_list('booking_date', 'time_slot')
+    )
+    stored = set(
+        SlotDemand.objects.select_for_update().filter(category=category, area=area, date__in=dates)
+        .values_list('date', 'time_slot')
+    )
+    recorded = SlotRejection.objects.filter(category=category, area=area, date__in=dates)
+    # Expired first, so a user turned away again after expiry counts afresh
+    recorded.filter(created_at__lte=timezone.now() - timedelta(seconds=settings.PRICING_REJECTION_TTL)).delete()
+    if rejections:
+        SlotRejection.objects.bulk_create([
+            SlotRejection(category=category, area=area, date=date, time_slot=time_slot, user_id=user_id)
+            for date, time_slot, user_id in rejections
+        ], ignore_conflicts=True)
+    rejected = Counter(recorded.values_list('date', 'time_slot'))
+
+    cells = []
+    for date in dates:
+        for time_slot, _ in Booking.TIME_SLOT_CHOICES:
+            key = (date, time_slot)
+            turned_away = rejected.get(key, 0)
+            count = booked.get(key, 0)
+            if key not in stored and not count and not turned_away:
+                continue
+            cells.append(SlotDemand(
+                category=category, area=area, date=date, time_slot=time_slot,
+                booked=count, capacity=capacity, rejections=turned_away,
+                multiplier=multiplier_for(count, capacity, turned_away),
+            ))
+    SlotDemand.objects.bulk_create(
+        cells,
+        update_conflicts=True,
+        unique_fields=['category', 'area', 'date', 'time_slot'],
+        update_fields=['booked', 'capacity', 'rejections', 'multiplier', 'updated_at'],
+    )
+    return len(cells)
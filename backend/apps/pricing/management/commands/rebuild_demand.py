@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from apps.services.models import Service
+from apps.pricing.engine import horizon, refresh_cells
+from apps.pricing.models import SlotDemand, SlotRejection
+
+
+class Command(BaseCommand):
+    help = 'Recompute the demand matrix over the booking horizon and drop past cells'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', action='append', help='Only rebuild this category (repeatable)')
+
+    def handle(self, *args, **options):
+        dates = horizon()
+        services = Service.objects.all()
+        if options['category']:
+            services = services.filter(category__in=options['category'])
+        groups = set(services.order_by().values_list('category', 'area').distinct())
+
+        deleted, _ = SlotDemand.objects.filter(date__lt=dates[0]).delete()
+        SlotRejection.objects.filter(date__lt=dates[0]).delete()
+        cells = 0
+        for category, area in sorted(groups):
+            with transaction.atomic():
+                cells += refresh_cells(category, area, dates)
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {cells} cell(s) in {len(groups)} category/area group(s), removed {deleted} past cell(s)'
+        ))
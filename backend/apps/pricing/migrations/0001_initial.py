@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotDemand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20)),
+                ('area', models.CharField(blank=True, help_text='Normalized service area (see apps.pricing.engine.area_key)', max_length=100)),
+                ('date', models.DateField()),
+                ('time_slot', models.CharField(max_length=5)),
+                ('booked', models.PositiveIntegerField(default=0, help_text='Bookings holding the slot')),
+                ('capacity', models.PositiveIntegerField(default=0, help_text='Available services of the category in the area')),
+                ('rejections', models.PositiveIntegerField(default=0, help_text='Booking attempts turned away because the slot was taken')),
+                ('multiplier', models.DecimalField(decimal_places=2, default=1, max_digits=4)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Slot Demand',
+                'verbose_name_plural': 'Slot Demand',
+                'db_table': 'slot_demand',
+                'ordering': ['date', 'time_slot'],
+                'indexes': [models.Index(fields=['date'], name='slot_demand_date_idx')],
+                'unique_together': {('category', 'area', 'date', 'time_slot')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 21:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('pricing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='slotdemand',
+            name='rejections',
+            field=models.PositiveIntegerField(default=0, help_text='Users turned away because the slot was taken, within PRICING_REJECTION_TTL'),
+        ),
+        migrations.CreateModel(
+            name='SlotRejection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20)),
+                ('area', models.CharField(blank=True, max_length=100)),
+                ('date', models.DateField()),
+                ('time_slot', models.CharField(max_length=5)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_rejections', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'slot_rejections',
+                'unique_together': {('category', 'area', 'date', 'time_slot', 'user')},
+            },
+        ),
+    ]
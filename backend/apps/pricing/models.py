@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import models
+
+
+class SlotDemand(models.Model):
+    """One cell of the demand matrix: a time slot of a category in an area on a date"""
+    category = models.CharField(max_length=20)
+    area = models.CharField(max_length=100, blank=True, help_text="Normalized service area (see apps.pricing.engine.area_key)")
+    date = models.DateField()
+    time_slot = models.CharField(max_length=5)
+    booked = models.PositiveIntegerField(default=0, help_text="Bookings holding the slot")
+    capacity = models.PositiveIntegerField(default=0, help_text="Available services of the category in the area")
+    rejections = models.PositiveIntegerField(default=0, help_text="Users turned away because the slot was taken, within PRICING_REJECTION_TTL")
+    multiplier = models.DecimalField(max_digits=4, decimal_places=2, default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.category}/{self.area or '-'} {self.date} {self.time_slot}: x{self.multiplier}"
+
+    class Meta:
+        db_table = 'slot_demand'
+        ordering = ['date', 'time_slot']
+        verbose_name = 'Slot Demand'
+        verbose_name_plural = 'Slot Demand'
+        unique_together = ['category', 'area', 'date', 'time_slot']
+        indexes = [
+            models.Index(fields=['date'], name='slot_demand_date_idx'),
+        ]
+
+
+class SlotRejection(models.Model):
+    """A user turned away from a taken slot; each user counts once per cell until it expires"""
+    category = models.CharField(max_length=20)
+    area = models.CharField(max_length=100, blank=True)
+    date = models.DateField()
+    time_slot = models.CharField(max_length=5)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='slot_rejections')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.category}/{self.area or '-'} {self.date} {self.time_slot}: user {self.user_id}"
+
+    class Meta:
+        db_table = 'slot_rejections'
+        unique_together = ['category', 'area', 'date', 'time_slot', 'user']
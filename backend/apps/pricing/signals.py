@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from apps.bookings.signals import booking_status_changed
+from apps.services.models import Service
+from .engine import BLOCKING_STATUSES, queue_refresh
+
+# Service fields the demand cells depend on
+DEMAND_FIELDS = frozenset({'category', 'service_area', 'is_available'})
+
+
+@receiver(booking_status_changed)
+def booking_demand_changed(sender, booking, previous_status, **kwargs):
+    # Only taking or releasing the slot changes its demand (pending -> confirmed does not)
+    if (booking.status in BLOCKING_STATUSES) != (previous_status in BLOCKING_STATUSES):
+        queue_refresh(booking.service, booking.booking_date)
+
+
+@receiver(post_save, sender=Service)
+def service_capacity_changed(sender, instance, created, update_fields=None, **kwargs):
+    # Stats refreshes only touch total_bookings and rating
+    if update_fields is not None and not DEMAND_FIELDS & update_fields:
+        return
+    queue_refresh(instance)
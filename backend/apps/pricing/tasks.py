@@ -0,0 +1,24 @@
+from datetime import date
+from apps.tasks.queue import task
+from .engine import horizon, refresh_cells
+
+
+@task(batch=True, priority=-5)
+def recompute_demand(calls):
+    """Recompute the demand cells of the (category, area, date) groups of the calls"""
+    groups = {}
+    for call in calls:
+        dates, rejections = groups.setdefault((call['category'], call['area']), (set(), set()))
+        if call['date'] is None:
+            dates.update(horizon())
+            continue
+        day = date.fromisoformat(call['date'])
+        dates.add(day)
+        if call.get('rejected_slot') and call.get('rejected_by'):
+            rejections.add((day, call['rejected_slot'], call['rejected_by']))
+
+    today = horizon()[0]
+    for (category, area), (dates, rejections) in groups.items():
+        dates = sorted(day for day in dates if day >= today)
+        if dates:
+            refresh_cells(category, area, dates, [rejection for rejection in rejections if rejection[0] >= today])
@@ -0,0 +1,182 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.bookings.models import Booking
+from apps.bookings.serializers import BookingQuoteSerializer
+from apps.services.models import Service
+from apps.users.models import User
+from . import engine
+from .models import SlotDemand, SlotRejection
+
+
+def make_user(username, user_type='customer'):
+    return User.objects.create_user(
+        username=username, email=f'{username}@example.com', password='pw-123456x', user_type=user_type
+    )
+
+
+@override_settings(
+    PRICING_SENSITIVITY=0.5,
+    PRICING_TARGET_UTILIZATION=0.5,
+    PRICING_REJECTION_WEIGHT=0.5,
+    PRICING_MAX_REJECTION_PRESSURE=0.5,
+    PRICING_MAX_MULTIPLIER=2.0,
+    PRICING_MULTIPLIER_STEP=0.05,
+)
+class MultiplierTests(TestCase):
+    def test_base_rate_up_to_target_utilization(self):
+        self.assertEqual(engine.multiplier_for(0, 4, 0), Decimal('1.00'))
+        self.assertEqual(engine.multiplier_for(2, 4, 0), Decimal('1.00'))
+
+    def test_grows_with_pressure(self):
+        self.assertEqual(engine.multiplier_for(4, 4, 0), Decimal('1.25'))
+        self.assertEqual(engine.multiplier_for(4, 4, 2), Decimal('1.40'))
+
+    def test_rejection_pressure_is_capped(self):
+        self.assertEqual(engine.multiplier_for(4, 4, 4), Decimal('1.50'))
+        self.assertEqual(engine.multiplier_for(4, 4, 1000), Decimal('1.50'))
+
+    def test_capped_at_max_multiplier(self):
+        self.assertEqual(engine.multiplier_for(40, 4, 0), Decimal('2.00'))
+
+    def test_no_capacity_counts_as_one(self):
+        self.assertEqual(engine.multiplier_for(1, 0, 0), Decimal('1.25'))
+
+
+class PricingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = make_user('customer')
+        cls.other = make_user('other')
+        cls.service = Service.objects.create(
+            provider=make_user('provider', 'provider'),
+            name='Deep clean',
+            description='Whole flat',
+            category='cleaning',
+            price_per_hour=Decimal('100.00'),
+            service_area='Downtown',
+        )
+        cls.date = timezone.now().date() + timedelta(days=1)
+
+
+class QuoteTokenTests(PricingTestCase):
+    def setUp(self):
+        SlotDemand.objects.create(
+            category='cleaning', area='downtown', date=self.date, time_slot='09:00',
+            booked=1, capacity=1, multiplier=Decimal('1.25'),
+        )
+        self.quote = engine.quote(self.service, self.date, '09:00', 2)
+        self.token = engine.sign(self.quote, self.customer)
+
+    def redeem(self, user=None, time_slot='09:00', hours=2):
+        return engine.redeem(self.token, user or self.customer, self.service, self.date, time_slot, hours)
+
+    def test_quote_at_current_demand(self):
+        self.assertEqual(self.quote.multiplier, Decimal('1.25'))
+        self.assertEqual(self.quote.hourly_rate, Decimal('125.00'))
+        self.assertEqual(self.quote.total_amount, Decimal('250.00'))
+
+    def test_redeem_locks_quoted_multiplier(self):
+        SlotDemand.objects.update(multiplier=Decimal('2.00'))
+        self.assertEqual(self.redeem(), self.quote)
+
+    def test_redeem_rereads_base_price(self):
+        self.service.price_per_hour = Decimal('80.00')
+        self.assertEqual(self.redeem().hourly_rate, Decimal('100.00'))
+
+    def test_expired_token(self):
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 3600), \
+                override_settings(PRICING_QUOTE_TTL=60):
+            with self.assertRaisesMessage(engine.QuoteInvalid, 'expired'):
+                self.redeem()
+
+    def test_tampered_token(self):
+        self.token = self.token[:-1] + ('A' if self.token[-1] != 'A' else 'B')
+        with self.assertRaisesMessage(engine.QuoteInvalid, 'Invalid quote.'):
+            self.redeem()
+
+    def test_token_of_another_user(self):
+        with self.assertRaisesMessage(engine.QuoteInvalid, 'different booking'):
+            self.redeem(user=self.other)
+
+    def test_token_for_another_booking(self):
+        for changes in ({'time_slot': '10:00'}, {'hours': 3}):
+            with self.subTest(**changes), self.assertRaises(engine.QuoteInvalid):
+                self.redeem(**changes)
+
+
+class RejectionTests(PricingTestCase):
+    def refresh(self, *rejections):
+        return engine.refresh_cells('cleaning', 'downtown', [self.date], [
+            (self.date, '09:00', user.pk) for user in rejections
+        ])
+
+    def rejections(self):
+        return SlotDemand.objects.get(date=self.date, time_slot='09:00').rejections
+
+    def test_user_counts_once_per_slot(self):
+        self.refresh(self.customer)
+        self.refresh(self.customer, self.customer)
+        self.assertEqual(self.rejections(), 1)
+        self.refresh(self.other)
+        self.assertEqual(self.rejections(), 2)
+
+    @override_settings(PRICING_REJECTION_TTL=60)
+    def test_rejections_expire(self):
+        self.refresh(self.customer, self.other)
+        SlotRejection.objects.filter(user=self.customer).update(created_at=timezone.now() - timedelta(seconds=61))
+        self.refresh()
+        self.assertEqual(self.rejections(), 1)
+        self.assertEqual(SlotDemand.objects.get(date=self.date, time_slot='09:00').multiplier, Decimal('1.00'))
+
+    def test_expired_user_counts_again(self):
+        self.refresh(self.customer)
+        SlotRejection.objects.update(created_at=timezone.now() - timedelta(days=1))
+        self.refresh(self.customer)
+        self.assertEqual(self.rejections(), 1)
+
+
+class CellTests(PricingTestCase):
+    def cell(self):
+        engine.refresh_cells('cleaning', 'downtown', [self.date])
+        return SlotDemand.objects.get(category='cleaning', area='downtown', date=self.date, time_slot='09:00')
+
+    def add_service(self, service_area):
+        return Service.objects.create(
+            provider=self.service.provider, name='Window clean', description='Outside', category='cleaning',
+            price_per_hour=Decimal('60.00'), service_area=service_area,
+        )
+
+    def test_counts_services_and_bookings_of_normalized_area(self):
+        for service in (self.service, self.add_service('  DOWNTOWN '), self.add_service('Uptown')):
+            Booking.objects.create(
+                customer=self.customer, service=service, booking_date=self.date, time_slot='09:00',
+                customer_address='Main St', customer_phone='9000000000', total_amount=Decimal('100.00'),
+            )
+        cell = self.cell()
+        self.assertEqual((cell.booked, cell.capacity), (2, 2))
+
+    def test_area_follows_service_area_updates(self):
+        service = self.add_service('Uptown')
+        service.service_area = 'Downtown'
+        service.save(update_fields=['service_area'])
+        self.assertEqual(Service.objects.get(pk=service.pk).area, 'downtown')
+        SlotDemand.objects.create(category='cleaning', area='downtown', date=self.date, time_slot='09:00')
+        self.assertEqual(self.cell().capacity, 2)
+
+
+class BookingHorizonTests(PricingTestCase):
+    def validate(self, days):
+        return BookingQuoteSerializer(data={
+            'service': self.service.pk,
+            'booking_date': timezone.now().date() + timedelta(days=days),
+            'time_slot': '09:00',
+        }).is_valid()
+
+    @override_settings(PRICING_HORIZON_DAYS=7)
+    def test_dates_within_pricing_horizon(self):
+        self.assertTrue(self.validate(7))
+        self.assertFalse(self.validate(8))
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class RealtimeConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.realtime'
+    verbose_name = 'Realtime'
+
+    def ready(self):
+        from . import signals  # noqa: F401
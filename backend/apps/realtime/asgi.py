@@ -0,0 +1,45 @@
+"""
+ASGI wrapper that tells streaming views when their client went away.
+
+Django 4.2 stops reading ``receive`` once the request body is in, and
+uvicorn drops writes to a closed connection without raising, so an event
+stream whose client disconnected would only end with its lifetime, holding
+its broker subscription all along. Once the body has been read, the wrapper
+keeps listening on ``receive`` and sets ``scope['disconnected']`` (an
+``asyncio.Event``) on ``http.disconnect``; views read it from
+``request.scope``.
+"""
+import asyncio
+
+SCOPE_KEY = 'disconnected'
+
+
+def watch_disconnects(application):
+    async def app(scope, receive, send):
+        if scope['type'] != 'http':
+            return await application(scope, receive, send)
+
+        disconnected = asyncio.Event()
+        watcher = None
+
+        async def watch():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        async def receive_body():
+            nonlocal watcher
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+            elif not message.get('more_body', False) and watcher is None:
+                # The body is complete; Django does not call receive again
+                watcher = asyncio.ensure_future(watch())
+            return message
+
+        try:
+            await application(dict(scope, **{SCOPE_KEY: disconnected}), receive_body, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+    return app
@@ -0,0 +1,122 @@
+"""
+Pub/sub brokers for pushing status events to connected clients.
+
+``InProcessBroker`` fans messages out to subscribers living in the same
+process, which is enough for a single ASGI worker. Events published anywhere
+else, including by ``manage.py run_tasks`` workers, reach nobody. Multi-worker
+deployments, and any that publish from task workers, point ``REALTIME_BROKER``
+at a broker backed by a shared store; it only has to implement ``publish`` and
+``subscribe``.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """One client's view of a channel, bound to the event loop that created it"""
+
+    def __init__(self, broker, channel, max_queue):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def deliver(self, message):
+        """Hand a message over from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The event loop is gone; the client will never read again
+            self.close()
+
+    def _put(self, message):
+        # A client that stopped reading loses its oldest events, not memory
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout, disconnected=None):
+        """Wait for the next message; returns None after ``timeout`` seconds or once ``disconnected`` is set"""
+        waiters = [asyncio.ensure_future(self.queue.get())]
+        if disconnected is not None:
+            waiters.append(asyncio.ensure_future(disconnected.wait()))
+        done, pending = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        # A cancelled Queue.get() never takes an item
+        for waiter in pending:
+            waiter.cancel()
+        return waiters[0].result() if waiters[0] in done else None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    """Interface every realtime broker implements"""
+
+    # Whether messages published in one process reach subscribers in others
+    shared = True
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        """Return a ``Subscription``; must be called from the event loop"""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InProcessBroker(BaseBroker):
+    """Broker for subscribers in the current process"""
+
+    shared = False
+
+    def __init__(self, max_queue=None):
+        self.max_queue = max_queue or settings.REALTIME_MAX_QUEUE
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.max_queue)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+def get_broker():
+    """Return the process-wide broker configured by ``REALTIME_BROKER``"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.REALTIME_BROKER)()
+    return _broker
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from apps.bookings.signals import booking_status_changed
+from apps.payments.signals import payment_status_changed
+from .broker import get_broker, user_channel
+
+
+def _publish_on_commit(recipient_ids, message):
+    """Publish once the transition is committed, so clients never see rolled back states"""
+    def publish():
+        broker = get_broker()
+        for user_id in recipient_ids:
+            broker.publish(user_channel(user_id), message)
+    transaction.on_commit(publish)
+
+
+@receiver(booking_status_changed)
+def push_booking_status(sender, booking, previous_status, **kwargs):
+    _publish_on_commit(
+        {booking.customer_id, booking.service.provider_id},
+        {
+            'event': 'booking.status',
+            'booking_id': str(booking.booking_id),
+            'status': booking.status,
+            'previous_status': previous_status,
+            'at': timezone.now().isoformat(),
+        }
+    )
+
+
+@receiver(payment_status_changed)
+def push_payment_status(sender, payment, previous_status, **kwargs):
+    booking = payment.booking
+    _publish_on_commit(
+        {booking.customer_id, booking.service.provider_id},
+        {
+            'event': 'payment.status',
+            'payment_id': str(payment.payment_id),
+            'booking_id': str(booking.booking_id),
+            'status': payment.payment_status,
+            'previous_status': previous_status,
+            'at': timezone.now().isoformat(),
+        }
+    )
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import time
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from apps.users.authentication import aauthenticate_request
+from .asgi import SCOPE_KEY
+from .broker import get_broker, user_channel
+
+
+async def _event_stream(subscription, disconnected):
+    """Yield SSE frames until the client disconnects or the stream lifetime runs out"""
+    deadline = time.monotonic() + settings.REALTIME_STREAM_LIFETIME
+    try:
+        yield f"retry: {settings.REALTIME_RETRY_MS}\n\n"
+        while time.monotonic() < deadline and not disconnected.is_set():
+            message = await subscription.get(settings.REALTIME_HEARTBEAT, disconnected)
+            if message is None:
+                # Comment frame keeps proxies from closing an idle stream, and
+                # fails fast on servers that raise on writes to a closed connection
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        subscription.close()
+
+
+async def event_stream(request):
+    """Server-Sent Events stream of booking and payment status changes for the user"""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    user = await aauthenticate_request(request, allow_query_token=True)
+    if user is None:
+        return JsonResponse(
+            {'error': 'Authentication credentials were not provided or are invalid'},
+            status=401
+        )
+
+    # Set by apps.realtime.asgi.watch_disconnects; never set without it
+    disconnected = request.scope.get(SCOPE_KEY) or asyncio.Event()
+    subscription = get_broker().subscribe(user_channel(user.pk))
+    response = StreamingHttpResponse(_event_stream(subscription, disconnected), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,13 +1,22 @@
 from django.contrib import admin
+from apps.core.admin import LargeTableAdmin, date_drilldown_filter
 from .models import Service
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(LargeTableAdmin):
     list_display = (
         'name', 'provider', 'category', 'price_per_hour', 
         'rating', 'total_bookings', 'is_available', 'created_at'
     )
-    list_filter = ('category', 'is_available', 'created_at')
-    search_fields = ('name', 'description', 'provider__username', 'service_area')
+    list_filter = ('category', 'is_available', date_drilldown_filter('created_at'))
+    list_select_related = ('provider',)
+    search_fields = ('name', 'provider__username', 'service_area')
+    exact_search_fields = {
+        'id': 'int',
+        'provider__username': 'exact',
+        'provider__email': 'email',
+    }
+    search_help_text = 'Service ID, provider username or email. Prefix with ~ for a slow partial match, e.g. on the name.'
     ordering = ('-created_at',)
+    raw_id_fields = ('provider',)
     readonly_fields = ('rating', 'total_bookings', 'created_at', 'updated_at')
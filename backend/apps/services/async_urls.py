@@ -0,0 +1,9 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('', async_views.service_list, name='async-service-list'),
+    path('categories/', async_views.service_categories, name='async-service-categories'),
+    path('stats/', async_views.service_stats, name='async-service-stats'),
+    path('<int:pk>/', async_views.service_detail, name='async-service-detail'),
+]
@@ -0,0 +1,53 @@
+from django.db.models import Avg
+from django.http import Http404
+from apps.core.async_api import api_response, async_api_view, view_queryset
+from apps.core.throttling import CatalogThrottle
+from .models import Service
+from .recommendations import recommended
+from .serializers import RecommendedServiceSerializer, ServiceSerializer
+from .views import ServiceListView, ServiceDetailView
+
+
+@async_api_view(throttle_classes=[CatalogThrottle])
+async def service_list(request):
+    """Async variant of ServiceListView"""
+    services = [service async for service in view_queryset(ServiceListView, request)]
+    return api_response(ServiceSerializer(services, many=True).data)
+
+
+@async_api_view(throttle_classes=[CatalogThrottle])
+async def service_detail(request, pk):
+    """Async variant of ServiceDetailView"""
+    service = await ServiceDetailView.queryset.filter(pk=pk).afirst()
+    if service is None:
+        raise Http404
+    data = ServiceSerializer(service).data
+    data['also_booked'] = RecommendedServiceSerializer(
+        [row.neighbor async for row in recommended(pk)], many=True
+    ).data
+    return api_response(data)
+
+
+@async_api_view(throttle_classes=[CatalogThrottle])
+async def service_categories(request):
+    """Async variant of service_categories"""
+    categories = [
+        {'value': choice[0], 'label': choice[1]}
+        for choice in Service.CATEGORY_CHOICES
+    ]
+    return api_response(categories)
+
+
+@async_api_view(throttle_classes=[CatalogThrottle])
+async def service_stats(request):
+    """Async variant of service_stats"""
+    available = Service.objects.filter(is_available=True)
+    total_services = await available.acount()
+    total_providers = await available.values('provider').distinct().acount()
+    avg_price = (await available.aaggregate(avg_price=Avg('price_per_hour')))['avg_price'] or 0
+
+    return api_response({
+        'total_services': total_services,
+        'total_providers': total_providers,
+        'average_price': round(float(avg_price), 2),
+    })
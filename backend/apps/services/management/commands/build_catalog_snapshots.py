@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from apps.services.snapshots import all_keys, build_snapshots, category_key
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the static catalog snapshots (top services and one file per category)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', action='append', help='Only rebuild this category (repeatable)')
+
+    def handle(self, *args, **options):
+        keys = [category_key(category) for category in options['category']] if options['category'] else all_keys()
+        changed = build_snapshots(keys)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(keys)} snapshot(s), {len(changed)} changed'))
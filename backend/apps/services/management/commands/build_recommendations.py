@@ -0,0 +1,12 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.services.recommendations import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the co-booking neighbours of every service from completed bookings'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Stored {rows} neighbour row(s) in {time.perf_counter() - started:.1f}s'))
@@ -0,0 +1,250 @@
+"""
+Provider matching: ranks the services of a category for one customer request.
+
+Each worker keeps the catalog in memory as NumPy columns (id, category,
+price, rating, completed bookings, availability flag, area), so a match is
+one vectorized pass over every service instead of a query per candidate.
+Candidates are the available services of the category whose requested slot
+is free; each gets five scores in ``[0, 1]``:
+
+* ``availability``: share of the day's slots still free,
+* ``rating``: rating out of 5,
+* ``volume``: completed bookings, log-scaled against the busiest candidate,
+* ``price``: 1 within the budget, falling to 0 at twice the budget; without
+  a budget, cheaper scores higher within the candidates' price range,
+* ``locality``: share of the requested area's words found in the service area,
+
+weighted by ``MATCHING_WEIGHTS``. Bookings of the requested date and
+category come from the database on every match, so availability is never
+stale.
+
+The snapshot is refreshed incrementally: at most every
+``MATCHING_REFRESH_INTERVAL`` seconds, services updated since the last
+refresh (with ``MATCHING_REFRESH_OVERLAP`` seconds of overlap, for
+transactions that committed late) are re-read and patched into the columns.
+Deletions only show up in the full reload done every
+``MATCHING_FULL_REFRESH`` seconds (or right away for deletes made by this
+process); until then, matches for deleted services are dropped when the
+results are loaded.
+"""
+import re
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from .models import Service
+
+FIELDS = ('id', 'category', 'price_per_hour', 'rating', 'total_bookings', 'is_available', 'service_area')
+COLUMNS = {
+    'id': np.int64,
+    'category': np.int16,
+    'price': np.float64,
+    'rating': np.float32,
+    'bookings': np.float32,
+    'available': np.bool_,
+    'area': np.int32,
+}
+COMPONENTS = ('availability', 'rating', 'volume', 'price', 'locality')
+CATEGORY_CODES = {category: code for code, (category, _) in enumerate(Service.CATEGORY_CHOICES)}
+# Statuses that hold a slot, as checked by BookingCreateSerializer
+BLOCKING_STATUSES = ('pending', 'confirmed', 'in_progress')
+
+_WORD = re.compile(r'\w+')
+
+Match = namedtuple('Match', ('service_id', 'score', 'scores'))
+
+
+def area_words(text):
+    return frozenset(_WORD.findall((text or '').lower()))
+
+
+class CatalogSnapshot:
+    """Column arrays of the catalog; rows past ``size`` are spare capacity"""
+
+    def __init__(self, capacity):
+        self.columns = {name: np.zeros(max(capacity, 1), dtype) for name, dtype in COLUMNS.items()}
+        self.size = 0
+        self.rows = {}
+        # Areas are interned: services share area ids, word lookups go through an inverted index
+        self.areas = {}
+        self.area_index = {}
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls):
+        rows = list(Service.objects.values_list(*FIELDS).order_by('id'))
+        snapshot = cls(len(rows) * 5 // 4)
+        snapshot.apply(rows)
+        return snapshot
+
+    def area_id(self, text):
+        words = area_words(text)
+        key = ' '.join(sorted(words))
+        area = self.areas.get(key)
+        if area is None:
+            area = self.areas[key] = len(self.areas)
+            for word in words:
+                self.area_index.setdefault(word, []).append(area)
+        return area
+
+    def apply(self, rows):
+        """Insert or update services from ``FIELDS`` tuples"""
+        if not rows:
+            return
+        ids, categories, prices, ratings, bookings, available, areas = zip(*rows)
+        positions = np.empty(len(rows), np.int64)
+        for i, service_id in enumerate(ids):
+            row = self.rows.get(service_id)
+            if row is None:
+                row = self.rows[service_id] = self.size
+                self.size += 1
+            positions[i] = row
+        self._reserve(self.size)
+
+        values = {
+            'id': ids,
+            'category': [CATEGORY_CODES.get(category, -1) for category in categories],
+            'price': [float(price) for price in prices],
+            'rating': [float(rating) for rating in ratings],
+            'bookings': bookings,
+            'available': available,
+            'area': [self.area_id(area) for area in areas],
+        }
+        for name, column in values.items():
+            self.columns[name][positions] = np.asarray(column, COLUMNS[name])
+
+    def discard(self, service_ids):
+        rows = [self.rows[service_id] for service_id in service_ids if service_id in self.rows]
+        self.columns['available'][rows] = False
+
+    def _reserve(self, size):
+        capacity = len(self.columns['id'])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        # New arrays, so matches already reading the old ones are unaffected
+        self.columns = {
+            name: np.concatenate([column, np.zeros(capacity - len(column), column.dtype)])
+            for name, column in self.columns.items()
+        }
+
+    def locality(self, area, area_ids):
+        words = area_words(area)
+        if not words:
+            return np.zeros(len(area_ids), np.float32)
+        by_area = np.zeros(len(self.areas), np.float32)
+        for word in words:
+            matching = self.area_index.get(word)
+            if matching:
+                by_area[matching] += 1
+        return by_area[area_ids] / len(words)
+
+
+class CatalogIndex:
+    """The process's catalog snapshot, refreshed lazily by the matches that read it"""
+
+    def __init__(self):
+        self.snapshot = None
+        self.watermark = None
+        self.refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        snapshot = self.snapshot
+        if not force and snapshot is not None and now - self.refreshed_at < settings.MATCHING_REFRESH_INTERVAL:
+            return
+        with self._lock:
+            snapshot = self.snapshot
+            if not force and snapshot is not None and now - self.refreshed_at < settings.MATCHING_REFRESH_INTERVAL:
+                return
+            started = timezone.now()
+            if force or snapshot is None or now - snapshot.loaded_at >= settings.MATCHING_FULL_REFRESH:
+                self.snapshot = CatalogSnapshot.load()
+            else:
+                since = self.watermark - settings.MATCHING_REFRESH_OVERLAP
+                snapshot.apply(list(Service.objects.filter(updated_at__gte=since).values_list(*FIELDS)))
+            self.watermark = started
+            self.refreshed_at = now
+
+    def discard(self, service_ids):
+        with self._lock:
+            if self.snapshot is not None:
+                self.snapshot.discard(service_ids)
+
+    def match(self, category, date=None, time_slot=None, area=None, budget=None, limit=20):
+        """Best candidates first, as ``Match(service_id, score, scores)``"""
+        self.refresh()
+        snapshot = self.snapshot
+        columns = snapshot.columns
+        # A concurrent refresh may have grown size before the columns
+        size = min(snapshot.size, len(columns['id']))
+        columns = {name: column[:size] for name, column in columns.items()}
+
+        candidates = columns['available'] & (columns['category'] == CATEGORY_CODES[category])
+        availability = np.ones(size, np.float32)
+        if date is not None:
+            booked = booked_slots(date, category)
+            rows = np.fromiter(
+                (snapshot.rows.get(service_id, -1) for service_id, _ in booked), np.int64, len(booked)
+            )
+            known = (rows >= 0) & (rows < size)
+            if time_slot:
+                taken = np.fromiter((slot == time_slot for _, slot in booked), np.bool_, len(booked))
+                candidates[rows[known & taken]] = False
+            counts = np.bincount(rows[known], minlength=size)[:size]
+            availability = 1 - counts.astype(np.float32) / len(time_slots())
+
+        index = np.flatnonzero(candidates)
+        if not index.size:
+            return []
+
+        price = columns['price'][index]
+        bookings = np.log1p(columns['bookings'][index])
+        scores = {
+            'availability': np.clip(availability[index], 0, 1),
+            'rating': columns['rating'][index] / 5,
+            'volume': bookings / bookings.max() if bookings.max() > 0 else np.zeros(index.size, np.float32),
+            'price': price_fit(price, float(budget) if budget is not None else None),
+            'locality': snapshot.locality(area, columns['area'][index]),
+        }
+        weights = settings.MATCHING_WEIGHTS
+        total = sum(weights[component] * scores[component] for component in COMPONENTS)
+
+        k = min(limit, index.size)
+        top = np.argpartition(-total, k - 1)[:k]
+        top = top[np.argsort(-total[top], kind='stable')]
+        return [
+            Match(
+                int(columns['id'][index[i]]),
+                round(float(total[i]), 4),
+                {component: round(float(scores[component][i]), 4) for component in COMPONENTS},
+            )
+            for i in top
+        ]
+
+
+def price_fit(price, budget):
+    if budget is None:
+        spread = price.max() - price.min()
+        return 1 - (price - price.min()) / spread if spread > 0 else np.ones(price.size)
+    return np.clip(1 - (price - budget) / budget, 0, 1)
+
+
+def time_slots():
+    from apps.bookings.models import Booking
+    return Booking.TIME_SLOT_CHOICES
+
+
+def booked_slots(date, category):
+    """``(service_id, time_slot)`` of the slots held on a date by services of a category"""
+    from apps.bookings.models import Booking
+    return list(
+        Booking.objects.filter(booking_date=date, status__in=BLOCKING_STATUSES, service__category=category)
+        .order_by().values_list('service_id', 'time_slot')
+    )
+
+
+catalog = CatalogIndex()
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_service_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='services.service')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='services.service')),
+            ],
+            options={
+                'verbose_name': 'Service Neighbor',
+                'verbose_name_plural': 'Service Neighbors',
+                'db_table': 'service_neighbors',
+                'ordering': ['service', 'rank'],
+                'unique_together': {('service', 'rank')},
+            },
+        ),
+    ]
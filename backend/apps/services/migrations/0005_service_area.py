@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 21:40
+
+from django.db import migrations, models
+
+
+def normalize_areas(apps, schema_editor):
+    Service = apps.get_model('services', 'Service')
+    services = Service.objects.exclude(service_area=None).exclude(service_area='').only('service_area')
+    batch = []
+    for service in services.iterator(chunk_size=2000):
+        # Same normalization as apps.services.models.area_key
+        service.area = ' '.join(service.service_area.lower().split())[:100]
+        batch.append(service)
+        if len(batch) >= 2000:
+            Service.objects.bulk_update(batch, ['area'])
+            batch = []
+    Service.objects.bulk_update(batch, ['area'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0004_serviceneighbor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='area',
+            field=models.CharField(blank=True, editable=False, help_text='Normalized service area (see area_key), kept in sync by save()', max_length=100),
+        ),
+        migrations.RunPython(normalize_areas, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['category', 'area'], name='services_area_idx'),
+        ),
+    ]
@@ -2,6 +2,12 @@ from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+
+def area_key(service_area):
+    """Normalized service area: lowercase, single spaces, at most 100 characters"""
+    return ' '.join((service_area or '').lower().split())[:100]
+
+
 class Service(models.Model):
     CATEGORY_CHOICES = [
         ('cleaning', 'Cleaning'),
@@ -56,6 +62,12 @@ class Service(models.Model):
         null=True,
         help_text="Geographic area where service is provided"
     )
+    area = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        help_text="Normalized service area (see area_key), kept in sync by save()"
+    )
     rating = models.DecimalField(
         max_digits=3,
         decimal_places=2,
@@ -72,7 +84,21 @@ class Service(models.Model):
     
     def __str__(self):
         return f"{self.name} - {self.provider.get_full_name()}"
+
+    def save(self, *args, **kwargs):
+        self.area = area_key(self.service_area)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'service_area' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'area'}
+        super().save(*args, **kwargs)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored category so snapshot rebuilds can include the old one
+        instance._loaded_category = dict(zip(field_names, values)).get('category')
+        return instance
+
     def get_average_rating(self):
         """Calculate average rating from bookings"""
         from apps.bookings.models import Booking
@@ -97,3 +123,30 @@ class Service(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Service'
         verbose_name_plural = 'Services'
+        indexes = [
+            # Admin changelist ordering and date navigation
+            models.Index(fields=['created_at', 'id'], name='services_created_idx'),
+            # Incremental refresh of the matching snapshot
+            models.Index(fields=['updated_at'], name='services_updated_idx'),
+            # Capacity and bookings of a demand cell
+            models.Index(fields=['category', 'area'], name='services_area_idx'),
+        ]
+
+
+class ServiceNeighbor(models.Model):
+    """A service booked by customers of another one, ranked by co-booking score"""
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    def __str__(self):
+        return f"{self.service_id} -> {self.neighbor_id} (#{self.rank})"
+
+    class Meta:
+        db_table = 'service_neighbors'
+        ordering = ['service', 'rank']
+        verbose_name = 'Service Neighbor'
+        verbose_name_plural = 'Service Neighbors'
+        # Also the index the detail view reads a service's neighbours from
+        unique_together = ['service', 'rank']
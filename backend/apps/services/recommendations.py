@@ -0,0 +1,200 @@
+"""
+Co-booking recommendations: "customers who booked this also booked".
+
+Two services co-occur when one customer completed bookings of both. The
+co-occurrence matrix is built from completed bookings streamed in chunks of
+whole customers (about ``RECOMMENDATION_CHUNK_SIZE`` rows): the pairs of
+services within each customer of a chunk are generated with NumPy, encoded
+as one int64 key per pair (``service << 32 | neighbor``) and counted, and
+the counts of all chunks are merged into a sparse matrix of pair keys and
+counts. Customers with more than ``RECOMMENDATION_MAX_HISTORY`` services are
+skipped: their pairs grow quadratically and say little.
+
+A pair scores its count over the geometric mean of both services' customer
+counts (cosine similarity), so popular services do not top every list;
+pairs shared by fewer than ``RECOMMENDATION_MIN_CUSTOMERS`` customers are
+dropped. The best ``RECOMMENDATION_TOP_K`` neighbours of each service are
+stored as ``ServiceNeighbor`` rows, which the detail view reads with one
+range scan of the ``(service, rank)`` index.
+
+``manage.py build_recommendations`` rebuilds every row. In between, each
+completed booking queues ``refresh_recommendations``, which recomputes the
+rows of the services its customer has booked, the only ones whose counts
+changed. Customer counts also move for their neighbours, whose scores
+catch up at the next full build.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from .models import Service, ServiceNeighbor
+
+PAIR_SHIFT = 32
+NEIGHBOR_MASK = (1 << PAIR_SHIFT) - 1
+EMPTY = np.zeros(0, np.int64)
+
+
+def completed_services(service_ids=None):
+    """
+    Distinct ``(customer_id, service_id)`` of completed bookings, by customer.
+
+    With ``service_ids``, only the customers who completed one of them.
+    """
+    from apps.bookings.models import Booking
+    bookings = Booking.objects.filter(status='completed')
+    if service_ids is not None:
+        customers = Booking.objects.filter(status='completed', service_id__in=service_ids).values('customer_id')
+        bookings = bookings.filter(customer_id__in=customers)
+    return bookings.values_list('customer_id', 'service_id').order_by('customer_id', 'service_id').distinct()
+
+
+def customer_chunks(rows, size):
+    """``(customers, services)`` arrays of at least ``size`` rows (except the last), never splitting a customer"""
+    customers, services = [], []
+    for customer_id, service_id in rows.iterator(chunk_size=size):
+        if len(customers) >= size and customer_id != customers[-1]:
+            yield np.array(customers, np.int64), np.array(services, np.int64)
+            customers, services = [], []
+        customers.append(customer_id)
+        services.append(service_id)
+    if customers:
+        yield np.array(customers, np.int64), np.array(services, np.int64)
+
+
+def _groups(customers):
+    """Start and size of each customer's run of rows"""
+    starts = np.flatnonzero(np.r_[True, customers[1:] != customers[:-1]])
+    return starts, np.diff(np.r_[starts, customers.size])
+
+
+def drop_heavy(customers, services, max_history):
+    _, sizes = _groups(customers)
+    keep = np.repeat(sizes <= max_history, sizes)
+    return customers[keep], services[keep]
+
+
+def chunk_pairs(customers, services):
+    """``(service, neighbor)`` arrays of every ordered pair of services sharing a customer"""
+    if not customers.size:
+        return EMPTY, EMPTY
+    starts, sizes = _groups(customers)
+    # Every row is paired with each row of its group, itself included
+    row_sizes = np.repeat(sizes, sizes)
+    row_starts = np.repeat(starts, sizes)
+    left = np.repeat(np.arange(customers.size), row_sizes)
+    offsets = np.arange(left.size) - np.repeat(np.cumsum(row_sizes) - row_sizes, row_sizes)
+    right = np.repeat(row_starts, row_sizes) + offsets
+    distinct = left != right
+    return services[left[distinct]], services[right[distinct]]
+
+
+def merge_counts(keys, counts, new_keys, new_counts):
+    """Sum two sparse count vectors given as sorted unique keys and their counts"""
+    if not keys.size:
+        return new_keys, new_counts
+    merged, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    return merged, np.bincount(inverse, weights=np.concatenate([counts, new_counts])).astype(np.int64)
+
+
+def customer_counts(service_ids):
+    """Customers with a completed booking, per service, as sorted ids and counts; heavy customers left out as in ``build``"""
+    from apps.bookings.models import Booking
+    heavy = (
+        Booking.objects.filter(status='completed').values('customer_id')
+        .annotate(services=Count('service_id', distinct=True))
+        .filter(services__gt=settings.RECOMMENDATION_MAX_HISTORY)
+        .values('customer_id')
+    )
+    rows = sorted(
+        Booking.objects.filter(status='completed', service_id__in=service_ids)
+        .exclude(customer_id__in=heavy)
+        .values('service_id').annotate(customers=Count('customer_id', distinct=True))
+        .values_list('service_id', 'customers')
+    )
+    if not rows:
+        return EMPTY, EMPTY
+    ids, counts = zip(*rows)
+    return np.array(ids, np.int64), np.array(counts, np.int64)
+
+
+def build(service_ids=None):
+    """
+    Top neighbours of every service, or of ``service_ids`` only.
+
+    Returns ``(service, neighbor, rank, score)`` arrays.
+    """
+    targets = np.array(sorted(service_ids), np.int64) if service_ids is not None else None
+    pair_keys, pair_counts = EMPTY, EMPTY
+    degree_ids, degree_counts = EMPTY, EMPTY
+
+    rows = completed_services(service_ids)
+    for customers, services in customer_chunks(rows, settings.RECOMMENDATION_CHUNK_SIZE):
+        customers, services = drop_heavy(customers, services, settings.RECOMMENDATION_MAX_HISTORY)
+        if targets is None:
+            degree_ids, degree_counts = merge_counts(degree_ids, degree_counts, *np.unique(services, return_counts=True))
+        left, right = chunk_pairs(customers, services)
+        if targets is not None:
+            wanted = np.isin(left, targets)
+            left, right = left[wanted], right[wanted]
+        keys = (left << PAIR_SHIFT) | right
+        pair_keys, pair_counts = merge_counts(pair_keys, pair_counts, *np.unique(keys, return_counts=True))
+
+    supported = pair_counts >= settings.RECOMMENDATION_MIN_CUSTOMERS
+    pair_keys, pair_counts = pair_keys[supported], pair_counts[supported]
+    left, right = pair_keys >> PAIR_SHIFT, pair_keys & NEIGHBOR_MASK
+    if targets is not None:
+        # The stream only holds the targets' customers; neighbours need all of theirs
+        degree_ids, degree_counts = customer_counts(np.union1d(left, right).tolist())
+    if not left.size:
+        return EMPTY, EMPTY, EMPTY, np.zeros(0)
+
+    degrees = degree_counts[np.searchsorted(degree_ids, left)] * degree_counts[np.searchsorted(degree_ids, right)]
+    scores = pair_counts / np.sqrt(np.maximum(degrees, 1))
+
+    # By service, best first; ties go to the lower neighbour id
+    order = np.lexsort((right, -scores, left))
+    left, right, scores = left[order], right[order], scores[order]
+    starts, sizes = _groups(left)
+    ranks = np.arange(left.size) - np.repeat(starts, sizes)
+    top = ranks < settings.RECOMMENDATION_TOP_K
+    return left[top], right[top], ranks[top], scores[top]
+
+
+def store(service_ids, neighbors):
+    """Replace the rows of ``service_ids`` with ``build`` output, one transaction per batch"""
+    left, right, ranks, scores = neighbors
+    service_ids = sorted(service_ids)
+    batch_size = settings.RECOMMENDATION_WRITE_BATCH
+    for start in range(0, len(service_ids), batch_size):
+        batch = service_ids[start:start + batch_size]
+        low, high = np.searchsorted(left, batch[0], side='left'), np.searchsorted(left, batch[-1], side='right')
+        rows = [
+            ServiceNeighbor(service_id=service_id, neighbor_id=neighbor_id, rank=rank, score=round(score, 6))
+            for service_id, neighbor_id, rank, score in zip(
+                left[low:high].tolist(), right[low:high].tolist(), ranks[low:high].tolist(), scores[low:high].tolist()
+            )
+        ]
+        with transaction.atomic():
+            ServiceNeighbor.objects.filter(service_id__in=batch).delete()
+            ServiceNeighbor.objects.bulk_create(rows)
+
+
+def rebuild():
+    """Recompute every service's neighbours; returns the number of rows stored"""
+    service_ids = list(Service.objects.values_list('id', flat=True))
+    neighbors = build()
+    store(service_ids, neighbors)
+    return len(neighbors[0])
+
+
+def refresh(service_ids):
+    store(service_ids, build(service_ids))
+
+
+def recommended(service_id):
+    """``ServiceNeighbor`` rows of a service's available neighbours, best first, with the neighbour loaded"""
+    return (
+        ServiceNeighbor.objects.filter(service_id=service_id, neighbor__is_available=True)
+        .select_related('neighbor')
+        .order_by('rank')
+    )
@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Service
 from apps.users.serializers import UserSerializer
+from apps.bookings.models import Booking
 
 class ServiceSerializer(serializers.ModelSerializer):
     provider_details = UserSerializer(source='provider', read_only=True)
@@ -16,6 +18,14 @@ class ServiceSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'rating', 'total_bookings', 'created_at', 'updated_at')
 
+class RecommendedServiceSerializer(serializers.ModelSerializer):
+    """Compact service entry of a "customers who booked this also booked" list"""
+    category_display = serializers.CharField(source='get_category_display', read_only=True)
+    
+    class Meta:
+        model = Service
+        fields = ('id', 'name', 'category', 'category_display', 'price_per_hour', 'service_area', 'rating')
+
 class ServiceCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Service
@@ -27,3 +37,17 @@ class ServiceCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['provider'] = self.context['request'].user
         return super().create(validated_data)
+
+class MatchQuerySerializer(serializers.Serializer):
+    """Query parameters of the provider matching endpoint"""
+    category = serializers.ChoiceField(choices=Service.CATEGORY_CHOICES)
+    date = serializers.DateField(required=False)
+    time_slot = serializers.ChoiceField(choices=Booking.TIME_SLOT_CHOICES, required=False)
+    area = serializers.CharField(max_length=200, required=False)
+    budget = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0.01, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=settings.MATCHING_MAX_RESULTS, default=20)
+
+    def validate(self, attrs):
+        if attrs.get('time_slot') and not attrs.get('date'):
+            raise serializers.ValidationError({'date': 'A date is required with a time slot.'})
+        return attrs
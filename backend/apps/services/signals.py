@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.users.models import User
+from .models import Service
+from django.db import transaction
+from django.utils import timezone
+from .matching import catalog
+from .snapshots import mark_dirty
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def service_changed(sender, instance, **kwargs):
+    # A category change also removes the service from its old category's snapshot
+    mark_dirty({instance.category, getattr(instance, '_loaded_category', None)})
+    instance._loaded_category = instance.category
+
+
+@receiver(post_save, sender=User)
+def provider_changed(sender, instance, update_fields=None, **kwargs):
+    # Snapshots embed provider details; logins only touch last_login
+    if instance.user_type != 'provider' or update_fields == frozenset({'last_login'}):
+        return
+    services = Service.objects.filter(provider=instance)
+    categories = set(services.values_list('category', flat=True).distinct())
+    if categories:
+        # Listings embed the provider: move the services' updated_at, which the
+        # catalog ETags and the matching snapshot read
+        services.update(updated_at=timezone.now())
+        mark_dirty(categories)
+
+
+@receiver(post_delete, sender=Service)
+def service_deleted(sender, instance, **kwargs):
+    # Other changes reach the matching snapshot through its updated_at polling
+    service_id = instance.pk
+    transaction.on_commit(lambda: catalog.discard([service_id]))
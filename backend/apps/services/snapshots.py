@@ -0,0 +1,150 @@
+"""
+Precomputed catalog snapshots served as static files.
+
+Each snapshot is the ``ServiceListView`` response for one listing, capped
+at ``CATALOG_SNAPSHOT_SIZE`` services: ``top.json`` for the whole catalog
+and ``category/<category>.json`` per category. They are written under
+``STATIC_ROOT/<CATALOG_SNAPSHOT_DIR>/`` with brotli and gzip variants next
+to them, and served by WhiteNoise (see ``SnapshotWhiteNoiseMiddleware``)
+without touching the database.
+
+Service and provider changes mark the affected snapshots dirty once their
+transaction commits; dirty snapshots are rebuilt together after
+``CATALOG_SNAPSHOT_DEBOUNCE`` seconds, so a burst of changes costs one
+rebuild. ``manage.py build_catalog_snapshots`` rebuilds everything.
+"""
+import logging
+import os
+import tempfile
+import threading
+from django.conf import settings
+from django.db import connections, transaction
+from rest_framework.settings import api_settings
+from whitenoise.compress import Compressor
+from .models import Service
+from .serializers import ServiceSerializer
+from .views import ServiceListView
+
+logger = logging.getLogger(__name__)
+
+TOP = 'top'
+
+
+def category_key(category):
+    return f'category/{category}'
+
+
+def all_keys():
+    return [TOP] + [category_key(category) for category, _ in Service.CATEGORY_CHOICES]
+
+
+def snapshot_root():
+    return os.path.join(settings.STATIC_ROOT, settings.CATALOG_SNAPSHOT_DIR)
+
+
+def snapshot_queryset(key):
+    """The ServiceListView queryset a snapshot captures"""
+    queryset = Service.objects.filter(is_available=True).select_related('provider')
+    if key != TOP:
+        queryset = queryset.filter(category=key.split('/', 1)[1])
+    return queryset.order_by(*ServiceListView.ordering)[:settings.CATALOG_SNAPSHOT_SIZE]
+
+
+def render_snapshot(key):
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return renderer.render(ServiceSerializer(snapshot_queryset(key), many=True).data)
+
+
+def _write_atomic(path, data):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_snapshot(key, body):
+    """Write a snapshot and its compressed variants; returns False when unchanged"""
+    path = os.path.join(snapshot_root(), f'{key}.json')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == body:
+                # Keeps Last-Modified/ETag stable so clients keep getting 304s
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Variants first: each file is replaced atomically and is consistent on its own
+    compressor = Compressor(quiet=True)
+    variants = [('Gzip', '.gz', compressor.compress_gzip)]
+    if compressor.use_brotli:
+        variants.append(('Brotli', '.br', compressor.compress_brotli))
+    for name, suffix, compress in variants:
+        compressed = compress(body)
+        if compressor.is_compressed_effectively(name, path, len(body), compressed):
+            _write_atomic(path + suffix, compressed)
+        else:
+            _remove(path + suffix)
+    _write_atomic(path, body)
+    return True
+
+
+def build_snapshots(keys=None):
+    """Rebuild the given snapshots (all by default); returns the keys that changed"""
+    changed = []
+    for key in keys or all_keys():
+        if write_snapshot(key, render_snapshot(key)):
+            changed.append(key)
+    return changed
+
+
+class SnapshotScheduler:
+    """Collects dirty snapshots and rebuilds them in a background thread after a delay"""
+
+    def __init__(self):
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def mark(self, keys):
+        with self._lock:
+            self._dirty.update(keys)
+            if self._timer is None:
+                self._timer = threading.Timer(settings.CATALOG_SNAPSHOT_DEBOUNCE, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            keys, self._dirty = self._dirty, set()
+            self._timer = None
+        if not keys:
+            return
+        try:
+            build_snapshots(sorted(keys))
+        except Exception:
+            logger.exception('Rebuilding catalog snapshots %s failed', sorted(keys))
+        finally:
+            # Connections belong to this short-lived thread
+            connections.close_all()
+
+
+scheduler = SnapshotScheduler()
+
+
+def mark_dirty(categories):
+    """Schedule a rebuild of the top snapshot and the given categories' once the transaction commits"""
+    if settings.CATALOG_SNAPSHOT_AUTO_REBUILD:
+        keys = {TOP} | {category_key(category) for category in categories if category}
+        transaction.on_commit(lambda: scheduler.mark(keys))
@@ -0,0 +1,40 @@
+from django.db.models import Avg, Count
+from apps.tasks.queue import task
+from .models import Service
+
+
+@task(batch=True)
+def refresh_service_stats(calls):
+    """Recompute total_bookings and rating of the given services from their completed bookings"""
+    from apps.bookings.models import Booking
+    service_ids = {call['service_id'] for call in calls}
+    stats = {
+        row['service_id']: row
+        for row in Booking.objects.filter(service_id__in=service_ids, status='completed')
+        .values('service_id')
+        .annotate(count=Count('id'), avg_rating=Avg('rating'))
+    }
+    for service in Service.objects.filter(id__in=service_ids):
+        row = stats.get(service.id, {'count': 0, 'avg_rating': None})
+        total_bookings = row['count']
+        rating = round(row['avg_rating'], 2) if row['avg_rating'] is not None else 0
+        if service.total_bookings != total_bookings or service.rating != rating:
+            service.total_bookings = total_bookings
+            service.rating = rating
+            # A save, not update(), so snapshot rebuilds see the change; updated_at
+            # moves so the matching snapshots pick it up
+            service.save(update_fields=['total_bookings', 'rating', 'updated_at'])
+
+
+@task(batch=True, priority=-5)
+def refresh_recommendations(calls):
+    """Recompute the neighbours of the services booked by the customers of the calls"""
+    from apps.bookings.models import Booking
+    from .recommendations import refresh
+    customer_ids = {call['customer_id'] for call in calls}
+    service_ids = set(
+        Booking.objects.filter(customer_id__in=customer_ids, status='completed')
+        .values_list('service_id', flat=True).distinct()
+    )
+    if service_ids:
+        refresh(service_ids)
@@ -1,3 +1,62 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from apps.core.throttling import CatalogThrottle, LocalRateStore
+from apps.users.models import User
+from .models import Service
 
-# Create your tests here.
+
+class CatalogCachingTests(APITestCase):
+    def setUp(self):
+        self.provider = User.objects.create_user(
+            username='provider', email='provider@example.com', password='pw-123456x', user_type='provider'
+        )
+        self.service = Service.objects.create(
+            provider=self.provider, name='Deep clean', description='Whole flat', category='cleaning',
+            price_per_hour=Decimal('100.00'), service_area='Downtown',
+        )
+        # A fresh limiter per test
+        patcher = mock.patch('apps.core.throttling._store', LocalRateStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_conditional_list_request(self):
+        url = reverse('service-list')
+        etag = self.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.get(url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_etags_change_with_provider(self):
+        list_etag = self.get(reverse('service-list'))['ETag']
+        detail_url = reverse('service-detail', args=[self.service.pk])
+        detail_etag = self.get(detail_url)['ETag']
+        self.provider.first_name = 'Renamed'
+        self.provider.save()
+        self.assertEqual(self.get(reverse('service-list'), list_etag).status_code, 200)
+        self.assertEqual(self.get(detail_url, detail_etag).status_code, 200)
+
+    def test_list_etag_changes_on_delete(self):
+        url = reverse('service-list')
+        etag = self.get(url)['ETag']
+        Service.objects.create(
+            provider=self.provider, name='Tap fix', description='Kitchen', category='plumbing',
+            price_per_hour=Decimal('80.00'), service_area='Downtown',
+        ).delete()
+        self.assertEqual(self.get(url, etag).status_code, 304)
+        self.service.delete()
+        self.assertEqual(self.get(url, etag).status_code, 200)
+
+    def test_conditional_requests_are_throttled(self):
+        with mock.patch.object(CatalogThrottle, 'THROTTLE_RATES', {'catalog': '2/min'}):
+            for url in (reverse('service-list'), reverse('service-categories')):
+                self.client.defaults['REMOTE_ADDR'] = url
+                etag = self.get(url)['ETag']
+                self.assertEqual(self.get(url, etag).status_code, 304)
+                self.assertEqual(self.get(url, etag).status_code, 429)
@@ -7,5 +7,6 @@ urlpatterns = [
     path('my/', views.MyServicesView.as_view(), name='my-services'),
     path('categories/', views.service_categories, name='service-categories'),
     path('stats/', views.service_stats, name='service-stats'),
+    path('match/', views.match_services, name='service-match'),
     path('<int:pk>/', views.ServiceDetailView.as_view(), name='service-detail'),
 ]
@@ -1,15 +1,54 @@
 from rest_framework import generics, status, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from django.db.models import Q, Avg
-from .models import Service
-from .serializers import ServiceSerializer, ServiceCreateSerializer
+from django.db.models import Q, Avg, Count, Max
+from django.utils.decorators import method_decorator
+from apps.core.caching import cache_policy, make_etag
+from apps.core.throttling import CatalogThrottle
+from .matching import catalog
+from .models import Service, ServiceNeighbor
+from .recommendations import recommended
+from .serializers import (
+    MatchQuerySerializer, RecommendedServiceSerializer, ServiceSerializer, ServiceCreateSerializer
+)
 
+# Computed once: the choices only change with a deploy
+CATEGORIES_ETAG = make_etag(Service.CATEGORY_CHOICES)
+
+
+def catalog_etag(request, *args, **kwargs):
+    """
+    Changes whenever a service is added, changed or deleted.
+
+    Counter refreshes and provider changes move the services' ``updated_at``
+    (see ``apps.services.signals``), so the indexed maximum and the row
+    count cover them without a join.
+    """
+    state = Service.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return make_etag(*state.values())
+
+
+def service_etag(request, pk):
+    state = Service.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if not state:
+        return None
+    # Neighbour rows are replaced on every refresh, so new ids mean new recommendations
+    neighbors = ServiceNeighbor.objects.filter(service_id=pk).aggregate(latest=Max('id'))['latest']
+    return make_etag(state, neighbors)
+
+
+def stats_etag(request):
+    state = Service.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return make_etag(*state.values())
+
+
+@method_decorator(cache_policy(max_age=60, stale_while_revalidate=300, etag=catalog_etag), name='get')
 class ServiceListView(generics.ListAPIView):
     """List all available services with search and filtering"""
     serializer_class = ServiceSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogThrottle]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description', 'category', 'service_area']
     ordering_fields = ['created_at', 'price_per_hour', 'rating', 'total_bookings']
@@ -33,11 +72,21 @@ class ServiceListView(generics.ListAPIView):
         
         return queryset
 
+@method_decorator(cache_policy(max_age=300, stale_while_revalidate=3600, etag=service_etag), name='get')
 class ServiceDetailView(generics.RetrieveAPIView):
     """Get service details"""
     queryset = Service.objects.select_related('provider').all()
     serializer_class = ServiceSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogThrottle]
+    
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        # "Customers who booked this also booked", precomputed (see apps.services.recommendations)
+        response.data['also_booked'] = RecommendedServiceSerializer(
+            [row.neighbor for row in recommended(self.kwargs['pk'])], many=True
+        ).data
+        return response
 
 class ServiceCreateView(generics.CreateAPIView):
     """Create a new service (providers only)"""
@@ -62,6 +111,8 @@ class MyServicesView(generics.ListAPIView):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes([CatalogThrottle])
+@cache_policy(max_age=86400, stale_while_revalidate=604800, etag=lambda request: CATEGORIES_ETAG)
 def service_categories(request):
     """Get available service categories"""
     categories = [
@@ -72,6 +123,8 @@ def service_categories(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes([CatalogThrottle])
+@cache_policy(max_age=300, stale_while_revalidate=3600, etag=stats_etag)
 def service_stats(request):
     """Get service statistics"""
     total_services = Service.objects.filter(is_available=True).count()
@@ -85,3 +138,22 @@ def service_stats(request):
         'total_providers': total_providers,
         'average_price': round(float(avg_price), 2),
     })
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes([CatalogThrottle])
+def match_services(request):
+    """Rank the available services of a category for a date, time slot, area and budget"""
+    query = MatchQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    matches = catalog.match(**query.validated_data)
+    services = Service.objects.select_related('provider').in_bulk([match.service_id for match in matches])
+    # The snapshot may still list services deleted by another worker
+    return Response([
+        {
+            'score': match.score,
+            'scores': match.scores,
+            'service': ServiceSerializer(services[match.service_id]).data,
+        }
+        for match in matches if match.service_id in services
+    ])
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'priority', 'attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    ordering = ('-priority', 'run_at', 'id')
+    readonly_fields = ('created_at', 'updated_at', 'claimed_at', 'last_error')
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected tasks now')
+    def retry_now(self, request, queryset):
+        queryset.update(status='pending', run_at=timezone.now(), attempts=0)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.tasks'
+    verbose_name = 'Tasks'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+        # Registers the @task functions in every app's tasks.py
+        autodiscover_modules('tasks')
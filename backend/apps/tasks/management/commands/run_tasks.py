@@ -0,0 +1,68 @@
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from apps.realtime.broker import get_broker
+from apps.tasks.queue import claim_tasks, run_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued tasks. Each worker thread claims a batch of due tasks (highest priority '
+        'first, SKIP LOCKED where supported), runs them and claims the next; idle threads '
+        'poll. Stops cleanly on SIGINT/SIGTERM after the batches in progress.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, help='Worker threads')
+        parser.add_argument('--batch-size', type=int, help='Tasks claimed per round trip')
+        parser.add_argument('--poll-interval', type=float, help='Seconds an idle thread waits before polling')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue has no due tasks')
+
+    def handle(self, *args, **options):
+        threads = options['threads'] or settings.TASK_WORKER_THREADS
+        batch_size = options['batch_size'] or settings.TASK_BATCH_SIZE
+        poll_interval = options['poll_interval'] or settings.TASK_POLL_INTERVAL
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.totals = [0, 0]
+
+        if not get_broker().shared:
+            self.stderr.write(self.style.WARNING(
+                f'{settings.REALTIME_BROKER} is not shared between processes: realtime events '
+                'published by tasks (e.g. notifications) will not reach connected clients.'
+            ))
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop.set())
+
+        workers = [
+            threading.Thread(target=self.work, args=(batch_size, poll_interval, options['once']), name=f'task-worker-{i}')
+            for i in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        # Join with a timeout so the main thread keeps handling signals
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=0.5)
+
+        succeeded, failed = self.totals
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded} task(s), {failed} failed or retried'))
+
+    def work(self, batch_size, poll_interval, once):
+        try:
+            while not self.stop.is_set():
+                tasks = claim_tasks(batch_size)
+                if not tasks:
+                    if once:
+                        return
+                    self.stop.wait(poll_interval)
+                    continue
+                succeeded, failed = run_tasks(tasks)
+                with self.lock:
+                    self.totals[0] += succeeded
+                    self.totals[1] += failed
+        finally:
+            connections.close_all()
@@ -0,0 +1,148 @@
+"""
+Database-backed task queue.
+
+Functions decorated with ``@task`` in an app's ``tasks.py`` are registered by
+name; ``fn.delay(**kwargs)`` stores a ``Task`` row in the caller's
+transaction, so a task exists exactly when the change that asked for it was
+committed. Workers (``manage.py run_tasks``) claim due tasks in batches,
+highest priority first, with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+database supports it, so concurrent workers never block on or double-claim
+a row. Failed tasks are retried with exponential backoff until
+``max_attempts``; successful ones are deleted.
+
+Tasks declared with ``batch=True`` receive the kwargs of every claimed call
+as one list, so a burst of calls (e.g. one per completed booking) runs as a
+single pass. Task functions must be idempotent: a worker that dies mid-task
+leaves it ``running`` and it is claimed again after ``TASK_CLAIM_TIMEOUT``.
+
+With ``TASKS_EAGER`` set, ``delay`` runs the task in-process after commit
+instead, for development without a worker.
+"""
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Task
+
+_registry = {}
+
+
+class TaskFunction:
+    """A registered task; call it to run inline, ``delay`` it to queue it"""
+
+    def __init__(self, fn, name, priority, max_attempts, batch):
+        self.fn = fn
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.batch = batch
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<task {self.name}>'
+
+    def delay(self, priority=None, countdown=0, eta=None, **kwargs):
+        """Queue a call with JSON-serializable ``kwargs``, run at ``eta`` or after ``countdown`` seconds"""
+        if settings.TASKS_EAGER:
+            transaction.on_commit(lambda: self.run_calls([kwargs]))
+            return None
+        return Task.objects.create(
+            name=self.name,
+            kwargs=kwargs,
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_at=eta or timezone.now() + timedelta(seconds=countdown),
+        )
+
+    def run_calls(self, calls):
+        if self.batch:
+            self.fn(calls)
+        else:
+            for kwargs in calls:
+                self.fn(**kwargs)
+
+
+def task(name=None, priority=0, max_attempts=None, batch=False):
+    """Register a function as a task (``batch=True``: it takes a list of kwargs dicts)"""
+    def decorator(fn):
+        task_name = name or f'{fn.__module__}.{fn.__qualname__}'
+        if task_name in _registry:
+            raise ValueError(f"Task '{task_name}' is already registered")
+        _registry[task_name] = TaskFunction(
+            fn, task_name, priority, max_attempts or settings.TASK_MAX_ATTEMPTS, batch
+        )
+        return _registry[task_name]
+    return decorator
+
+
+def get_task(name):
+    return _registry[name]
+
+
+def claim_tasks(limit):
+    """Mark up to ``limit`` due tasks as running and return them, in run order"""
+    now = timezone.now()
+    stale_before = now - settings.TASK_CLAIM_TIMEOUT
+    due = Task.objects.filter(
+        Q(status='pending', run_at__lte=now) | Q(status='running', claimed_at__lt=stale_before)
+    ).order_by('-priority', 'run_at', 'id')
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        Task.objects.filter(id__in=ids).update(
+            status='running',
+            claimed_at=now,
+            attempts=F('attempts') + 1,
+        )
+    return list(Task.objects.filter(id__in=ids).order_by('-priority', 'run_at', 'id'))
+
+
+def _retry_or_fail(tasks, error):
+    now = timezone.now()
+    for claimed in tasks:
+        claimed.last_error = error
+        if claimed.attempts >= claimed.max_attempts:
+            claimed.status = 'failed'
+        else:
+            claimed.status = 'pending'
+            claimed.run_at = now + timedelta(seconds=settings.TASK_RETRY_BACKOFF * 2 ** (claimed.attempts - 1))
+        claimed.save(update_fields=['status', 'run_at', 'last_error', 'updated_at'])
+
+
+def run_tasks(tasks):
+    """
+    Run claimed tasks; returns ``(succeeded, failed)`` counts.
+
+    Calls of one batch task run together, each group in its own transaction,
+    so a failure only sends that group back to the queue.
+    """
+    groups = {}
+    for claimed in tasks:
+        groups.setdefault(claimed.name, []).append(claimed)
+
+    succeeded = failed = 0
+    for name, group in groups.items():
+        task_function = _registry.get(name)
+        if task_function is None:
+            _retry_or_fail(group, f"Unknown task '{name}'")
+            failed += len(group)
+            continue
+        calls = [group] if task_function.batch else [[claimed] for claimed in group]
+        for call in calls:
+            try:
+                with transaction.atomic():
+                    task_function.run_calls([claimed.kwargs for claimed in call])
+                    Task.objects.filter(id__in=[claimed.id for claimed in call]).delete()
+                succeeded += len(call)
+            except Exception:
+                _retry_or_fail(call, traceback.format_exc())
+                failed += len(call)
+    return succeeded, failed
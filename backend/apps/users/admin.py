@@ -1,12 +1,15 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from apps.core.admin import LargeTableAdmin
+from .models import User, RevokedToken
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(LargeTableAdmin, BaseUserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'user_type', 'is_verified', 'date_joined')
     list_filter = ('user_type', 'is_verified', 'is_active', 'is_staff')
     search_fields = ('username', 'email', 'first_name', 'last_name', 'phone_number')
+    exact_search_fields = {'id': 'int', 'username': 'prefix', 'email': 'email'}
+    search_help_text = 'User ID, username prefix or email. Prefix with ~ for a slow partial match, e.g. on names or phone.'
     ordering = ('-date_joined',)
     
     fieldsets = BaseUserAdmin.fieldsets + (
@@ -14,3 +17,15 @@ class UserAdmin(BaseUserAdmin):
             'fields': ('user_type', 'phone_number', 'address', 'is_verified')
         }),
     )
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(LargeTableAdmin):
+    list_display = ('jti', 'token_type', 'user', 'revoked_at', 'expires_at')
+    list_filter = ('token_type',)
+    list_select_related = ('user',)
+    search_fields = ('user__username',)
+    exact_search_fields = {'jti': 'exact', 'user__username': 'exact'}
+    search_help_text = 'Token ID or username. Prefix with ~ for a slow partial match.'
+    ordering = ('-revoked_at',)
+    readonly_fields = ('jti', 'token_type', 'user', 'revoked_at', 'expires_at')
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .models import User
+from .revocation import revocation_store
+
+
+class UserCache:
+    """
+    Per-process TTL + LRU cache of user rows keyed by primary key.
+
+    Entries hold raw field values rather than model instances, so every
+    request gets its own ``User`` and cannot leak mutations into the cache.
+    Local saves invalidate entries immediately (see ``signals``); changes made
+    by other processes become visible once the TTL expires.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._field_names = None
+
+    @property
+    def field_names(self):
+        if self._field_names is None:
+            self._field_names = [field.attname for field in User._meta.concrete_fields]
+        return self._field_names
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            values = entry[1]
+        return User.from_db(None, self.field_names, values)
+
+    def set(self, user):
+        values = [getattr(user, name) for name in self.field_names]
+        with self._lock:
+            self._entries[user.pk] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves users without a query on the hot path.
+
+    With ``AUTH_TRUST_TOKEN_CLAIMS`` the user is built straight from the
+    ``user_type``/``is_active`` claims of the token (other fields load lazily
+    on first access); otherwise users come from ``user_cache`` and only a miss
+    reads the ``users`` table. Revoked tokens are rejected through the
+    in-memory ``revocation_store``.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocation_store.is_revoked(token[jwt_settings.JTI_CLAIM]):
+            raise InvalidToken("Token has been revoked")
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if settings.AUTH_TRUST_TOKEN_CLAIMS and 'user_type' in validated_token:
+            claims = {
+                'id': user_id,
+                'is_active': validated_token.get('is_active', True),
+                'user_type': validated_token['user_type'],
+            }
+            # from_db expects values in concrete field order
+            field_names = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+            user = User.from_db(None, field_names, [claims[name] for name in field_names])
+        else:
+            user = user_cache.get(user_id)
+            if user is None:
+                user = super().get_user(validated_token)
+                user_cache.set(user)
+                return user
+
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+
+def get_jwt_authenticator():
+    """Return the configured JWT authentication class, instantiated"""
+    for auth_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        if issubclass(auth_class, JWTAuthentication):
+            return auth_class()
+    return JWTAuthentication()
+
+
+def authenticate_request(request, allow_query_token=False):
+    """
+    Resolve the user of a plain Django request (outside DRF views).
+
+    With ``allow_query_token`` the access token may also be passed as
+    ``?token=``, for clients such as ``EventSource`` that cannot set headers.
+    Returns ``None`` when the request is not authenticated.
+    """
+    authenticator = get_jwt_authenticator()
+    try:
+        result = authenticator.authenticate(request)
+        if result is not None:
+            return result[0]
+        raw_token = request.GET.get('token') if allow_query_token else None
+        if raw_token:
+            return authenticator.get_user(authenticator.get_validated_token(raw_token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        pass
+    return None
+
+
+aauthenticate_request = sync_to_async(authenticate_request)
@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+from .hashing import hashing_pool, verify_password
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` that runs password hashing in ``hashing_pool``.
+
+    The user lookup and any hash upgrade write stay on the request thread, so
+    the pool threads never touch the database.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            hashing_pool.run(make_password, password)
+            return None
+
+        valid, upgraded = hashing_pool.run(verify_password, password, user.password)
+        if not valid:
+            return None
+        if upgraded:
+            user.password = upgraded
+            user.save(update_fields=['password'])
+        if self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,73 @@
+"""
+Bounded pool for password hashing.
+
+PBKDF2 is deliberately expensive, and ``hashlib`` releases the GIL while it
+runs, so a login burst handled inline can occupy every core and starve the
+cheap catalog reads. Running the hashing in a fixed number of threads caps
+how much CPU it can take; when the pool and its queue are full, new work is
+shed immediately with a 429 instead of piling up behind it.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from rest_framework.exceptions import Throttled
+
+
+class HashingPoolBusy(Throttled):
+    default_detail = 'Too many sign-in attempts are being processed. Please retry shortly.'
+    default_code = 'hashing_pool_busy'
+
+
+class PasswordHashingPool:
+    """Thread pool with a hard limit on running plus queued jobs"""
+
+    def __init__(self, max_workers, max_queue, timeout, retry_after):
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def run(self, fn, *args):
+        """Run ``fn(*args)`` in the pool and wait for it, or raise ``HashingPoolBusy``"""
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolBusy(wait=self.retry_after)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingPoolBusy(wait=self.retry_after)
+
+
+def verify_password(password, encoded):
+    """
+    Check ``password`` against ``encoded``.
+
+    Returns ``(valid, new_encoded)``; ``new_encoded`` is set when the stored
+    hash should be upgraded to the preferred hasher or its current work
+    factor (the first entry of ``PASSWORD_HASHERS``).
+    """
+    if not check_password(password, encoded):
+        return False, None
+    preferred = get_hasher('default')
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return True, None
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        return True, make_password(password)
+    return True, None
+
+
+hashing_pool = PasswordHashingPool(
+    max_workers=settings.PASSWORD_HASHING_WORKERS or min(4, os.cpu_count() or 1),
+    max_queue=settings.PASSWORD_HASHING_QUEUE,
+    timeout=settings.PASSWORD_HASHING_TIMEOUT,
+    retry_after=settings.PASSWORD_HASHING_RETRY_AFTER,
+)
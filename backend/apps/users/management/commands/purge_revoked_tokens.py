@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.users.revocation import revocation_store
+
+
+class Command(BaseCommand):
+    help = 'Delete revocation records of tokens that have expired'
+
+    def handle(self, *args, **options):
+        deleted = revocation_store.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired revocation record(s)'))
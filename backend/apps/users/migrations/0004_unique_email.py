@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:12
+
+import apps.users.models
+from django.db import migrations, models
+
+
+def normalize_emails(apps, schema_editor):
+    """Lowercase stored emails and turn blanks into NULL before the unique index"""
+    User = apps.get_model('users', 'User')
+    owners = {}
+    for user in User.objects.only('id', 'email').iterator():
+        email = (user.email or '').strip().lower() or None
+        if email is not None:
+            owners.setdefault(email, []).append(user.id)
+        if email != user.email:
+            User.objects.filter(pk=user.pk).update(email=email)
+
+    duplicates = {email: ids for email, ids in owners.items() if len(ids) > 1}
+    if duplicates:
+        listing = ', '.join(f"{email} (users {ids})" for email, ids in sorted(duplicates.items()))
+        raise RuntimeError(
+            f"Cannot make email unique; resolve these case-insensitive duplicates first: {listing}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_revoked_tokens'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', apps.users.models.UserManager()),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(blank=True, help_text='Email address (stored lowercase)', max_length=254, null=True),
+        ),
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(blank=True, help_text='Email address (stored lowercase)', max_length=254, null=True, unique=True),
+        ),
+    ]
@@ -1,6 +1,15 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.db import models
 
+
+class UserManager(BaseUserManager):
+    @classmethod
+    def normalize_email(cls, email):
+        """Lowercase the whole address so uniqueness is case-insensitive"""
+        email = (email or '').strip().lower()
+        return email or None
+
+
 class User(AbstractUser):
     USER_TYPE_CHOICES = [
         ('customer', 'Customer'),
@@ -24,6 +33,13 @@ class User(AbstractUser):
         null=True,
         help_text="Full address"
     )
+    # Stored normalized (see UserManager.normalize_email); NULL when absent
+    email = models.EmailField(
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Email address (stored lowercase)"
+    )
     is_verified = models.BooleanField(
         default=False,
         help_text="Whether the user has verified their account"
@@ -31,9 +47,15 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UserManager()
+
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
 
+    def save(self, *args, **kwargs):
+        self.email = self.__class__.objects.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}".strip() or self.username
 
@@ -41,3 +63,26 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+
+
+class RevokedToken(models.Model):
+    """Authoritative record of revoked JWTs, kept until the token would expire anyway"""
+    jti = models.CharField(max_length=255, unique=True, help_text="Token identifier claim")
+    token_type = models.CharField(max_length=20)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='revoked_tokens'
+    )
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
+
+    class Meta:
+        db_table = 'revoked_tokens'
+        verbose_name = 'Revoked Token'
+        verbose_name_plural = 'Revoked Tokens'
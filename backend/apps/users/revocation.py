@@ -0,0 +1,137 @@
+"""
+JWT revocation keyed by ``jti``.
+
+``RevokedToken`` rows are the source of truth. Each process keeps a Bloom
+filter of the live rows in front of them, so the common case (a token that
+was never revoked) is answered from memory, and only filter hits are
+confirmed against the table. Filters pick up revocations made by other
+processes every ``TOKEN_REVOCATION_SYNC_INTERVAL`` seconds by reading rows
+past the last id they have seen, and are rebuilt periodically to drop
+tokens that have expired.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationStore:
+    """Process-local Bloom filter in front of the ``RevokedToken`` table"""
+
+    def __init__(self, capacity, error_rate, sync_interval, rebuild_interval):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._synced_at = 0
+        self._built_at = 0
+
+    def _rebuild(self):
+        # Fix the high-water mark first so rows added meanwhile are picked up by the next sync
+        last_id = RevokedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        live = RevokedToken.objects.filter(id__lte=last_id, expires_at__gt=timezone.now())
+        bloom = BloomFilter(max(self.capacity, live.count() * 2), self.error_rate)
+        for jti in live.values_list('jti', flat=True).iterator():
+            bloom.add(jti)
+        self._bloom = bloom
+        self._last_id = last_id
+        self._built_at = self._synced_at = time.monotonic()
+
+    def _sync(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            bloom = self._bloom
+            if bloom is None or bloom.count > bloom.capacity or now - self._built_at > self.rebuild_interval:
+                self._rebuild()
+                return
+            for pk, jti in RevokedToken.objects.filter(id__gt=self._last_id).order_by('id').values_list('id', 'jti'):
+                bloom.add(jti)
+                self._last_id = pk
+            self._synced_at = now
+
+    def is_revoked(self, jti, strict=False):
+        """
+        Whether ``jti`` has been revoked.
+
+        ``strict`` syncs with the table first so revocations made by other
+        processes moments ago are seen; use it where a stale answer matters
+        more than a query (refresh token rotation).
+        """
+        self._sync(force=strict)
+        if jti not in self._bloom:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, token):
+        """
+        Revoke a simplejwt token until its expiry.
+
+        Returns False when it was already revoked. The insert on the unique
+        ``jti`` decides, so of concurrent calls for one token exactly one
+        returns True (what refresh token rotation relies on).
+        """
+        jti = token[jwt_settings.JTI_CLAIM]
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(
+                    jti=jti,
+                    token_type=token[jwt_settings.TOKEN_TYPE_CLAIM],
+                    user_id=token.get(jwt_settings.USER_ID_CLAIM),
+                    expires_at=datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+                )
+            revoked = True
+        except IntegrityError:
+            revoked = False
+        self._sync(force=True)
+        with self._lock:
+            self._bloom.add(jti)
+        return revoked
+
+    def purge_expired(self):
+        """Delete rows for tokens that have expired; returns how many were removed"""
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+revocation_store = RevocationStore(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+    rebuild_interval=settings.TOKEN_REVOCATION_REBUILD_INTERVAL,
+)
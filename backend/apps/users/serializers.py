@@ -1,7 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .hashing import hashing_pool
 from .models import User
+from .revocation import revocation_store
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
@@ -28,6 +34,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         }
     
     def validate_email(self, value):
+        value = User.objects.normalize_email(value)
         if User.objects.filter(email=value).exists():
             raise serializers.ValidationError("Email already exists")
         return value
@@ -41,7 +48,13 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
+        password = validated_data.pop('password')
+        # Same normalization as create_user, with the hashing done in the pool
+        validated_data['username'] = User.normalize_username(validated_data['username'])
+        validated_data['email'] = User.objects.normalize_email(validated_data['email'])
+        user = User(**validated_data)
+        user.password = hashing_pool.run(make_password, password)
+        user.save()
         return user
 
 class UserLoginSerializer(serializers.Serializer):
@@ -78,3 +91,18 @@ class UserSerializer(serializers.ModelSerializer):
             'date_joined', 'last_login'
         )
         read_only_fields = ('id', 'date_joined', 'last_login', 'is_verified')
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh that rejects revoked tokens and revokes rotated ones"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if jwt_settings.ROTATE_REFRESH_TOKENS and jwt_settings.BLACKLIST_AFTER_ROTATION:
+            # Revoke before issuing: of concurrent refreshes with one token, only
+            # the one whose insert of its jti succeeds gets a new pair
+            if not revocation_store.revoke(refresh):
+                raise InvalidToken('Token has been revoked')
+        elif revocation_store.is_revoked(refresh[jwt_settings.JTI_CLAIM], strict=True):
+            raise InvalidToken('Token has been revoked')
+
+        return super().validate(attrs)
@@ -1,3 +1,40 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from .models import User
+from .tokens import UserRefreshToken
 
-# Create your tests here.
+
+class TokenRefreshTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='customer', email='customer@example.com', password='pw-123456x', user_type='customer'
+        )
+        self.refresh_token = str(UserRefreshToken.for_user(self.user))
+
+    def refresh(self, token):
+        return self.client.post(reverse('token_refresh'), {'refresh': token}, format='json')
+
+    def test_refresh_rotates_token(self):
+        response = self.refresh(self.refresh_token)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        self.assertNotEqual(response.data['refresh'], self.refresh_token)
+
+    def test_rotated_token_keeps_refreshing(self):
+        token = self.refresh_token
+        for _ in range(3):
+            response = self.refresh(token)
+            self.assertEqual(response.status_code, 200)
+            token = response.data['refresh']
+
+    def test_reused_token_is_rejected(self):
+        self.assertEqual(self.refresh(self.refresh_token).status_code, 200)
+        self.assertEqual(self.refresh(self.refresh_token).status_code, 401)
+
+    def test_logged_out_token_is_rejected(self):
+        access = UserRefreshToken(self.refresh_token).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = self.client.post(reverse('logout'), {'refresh_token': self.refresh_token}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials()
+        self.assertEqual(self.refresh(self.refresh_token).status_code, 401)
@@ -0,0 +1,12 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token carrying the claims views branch on (copied into access tokens)"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['user_type'] = user.user_type
+        token['is_active'] = user.is_active
+        return token
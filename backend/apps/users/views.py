@@ -1,10 +1,16 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import logout
 from django.db import transaction
+from apps.core.throttling import AuthThrottle
+from .hashing import HashingPoolBusy
+from .revocation import revocation_store
+from .tokens import UserRefreshToken
 from .serializers import (
     UserRegistrationSerializer, 
     UserLoginSerializer, 
@@ -13,6 +19,7 @@ from .serializers import (
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthThrottle])
 def register(request):
     """User registration endpoint"""
     serializer = UserRegistrationSerializer(data=request.data)
@@ -20,7 +27,7 @@ def register(request):
         try:
             with transaction.atomic():
                 user = serializer.save()
-                refresh = RefreshToken.for_user(user)
+                refresh = UserRefreshToken.for_user(user)
                 
                 return Response({
                     'message': 'User registered successfully',
@@ -28,6 +35,8 @@ def register(request):
                     'access_token': str(refresh.access_token),
                     'refresh_token': str(refresh)
                 }, status=status.HTTP_201_CREATED)
+        except HashingPoolBusy:
+            raise
         except Exception as e:
             return Response({
                 'error': 'Registration failed. Please try again.'
@@ -37,12 +46,13 @@ def register(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthThrottle])
 def login(request):
     """User login endpoint"""
     serializer = UserLoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         
         return Response({
             'message': 'Login successful',
@@ -61,13 +71,20 @@ def logout_view(request):
         refresh_token = request.data.get('refresh_token')
         if refresh_token:
             token = RefreshToken(refresh_token)
-            token.blacklist()
+            if token.get(jwt_settings.USER_ID_CLAIM) != request.user.pk:
+                raise ValueError("Refresh token belongs to another user")
+            revocation_store.revoke(token)
+        # The access token used for this request stops working too
+        if request.auth is not None:
+            revocation_store.revoke(request.auth)
         
-        logout(request)
+        # The API profile has no sessions (and no session user) to clear
+        if hasattr(request, 'session'):
+            logout(request)
         return Response({
             'message': 'Logout successful'
         }, status=status.HTTP_200_OK)
-    except Exception as e:
+    except (TokenError, ValueError):
         return Response({
             'error': 'Logout failed'
         }, status=status.HTTP_400_BAD_REQUEST)
@@ -76,5 +93,9 @@ def logout_view(request):
 @permission_classes([IsAuthenticated])
 def profile(request):
     """Get user profile"""
+    # Users built from token claims load the rest of the row in one query
+    deferred_fields = request.user.get_deferred_fields()
+    if deferred_fields:
+        request.user.refresh_from_db(fields=deferred_fields)
     serializer = UserSerializer(request.user)
     return Response(serializer.data)
@@ -0,0 +1,329 @@
+"""
+Scenario benchmark for the API with baselines.
+
+Run from ``backend/``. In-process (Django test client against a throwaway
+test database, seeded on every run)::
+
+    python -m benchmarks.api_suite --iterations 300 --save-baseline
+
+Against a running server (seed its database first with ``--seed-only``
+using the same ``DATABASE_URL``, and start it with high
+``THROTTLE_RATE_*`` values so limits do not skew the numbers)::
+
+    python -m benchmarks.api_suite --seed-only
+    python -m benchmarks.api_suite --base-url http://127.0.0.1:8000 --concurrency 8
+
+Scenarios mix catalog browsing and search, slot checks, booking and paying,
+and provider status updates. The report has p50/p95/p99 and queries per
+request for each endpoint (by URL name); in server mode the query counts
+come from the server's ``/metrics``. With a baseline file present, the run
+exits with status 1 when an endpoint's p95 grows past ``--tolerance`` or it
+issues more queries per request than before.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Measure the endpoints, not the rate limits
+for scope in ('CATALOG', 'AUTH', 'BOOKING_CREATE', 'PAYMENTS'):
+    os.environ.setdefault(f'THROTTLE_RATE_{scope}', '1000000/min')
+
+import django  # noqa: E402
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from django.urls import resolve  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from .common import http_request, summarize  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'api_suite.json')
+SCENARIO_WEIGHTS = {
+    'browse_catalog': 40,
+    'search_catalog': 20,
+    'check_slots': 20,
+    'book_and_pay': 10,
+    'provider_updates': 10,
+}
+SEARCH_TERMS = ['clean', 'plumb', 'Pune', 'repair', 'paint', 'garden']
+
+
+class InProcessDriver:
+    """Django test client; counts queries on the default connection"""
+
+    def __init__(self):
+        from rest_framework.test import APIClient
+        self.client = APIClient()
+
+    def request(self, method, path, token=None, payload=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method.lower())(path, payload, format='json', **headers)
+            elapsed = time.perf_counter() - started
+        body = response.json() if response.get('Content-Type', '').startswith('application/json') else None
+        return response.status_code, elapsed, body, len(queries)
+
+
+class HttpDriver:
+    """Real HTTP against a running server; query counts come from /metrics"""
+
+    def __init__(self, base_url, metrics_token=''):
+        self.base_url = base_url.rstrip('/')
+        self.metrics_token = metrics_token
+
+    def request(self, method, path, token=None, payload=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        status, elapsed, body = http_request(self.base_url + path, method, payload, headers)
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = None
+        return status, elapsed, body, None
+
+    def query_totals(self):
+        """``{route: (query_sum, request_count)}`` from the server's metrics"""
+        headers = {'Authorization': f'Bearer {self.metrics_token}'} if self.metrics_token else {}
+        status, _, body = http_request(f'{self.base_url}/metrics', headers=headers)
+        if status != 200:
+            return {}
+        totals = defaultdict(lambda: [0.0, 0])
+        for line in body.decode().splitlines():
+            for suffix, index in (('_sum', 0), ('_count', 1)):
+                prefix = f'db_queries_per_request{suffix}{{route="'
+                if line.startswith(prefix):
+                    route = line[len(prefix):line.index('"', len(prefix))]
+                    totals[route][index] = float(line.rsplit(' ', 1)[1])
+        return dict(totals)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.lock = threading.Lock()
+
+    def call(self, driver, method, path, token=None, payload=None):
+        status, elapsed, body, queries = driver.request(method, path, token, payload)
+        endpoint = resolve(path.split('?')[0]).url_name
+        with self.lock:
+            self.samples[endpoint].append(elapsed)
+            self.statuses[endpoint][status] += 1
+            if queries is not None:
+                self.queries[endpoint].append(queries)
+        return status, body
+
+
+class Scenarios:
+    def __init__(self, driver, recorder, data, tokens, rng):
+        self.driver = driver
+        self.recorder = recorder
+        self.data = data
+        self.tokens = tokens
+        self.rng = rng
+
+    def call(self, *args, **kwargs):
+        return self.recorder.call(self.driver, *args, **kwargs)
+
+    def browse_catalog(self):
+        self.call('GET', '/api/services/')
+        self.call('GET', '/api/services/categories/')
+        self.call('GET', f'/api/services/{self.rng.choice(self.data["services"]).pk}/')
+
+    def search_catalog(self):
+        term = self.rng.choice(SEARCH_TERMS)
+        self.call('GET', f'/api/services/?search={term}&ordering=-rating')
+        self.call('GET', f'/api/services/?category={self.rng.choice(self.data["services"]).category}&max_price=1000')
+
+    def check_slots(self):
+        customer = self.rng.choice(self.data['customers'])
+        self.call('GET', f'/api/services/{self.rng.choice(self.data["services"]).pk}/')
+        self.call('GET', '/api/bookings/my/', self.tokens[customer.pk])
+
+    def book_and_pay(self):
+        from apps.bookings.models import Booking
+
+        customer = self.rng.choice(self.data['customers'])
+        token = self.tokens[customer.pk]
+        status, body = self.call('POST', '/api/bookings/', token, {
+            'service': self.rng.choice(self.data['services']).pk,
+            'booking_date': str(timezone.localdate() + timedelta(days=self.rng.randint(1, 30))),
+            'time_slot': self.rng.choice(Booking.TIME_SLOT_CHOICES)[0],
+            'hours_requested': self.rng.randint(1, 3),
+            'customer_address': '1 Bench Street',
+            'customer_phone': '9000000000',
+        })
+        if status != 201:
+            # Slot already taken
+            return
+        status, body = self.call('POST', '/api/payments/create/', token, {
+            'booking_id': body['booking_id'], 'payment_method': 'upi'
+        })
+        if status == 200:
+            self.call('POST', '/api/payments/confirm/', token, {'payment_id': body['payment_id']})
+
+    def provider_updates(self):
+        provider = self.rng.choice(self.data['providers'])
+        token = self.tokens[provider.pk]
+        status, body = self.call('GET', '/api/bookings/my/', token)
+        upcoming = [b for b in (body or []) if b['status'] in ('confirmed', 'in_progress')]
+        if upcoming:
+            booking = self.rng.choice(upcoming)
+            next_status = 'in_progress' if booking['status'] == 'confirmed' else 'completed'
+            self.call('PUT', f'/api/bookings/{booking["id"]}/status/', token, {'status': next_status})
+        self.call('GET', '/api/bookings/stats/', token)
+
+    def run(self):
+        name = self.rng.choices(list(SCENARIO_WEIGHTS), weights=list(SCENARIO_WEIGHTS.values()))[0]
+        getattr(self, name)()
+
+
+def _seed(args):
+    """The ``seed_marketplace --seed <random seed>`` data set, generated unless the database has it"""
+    from django.core.management import call_command
+    from apps.services.models import Service
+    from apps.users.models import User
+
+    prefix = f'seed{args.random_seed}_'
+    if not User.objects.filter(username__startswith=prefix).exists():
+        call_command(
+            'seed_marketplace', customers=args.customers, providers=args.providers, services=args.services,
+            bookings=args.bookings, seed=args.random_seed, stdout=sys.stderr,
+        )
+    users = list(User.objects.filter(username__startswith=prefix).order_by('id'))
+    return {
+        'customers': [user for user in users if user.user_type == 'customer'],
+        'providers': [user for user in users if user.user_type == 'provider'],
+        'services': list(Service.objects.filter(provider__username__startswith=prefix).order_by('id')),
+    }
+
+
+def _tokens(users):
+    from apps.users.tokens import UserRefreshToken
+    return {user.pk: str(UserRefreshToken.for_user(user).access_token) for user in users}
+
+
+def _report(recorder, query_delta=None):
+    report = {}
+    for endpoint in sorted(recorder.samples):
+        entry = summarize(recorder.samples[endpoint])
+        if query_delta is not None:
+            query_sum, count = query_delta.get(endpoint, (0, 0))
+            entry['queries_per_request'] = round(query_sum / count, 2) if count else None
+        else:
+            queries = recorder.queries[endpoint]
+            entry['queries_per_request'] = round(sum(queries) / len(queries), 2)
+        entry['statuses'] = dict(recorder.statuses[endpoint])
+        report[endpoint] = entry
+    return report
+
+
+def compare(report, baseline, tolerance, slack_ms):
+    """Regression messages for endpoints slower or chattier than the baseline"""
+    problems = []
+    for endpoint, before in baseline.items():
+        after = report.get(endpoint)
+        if after is None:
+            continue
+        limit = before['p95_ms'] * (1 + tolerance) + slack_ms
+        if after['p95_ms'] > limit:
+            problems.append(f"{endpoint}: p95 {after['p95_ms']}ms > {limit:.2f}ms (baseline {before['p95_ms']}ms)")
+        if None not in (before.get('queries_per_request'), after.get('queries_per_request')):
+            # Query counts are deterministic enough that any real growth matters
+            if after['queries_per_request'] > before['queries_per_request'] + 0.5:
+                problems.append(
+                    f"{endpoint}: {after['queries_per_request']} queries/request "
+                    f"(baseline {before['queries_per_request']})"
+                )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', help='Run against a server instead of in-process')
+    parser.add_argument('--metrics-token', default='', help="The server's METRICS_TOKEN, if set")
+    parser.add_argument('--iterations', type=int, default=300, help='Scenario runs per client')
+    parser.add_argument('--concurrency', type=int, default=1, help='Parallel clients (server mode)')
+    parser.add_argument('--customers', type=int, default=200)
+    parser.add_argument('--providers', type=int, default=50)
+    parser.add_argument('--services', type=int, default=300)
+    parser.add_argument('--bookings', type=int, default=2000)
+    parser.add_argument('--random-seed', type=int, default=1, help='seed_marketplace --seed, and the scenario seed')
+    parser.add_argument('--seed-only', action='store_true', help='Seed the configured database and exit')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Write this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative p95 growth')
+    parser.add_argument('--slack-ms', type=float, default=2.0, help='Allowed absolute p95 growth')
+    args = parser.parse_args()
+
+    if args.seed_only:
+        _seed(args)
+        print('Seeded benchmark data')
+        return
+
+    if args.base_url:
+        data = _seed(args)
+        driver = HttpDriver(args.base_url, args.metrics_token)
+        queries_before = driver.query_totals()
+    else:
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        data = _seed(args)
+        driver = InProcessDriver()
+        args.concurrency = 1
+
+    tokens = _tokens(data['customers'] + data['providers'])
+    recorder = Recorder()
+
+    def client(index):
+        scenarios = Scenarios(driver, recorder, data, tokens, random.Random(args.random_seed * 1000 + index))
+        for _ in range(args.iterations):
+            scenarios.run()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    query_delta = None
+    if args.base_url:
+        queries_after = driver.query_totals()
+        query_delta = {
+            route: (total - queries_before.get(route, (0, 0))[0], count - queries_before.get(route, (0, 0))[1])
+            for route, (total, count) in queries_after.items()
+        }
+    report = _report(recorder, query_delta)
+    requests = sum(len(samples) for samples in recorder.samples.values())
+    print(json.dumps({
+        'requests': requests,
+        'requests_per_second': round(requests / elapsed, 1),
+        'endpoints': report,
+    }, indent=2))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f'Baseline written to {args.baseline}', file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.tolerance, args.slack_ms)
+        if problems:
+            print('Regressions against the baseline:', *problems, sep='\n  ', file=sys.stderr)
+            sys.exit(1)
+        print('No regressions against the baseline', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Requests/sec and latency of the sync (DRF) and async read endpoints.
+
+Serve the API under ASGI, where both paths are mounted, e.g.::
+
+    gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker -w 4
+
+then run from ``backend/`` (the token is an access token of a user that
+has bookings; ``--booking-id`` one of their bookings)::
+
+    python -m benchmarks.async_vs_sync --base-url http://127.0.0.1:8000 \\
+        --token <access> --booking-id <uuid> --concurrency 256
+
+Run it against ``gunicorn config.wsgi`` as well to compare the sync
+endpoints under their usual server.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from .common import http_request, summarize
+
+ENDPOINTS = {
+    'service-list': 'services/',
+    'service-categories': 'services/categories/',
+    'service-stats': 'services/stats/',
+    'my-bookings': 'bookings/my/',
+    'booking-detail': 'bookings/{booking_id}/',
+    'payment-status': 'payments/booking/{booking_id}/',
+}
+
+
+def run(url, headers, concurrency, total):
+    samples, statuses = [], Counter()
+    lock = threading.Lock()
+    remaining = [total]
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            status, elapsed, _ = http_request(url, headers=headers)
+            with lock:
+                samples.append(elapsed)
+                statuses[status] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = summarize(samples)
+    result['requests_per_second'] = round(total / elapsed, 1)
+    result['statuses'] = dict(statuses)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--token', required=True, help='Access token for the authenticated endpoints')
+    parser.add_argument('--booking-id', required=True)
+    parser.add_argument('--concurrency', type=int, default=128)
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per endpoint and path')
+    parser.add_argument('--only', choices=sorted(ENDPOINTS), action='append', help='Limit to these endpoints')
+    args = parser.parse_args()
+
+    headers = {'Authorization': f'Bearer {args.token}'}
+    report = {}
+    for name in args.only or ENDPOINTS:
+        path = ENDPOINTS[name].format(booking_id=args.booking_id)
+        report[name] = {
+            'sync': run(f"{args.base_url}/api/{path}", headers, args.concurrency, args.requests),
+            'async': run(f"{args.base_url}/api/async/{path}", headers, args.concurrency, args.requests),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Helpers shared by the benchmark scripts"""
+import json
+import time
+import urllib.error
+import urllib.request
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """p50/p95/p99/max in milliseconds for a list of durations in seconds"""
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 2),
+        'p95_ms': round(percentile(samples, 95) * 1000, 2),
+        'p99_ms': round(percentile(samples, 99) * 1000, 2),
+        'max_ms': round(max(samples) * 1000, 2) if samples else 0,
+    }
+
+
+def http_request(url, method='GET', payload=None, headers=None, timeout=30):
+    """Send a request; returns (status, elapsed_seconds, body_bytes)"""
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    if data is not None:
+        request.add_header('Content-Type', 'application/json')
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            return response.status, time.perf_counter() - started, body
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        return e.code, time.perf_counter() - started, body
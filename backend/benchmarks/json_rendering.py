@@ -0,0 +1,93 @@
+"""
+Serialization speed and transfer size of the JSON renderers.
+
+Run from ``backend/`` against a database with bookings and payments (e.g.
+after ``python manage.py seed_marketplace``)::
+
+    python -m benchmarks.json_rendering --rows 500 --iterations 50
+
+Builds the payloads of ``MyBookingsView`` and ``MyPaymentsView`` with their
+serializers, then times DRF's ``JSONRenderer`` against ``FastJSONRenderer``
+(and the matching parsers), checks that both produce identical bytes, and
+reports the body size raw, gzipped and brotli-compressed at the configured
+levels.
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+django.setup()
+
+import brotli  # noqa: E402
+from django.conf import settings  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from apps.bookings.models import Booking  # noqa: E402
+from apps.bookings.serializers import BookingSerializer  # noqa: E402
+from apps.core.renderers import FastJSONParser, FastJSONRenderer  # noqa: E402
+from apps.payments.models import Payment  # noqa: E402
+from apps.payments.serializers import PaymentSerializer  # noqa: E402
+
+
+def payloads(rows):
+    bookings = Booking.objects.select_related('service', 'customer', 'service__provider').order_by('-created_at')[:rows]
+    payments = Payment.objects.select_related('booking', 'booking__service', 'booking__customer').order_by('-created_at')[:rows]
+    return {
+        'my-bookings': BookingSerializer(bookings, many=True).data,
+        'my-payments': PaymentSerializer(payments, many=True).data,
+    }
+
+
+def timed(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - started) / iterations * 1e3, 3)
+
+
+def measure(data, iterations):
+    drf, fast = JSONRenderer(), FastJSONRenderer()
+    body = drf.render(data)
+    result = {
+        'items': len(data),
+        'identical': fast.render(data) == body,
+        'render_ms': {
+            'drf': timed(lambda: drf.render(data), iterations),
+            'fast': timed(lambda: fast.render(data), iterations),
+        },
+        'parse_ms': {
+            'drf': timed(lambda: JSONParser().parse(io.BytesIO(body)), iterations),
+            'fast': timed(lambda: FastJSONParser().parse(io.BytesIO(body)), iterations),
+        },
+        'bytes': {
+            'raw': len(body),
+            'gzip': len(gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)),
+            'br': len(brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)),
+        },
+        'compress_ms': {
+            'gzip': timed(lambda: gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0), iterations),
+            'br': timed(lambda: brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY), iterations),
+        },
+    }
+    result['render_speedup'] = round(result['render_ms']['drf'] / max(result['render_ms']['fast'], 1e-6), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500, help='Items per list payload')
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    report = {name: measure(data, args.iterations) for name, data in payloads(args.rows).items()}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Login throughput against catalog latency under mixed load.
+
+Start the API (e.g. ``gunicorn config.wsgi -w 4 --threads 8``) with an
+existing account, then run from ``backend/``::
+
+    python -m benchmarks.login_mixed_load --base-url http://127.0.0.1:8000 \\
+        --username alice --password secret --login-clients 32 --catalog-clients 8
+
+Run it once with ``PASSWORD_HASHING_WORKERS`` at the CPU count and once at a
+lower value: the bounded pool trades some login throughput (and sheds the
+excess as 429) for catalog latency that stays flat during the burst.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from .common import http_request, summarize
+
+
+def _worker(fn, deadline, samples, statuses, lock):
+    while time.monotonic() < deadline:
+        status, elapsed, _ = fn()
+        with lock:
+            samples.append(elapsed)
+            statuses[status] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--login-clients', type=int, default=32)
+    parser.add_argument('--catalog-clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    args = parser.parse_args()
+
+    login_url = f"{args.base_url}/api/auth/login/"
+    catalog_url = f"{args.base_url}/api/services/"
+    credentials = {'username': args.username, 'password': args.password}
+
+    groups = {
+        'login': (lambda: http_request(login_url, 'POST', credentials), args.login_clients),
+        'catalog': (lambda: http_request(catalog_url), args.catalog_clients),
+    }
+    results = {name: ([], Counter()) for name in groups}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    threads = [
+        threading.Thread(target=_worker, args=(fn, deadline, *results[name], lock))
+        for name, (fn, clients) in groups.items()
+        for _ in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = {}
+    for name, (samples, statuses) in results.items():
+        report[name] = summarize(samples)
+        report[name]['per_second'] = round(statuses.get(200, 0) / args.duration, 1)
+        report[name]['statuses'] = dict(statuses)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Latency of provider matching over an in-memory catalog snapshot.
+
+Run from ``backend/``::
+
+    python -m benchmarks.matching --services 100000 --iterations 200
+
+Fills a ``CatalogSnapshot`` with synthetic services (no database rows are
+written) and times ``CatalogIndex.match`` per category with and without a
+budget and area, plus applying a batch of incremental updates. Bookings of
+the requested date are synthetic too, so only the NumPy pass is measured.
+Pass ``--from-db`` to load the snapshot from the configured database
+instead.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from decimal import Decimal
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from apps.bookings.models import Booking  # noqa: E402
+from apps.services import matching  # noqa: E402
+from apps.services.models import Service  # noqa: E402
+from benchmarks.common import summarize  # noqa: E402
+
+AREAS = ['Andheri West, Mumbai', 'Bandra, Mumbai', 'Koregaon Park, Pune', 'Indiranagar, Bangalore', 'Salt Lake, Kolkata', '']
+
+
+def synthetic_rows(count, first_id=1):
+    categories = [category for category, _ in Service.CATEGORY_CHOICES]
+    return [
+        (
+            service_id,
+            random.choice(categories),
+            Decimal(random.randint(100, 3000)),
+            Decimal(random.randint(0, 500)) / 100,
+            random.randint(0, 1000),
+            random.random() < 0.9,
+            random.choice(AREAS),
+        )
+        for service_id in range(first_id, first_id + count)
+    ]
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--services', type=int, default=100000)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--booked', type=int, default=5000, help='Synthetic bookings on the requested date, in the category')
+    parser.add_argument('--from-db', action='store_true')
+    args = parser.parse_args()
+
+    index = matching.CatalogIndex()
+    started = time.perf_counter()
+    if args.from_db:
+        index.refresh(force=True)
+    else:
+        rows = synthetic_rows(args.services)
+        index.snapshot = matching.CatalogSnapshot(len(rows))
+        index.snapshot.apply(rows)
+    load_ms = round((time.perf_counter() - started) * 1e3, 1)
+    # Keep match() from refreshing during the measurement
+    index.refreshed_at = float('inf')
+
+    size = index.snapshot.size
+    slots = [slot for slot, _ in Booking.TIME_SLOT_CHOICES]
+    booked = [(random.randint(1, size), random.choice(slots)) for _ in range(args.booked)]
+    matching.booked_slots = lambda date, category: booked
+
+    category = Service.CATEGORY_CHOICES[0][0]
+    report = {
+        'services': size,
+        'load_ms': load_ms,
+        'match': {
+            'category': timed(lambda: index.match(category, limit=args.limit), args.iterations),
+            'date_slot': timed(
+                lambda: index.match(category, date='2030-01-01', time_slot=slots[0], limit=args.limit),
+                args.iterations
+            ),
+            'all_criteria': timed(
+                lambda: index.match(
+                    category, date='2030-01-01', time_slot=slots[0], area='andheri mumbai',
+                    budget=Decimal(800), limit=args.limit
+                ),
+                args.iterations
+            ),
+        },
+        # An incremental refresh: 100 changed services, a tenth of them new
+        'apply_100': timed(
+            lambda: index.snapshot.apply(
+                synthetic_rows(90, first_id=random.randint(1, size - 90)) + synthetic_rows(10, first_id=size + 1)
+            ),
+            20
+        ),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
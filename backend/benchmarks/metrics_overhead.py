@@ -0,0 +1,66 @@
+"""
+Per-request cost of metrics recording, in microseconds.
+
+Run from ``backend/``::
+
+    python -m benchmarks.metrics_overhead --iterations 200000
+
+Times ``begin_request``/``end_request`` around an empty handler, which is
+everything ``MetricsMiddleware`` adds to a request, plus one timed query
+through the execute wrapper.
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.urls import resolve  # noqa: E402
+from apps.core import metrics  # noqa: E402
+
+
+def noop_execute(sql, params, many, context):
+    return None
+
+
+def measure(iterations, routes):
+    factory = RequestFactory()
+    requests = []
+    for i in range(routes):
+        request = factory.get('/api/services/' if i % 2 else f'/api/services/{i}/')
+        request.resolver_match = resolve(request.path)
+        requests.append(request)
+    response = HttpResponse()
+
+    started = time.perf_counter()
+    for i in range(iterations):
+        token, request_started = metrics.begin_request()
+        metrics.query_timer(noop_execute, 'SELECT 1', None, False, {})
+        metrics.end_request(requests[i % routes], response, token, request_started)
+    return round((time.perf_counter() - started) / iterations * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200000)
+    parser.add_argument('--routes', type=int, default=20, help='Distinct request paths to cycle through')
+    args = parser.parse_args()
+
+    per_request_us = measure(args.iterations, args.routes)
+    started = time.perf_counter()
+    body = metrics.render(metrics.collect())
+    print(json.dumps({
+        'per_request_us': per_request_us,
+        'scrape_ms': round((time.perf_counter() - started) * 1e3, 2),
+        'scrape_bytes': len(body),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
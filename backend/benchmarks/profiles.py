@@ -0,0 +1,126 @@
+"""
+Cold start, worker memory and per-request overhead of the settings profiles.
+
+Run from ``backend/``::
+
+    python -m benchmarks.profiles --iterations 20000
+
+Each profile is measured in a fresh interpreter: the time to import its
+WSGI entrypoint (settings, app registry, middleware chain), the resident
+memory of the worker after startup and after serving requests, and the
+time per request through the WSGI application. The request is an
+unauthenticated ``GET`` of an authenticated endpoint, which runs the whole
+middleware chain, URL resolution and DRF's authentication and permission
+checks but never touches the database, so the difference between the
+profiles is framework overhead.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+PROFILES = {
+    'full': 'config.wsgi',
+    'api': 'config.wsgi_api',
+}
+
+
+def rss_kib():
+    """Resident memory of this process in KiB (peak where /proc is missing)"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure(module, path, iterations):
+    """Runs in the child interpreter"""
+    import importlib
+    from wsgiref.util import setup_testing_defaults
+
+    rss_before = rss_kib()
+    started = time.perf_counter()
+    application = importlib.import_module(module).application
+    import_ms = (time.perf_counter() - started) * 1e3
+    rss_started = rss_kib()
+
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    def call():
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'HTTP_ORIGIN': 'http://localhost:3000'}
+        setup_testing_defaults(environ)
+        response = application(environ, start_response)
+        b''.join(response)
+        response.close()
+
+    # The first request compiles URL patterns and warms lazy imports
+    started = time.perf_counter()
+    call()
+    first_request_ms = (time.perf_counter() - started) * 1e3
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    per_request_us = (time.perf_counter() - started) / iterations * 1e6
+
+    return {
+        'import_ms': round(import_ms, 1),
+        'first_request_ms': round(first_request_ms, 2),
+        'per_request_us': round(per_request_us, 1),
+        'rss_interpreter_mib': round(rss_before / 1024, 1),
+        'rss_started_mib': round(rss_started / 1024, 1),
+        'rss_serving_mib': round(rss_kib() / 1024, 1),
+        'status': statuses[-1],
+        'modules_loaded': len(sys.modules),
+    }
+
+
+def run_profile(module, path, iterations):
+    # DJANGO_SETTINGS_MODULE would override config.wsgi's default profile
+    env = {key: value for key, value in os.environ.items() if key != 'DJANGO_SETTINGS_MODULE'}
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.profiles', '--child', module, '--path', path,
+         '--iterations', str(iterations)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--path', default='/api/bookings/my/', help='Endpoint requested (must not need the database)')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh processes per profile; the fastest import is kept')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.path, args.iterations)))
+        return
+
+    report = {}
+    for name, module in PROFILES.items():
+        runs = [run_profile(module, args.path, args.iterations) for _ in range(args.runs)]
+        report[name] = min(runs, key=lambda run: run['import_ms'])
+        report[name]['per_request_us'] = min(run['per_request_us'] for run in runs)
+    report['api_vs_full'] = {
+        key: round(report['api'][key] - report['full'][key], 2)
+        for key in ('import_ms', 'per_request_us', 'rss_started_mib', 'rss_serving_mib', 'modules_loaded')
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
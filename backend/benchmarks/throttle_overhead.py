@@ -0,0 +1,71 @@
+"""
+Per-request cost of the throttle check, in microseconds.
+
+Run from ``backend/``::
+
+    python -m benchmarks.throttle_overhead --iterations 200000
+
+Measures ``allow_request`` for every configured store, with one client
+(hot key) and with many distinct clients (cold keys).
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from apps.core import throttling  # noqa: E402
+
+STORES = [
+    'apps.core.throttling.LocalRateStore',
+    'apps.core.throttling.CacheRateStore',
+]
+
+
+def measure(store_path, iterations, distinct_clients):
+    factory = APIRequestFactory()
+    requests = []
+    for i in range(distinct_clients):
+        request = Request(factory.get('/api/services/', REMOTE_ADDR=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"))
+        request.user = AnonymousUser()
+        requests.append(request)
+
+    with override_settings(THROTTLE_STORE=store_path):
+        throttling._store = None
+        throttle = throttling.CatalogThrottle()
+        # Effectively unlimited so every call takes the full "allowed" path
+        throttle.num_requests, throttle.duration = 10 ** 9, 60
+        started = time.perf_counter()
+        for i in range(iterations):
+            throttle.allow_request(requests[i % distinct_clients], None)
+        elapsed = time.perf_counter() - started
+    throttling._store = None
+    return round(elapsed / iterations * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200000)
+    parser.add_argument('--clients', type=int, default=10000, help='Distinct clients for the cold-key run')
+    args = parser.parse_args()
+
+    report = {
+        store.rsplit('.', 1)[-1]: {
+            'hot_key_us': measure(store, args.iterations, 1),
+            'cold_keys_us': measure(store, args.iterations, args.clients),
+        }
+        for store in STORES
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,12 +5,17 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+The realtime event stream (``/api/events/stream/``) needs this entrypoint;
+under WSGI every open stream would pin a worker. Serve it with e.g.
+``gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker``.
 """
 
 import os
 
 from django.core.asgi import get_asgi_application
+from apps.realtime.asgi import watch_disconnects
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+application = watch_disconnects(get_asgi_application())
@@ -0,0 +1,17 @@
+"""
+ASGI entrypoint of the slim API profile (``config.settings_api``).
+
+Serve it with e.g.
+``gunicorn config.asgi_api:application -k uvicorn.workers.UvicornWorker``;
+the admin and static files stay on ``config.asgi`` or ``config.wsgi``.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+from apps.realtime.asgi import watch_disconnects
+
+# This entrypoint is the profile, so it does not defer to the environment
+os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings_api'
+
+application = watch_disconnects(get_asgi_application())
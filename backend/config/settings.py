@@ -1,5 +1,6 @@
 import os
 import dj_database_url
+from corsheaders.defaults import default_headers
 from decouple import config
 from datetime import timedelta
 from pathlib import Path
@@ -29,20 +30,64 @@ INSTALLED_APPS = [
     'apps.services',
     'apps.bookings',
     'apps.payments',
+    'apps.realtime',
+    'apps.tasks',
+    'apps.notifications',
+    'apps.pricing',
+    'apps.core',
 ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.ProfilerMiddleware',
+    'apps.core.middleware.TracingMiddleware',
+    'apps.core.middleware.MetricsMiddleware',
+    'apps.core.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'apps.core.middleware.SnapshotWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',
+    'apps.core.middleware.TraceViewMiddleware',
 ]
 
+# Metrics (served at /metrics)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# Bearer token for scrapers; without one only staff access tokens are accepted
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# Shared directory for multi-worker servers (gunicorn -w N); empty for one process
+METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=float)
+
+# Slow-request tracing (see apps.core.tracing; staff view at /api/core/traces/)
+TRACE_ENABLED = config('TRACE_ENABLED', default=False, cast=bool)
+TRACE_SLOW_MS = config('TRACE_SLOW_MS', default=500, cast=float)
+TRACE_SAMPLE_RATE = config('TRACE_SAMPLE_RATE', default=1.0, cast=float)
+TRACE_BUFFER_SIZE = config('TRACE_BUFFER_SIZE', default=100, cast=int)
+TRACE_MAX_SPANS = config('TRACE_MAX_SPANS', default=1000, cast=int)
+TRACE_EXPLAIN_QUERIES = config('TRACE_EXPLAIN_QUERIES', default=3, cast=int)
+# Every sampled trace is appended here as a JSON line when set
+TRACE_LOG_FILE = config('TRACE_LOG_FILE', default='')
+
+# On-demand profiles for staff: X-Profile header or ?_profile= (see apps.core.profiling)
+PROFILE_ENABLED = config('PROFILE_ENABLED', default=False, cast=bool)
+PROFILE_RATE = config('PROFILE_RATE', default='10/hour')
+PROFILE_DIR = config('PROFILE_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+PROFILE_MAX_FILES = config('PROFILE_MAX_FILES', default=50, cast=int)
+PROFILE_SAMPLE_INTERVAL = config('PROFILE_SAMPLE_INTERVAL', default=0.001, cast=float)
+PROFILE_TOP_FUNCTIONS = config('PROFILE_TOP_FUNCTIONS', default=50, cast=int)
+PROFILE_TRACEMALLOC_FRAMES = config('PROFILE_TRACEMALLOC_FRAMES', default=1, cast=int)
+
+# Response compression (brotli or gzip, negotiated per request)
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=4, cast=int)
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -71,9 +116,43 @@ DATABASES = {
     )
 }
 
+# Read replicas: comma-separated database URLs, registered as replica_1, replica_2, ...
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(filter(None, config('DATABASE_REPLICA_URLS', default='').split(',')), start=1):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(replica_url.strip(), conn_max_age=600)
+    DATABASES[f'replica_{index}']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['apps.core.routers.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+REPLICA_PIN_COOKIE = 'primary_pin'
+# Same pin for cross-origin clients, which do not send the cookie
+REPLICA_PIN_HEADER = 'X-Primary-Pin'
+REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=2, cast=float)
+REPLICA_LAG_CHECK_INTERVAL = config('REPLICA_LAG_CHECK_INTERVAL', default=5, cast=float)
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
+# Password hashing. The first hasher is used for new hashes; logins with a
+# hash from any other listed hasher are transparently upgraded to it.
+PASSWORD_HASHERS = list(dict.fromkeys([
+    config('PASSWORD_HASHER', default='django.contrib.auth.hashers.PBKDF2PasswordHasher'),
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]))
+
+AUTHENTICATION_BACKENDS = ['apps.users.backends.PooledModelBackend']
+
+# Bounded password hashing pool (see apps.users.hashing); 0 workers means min(4, CPUs)
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=0, cast=int)
+PASSWORD_HASHING_QUEUE = config('PASSWORD_HASHING_QUEUE', default=16, cast=int)
+PASSWORD_HASHING_TIMEOUT = config('PASSWORD_HASHING_TIMEOUT', default=10, cast=float)
+PASSWORD_HASHING_RETRY_AFTER = config('PASSWORD_HASHING_RETRY_AFTER', default=1, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -92,22 +171,59 @@ AUTH_PASSWORD_VALIDATORS = [
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Applied per view through the scoped classes in apps.core.throttling
+    'DEFAULT_THROTTLE_RATES': {
+        'catalog': config('THROTTLE_RATE_CATALOG', default='120/min'),
+        'auth': config('THROTTLE_RATE_AUTH', default='10/min'),
+        'booking_create': config('THROTTLE_RATE_BOOKING_CREATE', default='30/hour'),
+        'payments': config('THROTTLE_RATE_PAYMENTS', default='60/min'),
+    },
 }
 
+# Render and parse every JSON payload with DRF as well and log differences (see apps.core.renderers)
+JSON_COMPAT_CHECK = config('JSON_COMPAT_CHECK', default=False, cast=bool)
+
+# Throttle counter store; use CacheRateStore with a shared cache across workers
+THROTTLE_STORE = config('THROTTLE_STORE', default='apps.core.throttling.LocalRateStore')
+THROTTLE_CACHE = config('THROTTLE_CACHE', default='default')
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.serializers.TokenRefreshSerializer',
 }
 
+# Token revocation (see apps.users.revocation)
+TOKEN_REVOCATION_CAPACITY = config('TOKEN_REVOCATION_CAPACITY', default=100000, cast=int)
+TOKEN_REVOCATION_ERROR_RATE = config('TOKEN_REVOCATION_ERROR_RATE', default=0.01, cast=float)
+TOKEN_REVOCATION_SYNC_INTERVAL = config('TOKEN_REVOCATION_SYNC_INTERVAL', default=2, cast=float)
+TOKEN_REVOCATION_REBUILD_INTERVAL = config('TOKEN_REVOCATION_REBUILD_INTERVAL', default=3600, cast=int)
+
+# Authenticated user resolution (see apps.users.authentication)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+# Build request.user from token claims instead of the database; role or
+# activation changes then take effect when the access token expires
+AUTH_TRUST_TOKEN_CLAIMS = config('AUTH_TRUST_TOKEN_CLAIMS', default=False, cast=bool)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -115,11 +231,99 @@ CORS_ALLOWED_ORIGINS = [
 ]
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, REPLICA_PIN_HEADER.lower())
+CORS_EXPOSE_HEADERS = [REPLICA_PIN_HEADER]
 
 # Stripe Configuration
 STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
 
+# Payment gateway adapter and refund processing
+PAYMENT_GATEWAY = config('PAYMENT_GATEWAY', default='apps.payments.gateway.DemoGateway')
+REFUND_CHUNK_SIZE = config('REFUND_CHUNK_SIZE', default=25, cast=int)
+REFUND_MAX_WORKERS = config('REFUND_MAX_WORKERS', default=4, cast=int)
+REFUND_MAX_ATTEMPTS = config('REFUND_MAX_ATTEMPTS', default=5, cast=int)
+REFUND_CLAIM_TIMEOUT = timedelta(seconds=config('REFUND_CLAIM_TIMEOUT', default=300, cast=int))
+
+# Background task queue (see apps.tasks.queue); run workers with manage.py run_tasks
+TASKS_EAGER = config('TASKS_EAGER', default=False, cast=bool)
+TASK_WORKER_THREADS = config('TASK_WORKER_THREADS', default=4, cast=int)
+TASK_BATCH_SIZE = config('TASK_BATCH_SIZE', default=20, cast=int)
+TASK_POLL_INTERVAL = config('TASK_POLL_INTERVAL', default=1, cast=float)
+TASK_MAX_ATTEMPTS = config('TASK_MAX_ATTEMPTS', default=5, cast=int)
+TASK_RETRY_BACKOFF = config('TASK_RETRY_BACKOFF', default=10, cast=int)
+TASK_CLAIM_TIMEOUT = timedelta(seconds=config('TASK_CLAIM_TIMEOUT', default=300, cast=int))
+
+# Provider matching (see apps.services.matching)
+MATCHING_WEIGHTS = {
+    'availability': config('MATCHING_WEIGHT_AVAILABILITY', default=0.2, cast=float),
+    'rating': config('MATCHING_WEIGHT_RATING', default=0.25, cast=float),
+    'volume': config('MATCHING_WEIGHT_VOLUME', default=0.15, cast=float),
+    'price': config('MATCHING_WEIGHT_PRICE', default=0.2, cast=float),
+    'locality': config('MATCHING_WEIGHT_LOCALITY', default=0.2, cast=float),
+}
+MATCHING_MAX_RESULTS = config('MATCHING_MAX_RESULTS', default=50, cast=int)
+MATCHING_REFRESH_INTERVAL = config('MATCHING_REFRESH_INTERVAL', default=5, cast=float)
+MATCHING_REFRESH_OVERLAP = timedelta(seconds=config('MATCHING_REFRESH_OVERLAP', default=60, cast=int))
+MATCHING_FULL_REFRESH = config('MATCHING_FULL_REFRESH', default=600, cast=float)
+
+# Co-booking recommendations (see apps.services.recommendations)
+RECOMMENDATION_TOP_K = config('RECOMMENDATION_TOP_K', default=10, cast=int)
+# Pairs shared by fewer customers are not recommended
+RECOMMENDATION_MIN_CUSTOMERS = config('RECOMMENDATION_MIN_CUSTOMERS', default=2, cast=int)
+# Customers with more distinct services are left out of the matrix
+RECOMMENDATION_MAX_HISTORY = config('RECOMMENDATION_MAX_HISTORY', default=50, cast=int)
+RECOMMENDATION_CHUNK_SIZE = config('RECOMMENDATION_CHUNK_SIZE', default=20000, cast=int)
+RECOMMENDATION_WRITE_BATCH = config('RECOMMENDATION_WRITE_BATCH', default=500, cast=int)
+
+# Demand-based slot pricing (see apps.pricing.engine)
+PRICING_SENSITIVITY = config('PRICING_SENSITIVITY', default=0.5, cast=float)
+# Booked share of a slot's capacity above which prices start rising
+PRICING_TARGET_UTILIZATION = config('PRICING_TARGET_UTILIZATION', default=0.5, cast=float)
+# Weight of a turned-away booking attempt relative to a booking
+PRICING_REJECTION_WEIGHT = config('PRICING_REJECTION_WEIGHT', default=0.5, cast=float)
+# Most pressure turned-away attempts can add, and seconds one keeps counting
+PRICING_MAX_REJECTION_PRESSURE = config('PRICING_MAX_REJECTION_PRESSURE', default=0.5, cast=float)
+PRICING_REJECTION_TTL = config('PRICING_REJECTION_TTL', default=3600, cast=int)
+PRICING_MAX_MULTIPLIER = config('PRICING_MAX_MULTIPLIER', default=2.0, cast=float)
+PRICING_MULTIPLIER_STEP = config('PRICING_MULTIPLIER_STEP', default=0.05, cast=float)
+# Seconds a quoted price can be booked at
+PRICING_QUOTE_TTL = config('PRICING_QUOTE_TTL', default=900, cast=int)
+# Days ahead bookings are accepted for (see BookingQuoteSerializer)
+PRICING_HORIZON_DAYS = config('PRICING_HORIZON_DAYS', default=30, cast=int)
+
+# Notifications (see apps.notifications); add apps.notifications.channels.EmailChannel to mail them too
+NOTIFICATION_CHANNELS = [
+    path.strip() for path in config(
+        'NOTIFICATION_CHANNELS',
+        default='apps.notifications.channels.InboxChannel'
+    ).split(',') if path.strip()
+]
+# Provider events within one window are delivered as a single digest
+NOTIFICATION_DIGEST_WINDOW = config('NOTIFICATION_DIGEST_WINDOW', default=60, cast=int)
+NOTIFICATION_PAGE_SIZE = config('NOTIFICATION_PAGE_SIZE', default=50, cast=int)
+
+# Admin changelists (see apps.core.admin): unfiltered counts come from table
+# statistics above the threshold, filtered counts stop at the limit
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+ADMIN_FILTERED_COUNT_LIMIT = config('ADMIN_FILTERED_COUNT_LIMIT', default=10000, cast=int)
+
+# Email (development default: a local SMTP stand-in on port 1025)
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=1025, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='notifications@homeservices.local')
+
+# Realtime status push (served under ASGI)
+REALTIME_BROKER = config('REALTIME_BROKER', default='apps.realtime.broker.InProcessBroker')
+REALTIME_MAX_QUEUE = config('REALTIME_MAX_QUEUE', default=50, cast=int)
+REALTIME_HEARTBEAT = config('REALTIME_HEARTBEAT', default=10, cast=int)
+# Clients reconnect after REALTIME_RETRY_MS; short lifetimes bound subscriptions nobody reads
+REALTIME_STREAM_LIFETIME = config('REALTIME_STREAM_LIFETIME', default=300, cast=int)
+REALTIME_RETRY_MS = config('REALTIME_RETRY_MS', default=3000, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Asia/Kolkata'
@@ -131,6 +335,12 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Catalog snapshots, served from STATIC_URL + CATALOG_SNAPSHOT_DIR (see apps.services.snapshots)
+CATALOG_SNAPSHOT_DIR = 'catalog'
+CATALOG_SNAPSHOT_SIZE = config('CATALOG_SNAPSHOT_SIZE', default=50, cast=int)
+CATALOG_SNAPSHOT_DEBOUNCE = config('CATALOG_SNAPSHOT_DEBOUNCE', default=5, cast=float)
+CATALOG_SNAPSHOT_AUTO_REBUILD = config('CATALOG_SNAPSHOT_AUTO_REBUILD', default=True, cast=bool)
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
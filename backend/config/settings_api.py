@@ -0,0 +1,50 @@
+"""
+Slim settings profile for API workers.
+
+The API authenticates with JWT only and renders JSON only, so sessions,
+CSRF, messages, static file serving, templates and the admin are dropped.
+Serve it with ``config.wsgi_api`` / ``config.asgi_api`` and keep the admin
+and static files on a separate worker running the full ``config.settings``
+profile (``config.wsgi`` / ``config.asgi``). Compare the two profiles with
+``python -m benchmarks.profiles``.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    )
+]
+
+# No AuthenticationMiddleware: DRF and the async views authenticate the
+# request themselves from the Authorization header
+MIDDLEWARE = [
+    'apps.core.middleware.ProfilerMiddleware',
+    'apps.core.middleware.TracingMiddleware',
+    'apps.core.middleware.MetricsMiddleware',
+    'apps.core.middleware.CompressionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',
+    'apps.core.middleware.TraceViewMiddleware',
+]
+
+ROOT_URLCONF = 'config.urls_api'
+
+TEMPLATES = []
+
+WSGI_APPLICATION = 'config.wsgi_api.application'
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    # The browsable API needs templates and sessions
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.FastJSONRenderer',
+    ],
+}
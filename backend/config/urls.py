@@ -15,19 +15,16 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
+from .urls_api import urlpatterns as api_urlpatterns
 
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/auth/', include('apps.users.urls')),
-    path('api/services/', include('apps.services.urls')),
-    path('api/bookings/', include('apps.bookings.urls')),
-    path('api/payments/', include('apps.payments.urls')),
-]
+] + api_urlpatterns
 
 
 # Serve media files in development
@@ -0,0 +1,24 @@
+"""
+URL configuration of the JSON API.
+
+Served on its own by the API profile (``config.settings_api``); the full
+profile (``config.urls``) adds the admin and development static serving.
+"""
+from django.urls import path, include
+from apps.core.views import metrics_view
+
+
+urlpatterns = [
+    path('api/auth/', include('apps.users.urls')),
+    path('api/services/', include('apps.services.urls')),
+    path('api/bookings/', include('apps.bookings.urls')),
+    path('api/payments/', include('apps.payments.urls')),
+    path('api/events/', include('apps.realtime.urls')),
+    path('api/notifications/', include('apps.notifications.urls')),
+    path('api/core/', include('apps.core.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    # Async read path; use with config.asgi (under WSGI they run but gain nothing)
+    path('api/async/services/', include('apps.services.async_urls')),
+    path('api/async/bookings/', include('apps.bookings.async_urls')),
+    path('api/async/payments/', include('apps.payments.async_urls')),
+]
@@ -0,0 +1,15 @@
+"""
+WSGI entrypoint of the slim API profile (``config.settings_api``).
+
+Serve it with e.g. ``gunicorn config.wsgi_api:application``; the admin and
+static files stay on ``config.wsgi``.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+# This entrypoint is the profile, so it does not defer to the environment
+os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings_api'
+
+application = get_wsgi_application()
@@ -11,6 +11,10 @@ const api = axios.create({
   timeout: 10000,
 });
 
+// Primary pin set by the API after a write, echoed so the next reads see it
+const PRIMARY_PIN_HEADER = 'X-Primary-Pin';
+let primaryPin = null;
+
 // REQUEST INTERCEPTORS: Add Bearer token
 api.interceptors.request.use(
   (config) => {
@@ -18,26 +22,50 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (primaryPin) {
+      config.headers[PRIMARY_PIN_HEADER] = primaryPin;
+    }
     return config;
   },
   (error) => Promise.reject(error)
 );
 
+// Refresh tokens are single-use: store the rotated one, and let requests
+// failing together share one refresh instead of replaying the same token
+let refreshing = null;
+const refreshTokens = () => {
+  if (!refreshing) {
+    refreshing = axios.post(`${API_BASE_URL}/auth/token/refresh/`, {
+      refresh: localStorage.getItem('refresh_token')
+    }).then((response) => {
+      const { access, refresh } = response.data;
+      localStorage.setItem('access_token', access);
+      if (refresh) {
+        localStorage.setItem('refresh_token', refresh);
+      }
+    }).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
 // RESPONSE INTERCEPTORS: Auto-refresh and relogin
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const pin = response.headers[PRIMARY_PIN_HEADER.toLowerCase()];
+    if (pin) {
+      primaryPin = pin;
+    }
+    return response;
+  },
   async (error) => {
     const original = error.config;
     if (error.response?.status === 401 && !original._retry) {
       original._retry = true;
       try {
-        const refreshToken = localStorage.getItem('refresh_token');
-        if (refreshToken) {
-          const response = await axios.post(`${API_BASE_URL}/auth/token/refresh/`, {
-            refresh: refreshToken
-          });
-          const { access } = response.data;
-          localStorage.setItem('access_token', access);
+        if (localStorage.getItem('refresh_token')) {
+          await refreshTokens();
           return api(original);
         }
       } catch (refreshError) {